@@ -0,0 +1,197 @@
+"""Benchmarks of the speed and accuracy of big_O itself.
+
+The classes follow the conventions of asv (airspeed velocity): `time_*`
+methods are timed, and `track_*` methods return the tracked value. The
+module can also be run as a script, which prints a report; from the root
+of a source checkout, run it as a module so that `big_o` is importable:
+
+    $ python -m benchmarks.benchmarks --n-series 1000
+
+The timing series are synthetic: they are generated from each class in
+`big_o.complexities.ALL_CLASSES`, with random coefficients and
+multiplicative log-normal noise, so that the true class is known.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import big_o
+from big_o import complexities, datagen
+from big_o.timing import Timing
+
+#: N's at which the synthetic series are "measured"
+NS = np.linspace(100, 10000, 20)
+
+#: Noise levels, as standard deviation of the log of the times
+NOISE_LEVELS = [0.01, 0.05, 0.1, 0.2]
+
+
+def synthetic_series(class_, ns, n_series, noise, rng):
+    """ Generate timing series from a complexity class plus noise.
+
+    The coefficients are random, with the constant term between 0.1 and
+    1 ms, and the N-dependent term between 2 and 20 times larger than the
+    constant term at the largest N.
+
+    Input:
+    ------
+
+    class_ -- Subclass of `big_o.complexities.ComplexityClass`
+
+    ns -- Array of values of N
+
+    n_series -- Number of series
+
+    noise -- Standard deviation of the log of the multiplicative noise
+
+    rng -- `numpy.random.Generator`
+
+    Output:
+    -------
+
+    times -- Array of shape (n_series, len(ns))
+    """
+    ns = np.asarray(ns, dtype=float)
+    constant = rng.uniform(1e-4, 1e-3, size=n_series)
+    growth = constant * rng.uniform(2., 20., size=n_series)
+    if class_ is complexities.Polynomial:
+        # a*n^b, with b between the exponents of the other classes
+        exponent = rng.uniform(1.4, 1.6, size=n_series)
+        scale = growth / ns[-1] ** exponent
+        times = scale[:, None] * ns ** exponent[:, None]
+    elif class_ is complexities.Exponential:
+        # a*b^n, growing by `growth / constant` over the range of N's
+        rate = np.log(growth / constant) / (ns[-1] - ns[0])
+        times = constant[:, None] * np.exp(rate[:, None] * (ns - ns[0]))
+    else:
+        x = class_()._transform_n(ns)
+        if x.shape[1] == 1:
+            times = np.repeat(constant[:, None], len(ns), axis=1)
+        else:
+            term = x[:, 1] - x[0, 1]
+            times = constant[:, None] + (growth / term[-1])[:, None] * term
+    return times * np.exp(noise * rng.standard_normal(times.shape))
+
+
+def synthetic_dataset(n_series, noise, seed=0):
+    """ Synthetic series of all the classes in `ALL_CLASSES`.
+
+    Output: (times, labels), with `times` of shape (number of series,
+    len(NS)) and `labels` the index of the true class of each series in
+    `ALL_CLASSES`.
+    """
+    rng = np.random.default_rng(seed)
+    times = []
+    labels = []
+    for i, class_ in enumerate(complexities.ALL_CLASSES):
+        times.append(synthetic_series(class_, NS, n_series, noise, rng))
+        labels.append(np.full(n_series, i))
+    return np.concatenate(times), np.concatenate(labels)
+
+
+def accuracy(n_series, noise, seed=0, criterion='bic'):
+    """ Fraction of synthetic series classified correctly, for each class.
+
+    Output: array with one accuracy per class in `ALL_CLASSES`.
+    """
+    times, labels = synthetic_dataset(n_series, noise, seed)
+    best_idx, _ = big_o.infer_big_o_class_many(NS, times,
+                                               criterion=criterion)
+    correct = (best_idx == labels)
+    return np.array([correct[labels == i].mean()
+                     for i in range(len(complexities.ALL_CLASSES))])
+
+
+def _noop(data):
+    pass
+
+
+def overhead_per_call(n_repeats=100000):
+    """ Time in seconds taken by the timing loop for each call of a
+    function that does nothing. """
+    timing = Timing(n_repeats=n_repeats, n_timings=5)
+    t, _ = timing.measure(_noop, datagen.n_, 1)
+    return t / n_repeats
+
+
+class FitSuite(object):
+    """ Throughput of the inference of the complexity class. """
+
+    def setup(self):
+        self.times, _ = synthetic_dataset(1000, 0.05)
+
+    def time_infer_big_o_class_many(self):
+        big_o.infer_big_o_class_many(NS, self.times)
+
+    def time_infer_big_o_class(self):
+        for series in self.times[::100]:
+            big_o.infer_big_o_class(NS, series)
+
+    def time_incremental_classifier(self):
+        for series in self.times[::100]:
+            big_o.IncrementalClassifier().update_many(NS, series).best
+
+
+class AccuracySuite(object):
+    """ Classification accuracy as a function of the noise level. """
+
+    params = (NOISE_LEVELS, ['bic', 'residuals'])
+    param_names = ['noise', 'criterion']
+    unit = 'fraction of series'
+
+    def track_accuracy(self, noise, criterion):
+        return float(accuracy(100, noise, criterion=criterion).mean())
+
+
+class OverheadSuite(object):
+    """ Overhead of the timing loop. """
+
+    unit = 'seconds per call'
+
+    def track_overhead_per_call(self):
+        return overhead_per_call()
+
+
+def _series_per_second(func, times):
+    start = time.perf_counter()
+    func(times)
+    return len(times) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--n-series', type=int, default=1000,
+                        help='number of synthetic series per class')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    times, _ = synthetic_dataset(args.n_series, 0.05, args.seed)
+    print('Fit throughput ({} series of {} points)'.format(len(times),
+                                                           len(NS)))
+    print('  infer_big_o_class_many: {:12.0f} series/s'.format(
+        _series_per_second(
+            lambda t: big_o.infer_big_o_class_many(NS, t), times)))
+    subset = times[::max(1, len(times) // 200)]
+    print('  infer_big_o_class:      {:12.0f} series/s'.format(
+        _series_per_second(
+            lambda t: [big_o.infer_big_o_class(NS, s) for s in t], subset)))
+    print()
+
+    class_names = [c.__name__ for c in complexities.ALL_CLASSES]
+    print('Accuracy by noise level (std of log time)')
+    print('  {:>6s} '.format('noise')
+          + ' '.join('{:>12s}'.format(name) for name in class_names))
+    for noise in NOISE_LEVELS:
+        result = accuracy(args.n_series, noise, args.seed)
+        print('  {:6.2f} '.format(noise)
+              + ' '.join('{:12.3f}'.format(a) for a in result))
+    print()
+
+    print('Timing overhead: {:.1f} ns per call'.format(
+        overhead_per_call() * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,64 @@
-from big_o import complexities, datagen, reports  # noqa
-from big_o.big_o import (  # noqa
-    big_o,
-    infer_big_o_class,
-    measure_execution_time,
+"""Empirical estimation of time complexity from execution time.
+
+The submodules and the public functions are imported lazily, on first
+access, so that `import big_o` does not import NumPy.
+"""
+
+import importlib
+import sys
+import types
+
+_SUBMODULES = (
+    'cache',
+    'compare',
+    'complexities',
+    'datagen',
+    'isolation',
+    'reports',
+    'selection',
+    'serialization',
+    'timing',
 )
+
+#: Public names defined in big_o.big_o
+_FUNCTIONS = (
+    'IncrementalClassifier',
+    'async_big_o',
+    'big_o',
+    'infer_big_o_class',
+    'infer_big_o_class_many',
+    'measure_execution_time',
+    'measure_execution_time_adaptive',
+    'measure_execution_time_async',
+    'measure_memory_usage',
+)
+
+__all__ = list(_SUBMODULES + _FUNCTIONS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('big_o.' + name)
+    if name in _FUNCTIONS:
+        value = getattr(importlib.import_module('big_o.big_o'), name)
+        globals()[name] = value
+        return value
+    raise AttributeError('module {!r} has no attribute {!r}'.format(
+        __name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+
+    def __setattr__(self, name, value):
+        # Importing the submodule big_o.big_o binds it to the attribute
+        # `big_o` of the package; keep the function of the same name instead
+        if name == 'big_o' and isinstance(value, types.ModuleType):
+            value = value.big_o
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,5 @@
+import sys
+
+from big_o.cli import main
+
+sys.exit(main())
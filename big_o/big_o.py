@@ -1,13 +1,359 @@
-from timeit import Timer
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+import warnings
+import multiprocessing
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from timeit import default_timer
 
 import numpy as np
 
-from big_o.complexities import ALL_CLASSES
+from big_o import selection
+from big_o.complexities import (
+    ALL_CLASSES,
+    ALL_CLASSES_NM,
+    coefficient_interval,
+    fit_classes,
+    fit_classes_resampled,
+    resample_indices,
+)
+from big_o.timing import Timing
+
+
+# Environment variables limiting the number of threads used by common
+# numerical libraries. They are set for parallel worker processes so that
+# the workers do not compete with each other for the same cores; the
+# libraries read them when they are loaded, so the workers are started with
+# the 'spawn' method, as fresh interpreters.
+THREAD_LIMIT_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+)
+
+
+def _available_cpus():
+    """ Return the list of CPUs the current process is allowed to run on. """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+@contextmanager
+def _thread_limit_environ():
+    """ Context manager setting `THREAD_LIMIT_ENV_VARS` to 1 in the
+    environment, so that the processes started meanwhile inherit them.
+    The previous values are restored at exit. """
+    previous = {name: os.environ.get(name) for name in THREAD_LIMIT_ENV_VARS}
+    os.environ.update({name: '1' for name in THREAD_LIMIT_ENV_VARS})
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                del os.environ[name]
+            else:
+                os.environ[name] = value
+
+
+def _init_worker(cpu_queue):
+    """ Initialize a worker process for parallel measurements.
+
+    Pin the worker to the CPU taken from `cpu_queue`, if the platform
+    supports it.
+    """
+    cpu = cpu_queue.get()
+    if hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError:
+            pass
+
+
+def _measure_n(timing, func, data_generator, n):
+    """ Measure the execution time of `func` for a single value of N.
+
+    Output: (aggregated time, array of all timings), see `Timing.measure`.
+    """
+    return timing.measure(func, data_generator, n)
+
+
+def _make_executor(n_workers):
+    """ Create a process pool with `n_workers` workers pinned to CPUs.
+
+    The workers are started when the first jobs are submitted, which must
+    happen inside `_thread_limit_environ`.
+    """
+    context = multiprocessing.get_context('spawn')
+    cpus = _available_cpus()
+    cpu_queue = context.Queue()
+    for i in range(n_workers):
+        cpu_queue.put(cpus[i % len(cpus)])
+    return ProcessPoolExecutor(max_workers=n_workers, mp_context=context,
+                               initializer=_init_worker,
+                               initargs=(cpu_queue,))
+
+
+@contextmanager
+def _worker_pool(n_workers):
+    """ Context manager returning a process pool of `n_workers` workers
+    limited to one thread for numerical libraries. """
+    with _thread_limit_environ(), _make_executor(n_workers) as pool:
+        yield pool
+
+
+def _check_serial(option, n_workers, executor, isolation=None):
+    if n_workers is not None or executor is not None or isolation:
+        raise ValueError('{} is not supported for parallel '
+                         'measurements'.format(option))
+
+
+def _use_data_cache(data_cache, data_generator, max_n, prefetch=True):
+    """ Return `data_generator` wrapped to go through `data_cache`.
+
+    If `prefetch` is True and the generator is prefix-sliceable, the data
+    for `max_n` is generated first, so that the data for all smaller N's
+    is sliced out of it. `max_n` can be a float; it is rounded up to cover
+    the largest sampled N.
+    """
+    generator = data_cache.wrap(data_generator)
+    if prefetch and getattr(data_generator, 'prefix_sliceable', False):
+        generator(int(np.ceil(max_n)))
+    return generator
+
+
+def _executor_context(n_workers, executor):
+    """ Return a context manager for the executor running the measurements.
+
+    The context manager returns None if measurements run in this process.
+    """
+    if n_workers is not None and executor is not None:
+        raise ValueError('Only one of n_workers and executor can be given')
+    if n_workers is not None:
+        return _worker_pool(n_workers)
+    return nullcontext(executor)
+
+
+def _isolation_context(isolation, n_workers, executor):
+    """ Return a context manager for the `big_o.isolation.WorkerPool`
+    running the measurements in isolated worker processes. """
+    if executor is not None:
+        raise ValueError('Only one of isolation and executor can be given')
+    if isolation is True:
+        from big_o.isolation import WorkerPool
+        return WorkerPool(n_workers or 1)
+    return nullcontext(isolation)
+
+
+def _measure_ns_isolated(func, data_generator, ns, timing, pool):
+    """ Measure the execution time of `func` for all `ns` in the isolated
+    worker processes of `pool`, leaving out the N's that failed.
+
+    Output: (ns, time, raw_timings)
+    """
+    time, raw_timings = pool.measure(func, data_generator, ns, timing)
+    measured = ~np.isnan(time)
+    raw_timings = [raw for raw in raw_timings if raw is not None]
+    return ns[measured], time[measured], raw_timings
+
+
+def _measure_ns(func, data_generator, ns, timing, executor=None):
+    """ Measure the execution time of `func` for all `ns`.
+
+    If `executor` is None, the measurements run in this process.
+
+    Output:
+    -------
+
+    time -- Array of execution times for each N in seconds
+
+    raw_timings -- List of arrays of all the timings for each N
+    """
+    if executor is None:
+        results = [_measure_n(timing, func, data_generator, n) for n in ns]
+    else:
+        n_jobs = len(ns)
+        results = list(executor.map(_measure_n, [timing] * n_jobs,
+                                    [func] * n_jobs,
+                                    [data_generator] * n_jobs, ns))
+    times = np.array([t for t, _ in results], dtype=float)
+    return times, [raw for _, raw in results]
+
+
+class _TimeBudget(object):
+    """ Wall-clock budget for a sweep of measurements.
+
+    The cost of measuring a new N is extrapolated from the cost of the
+    previous measurements with a power law, cost = a * N^b . A single point
+    does not tell how the cost grows with N, so the first two points are
+    always measured.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.start = default_timer()
+        self.ns = []
+        self.costs = []
+        # set to True when a point is skipped or shrunk to fit the budget
+        self.truncated = False
+
+    def remaining(self):
+        return self.seconds - (default_timer() - self.start)
+
+    def measure(self, timing, func, data_generator, n):
+        """ Measure the execution time at `n`, and record the cost. """
+        start = default_timer()
+        result = _measure_n(timing, func, data_generator, n)
+        self.ns.append(max(n, 1))
+        self.costs.append(max(default_timer() - start, np.finfo(float).tiny))
+        return result
+
+    def _power_law(self):
+        """ Return the coefficients (a, b) of the extrapolated cost. """
+        log_n = np.log(self.ns[-3:])
+        log_cost = np.log(self.costs[-3:])
+        if np.ptp(log_n) == 0:
+            return self.costs[-1] / self.ns[-1], 1.
+        b, _ = np.polyfit(log_n, log_cost, 1)
+        # refit the intercept, since the exponent is clamped at 0
+        b = max(b, 0.)
+        return np.exp(np.mean(log_cost - b * log_n)), b
+
+    def predict(self, n):
+        """ Predict the cost in seconds of measuring the execution time at `n`.
+        """
+        a, b = self._power_law()
+        return a * max(n, 1) ** b
+
+    def largest_n_within(self, n):
+        """ Return the largest N <= `n` that can be measured within budget.
+
+        Return 0 if no N fits in the remaining budget. The first two N's are
+        always measured.
+        """
+        remaining = self.remaining()
+        if len(self.ns) < 2 or self.predict(n) <= remaining:
+            return n
+        a, b = self._power_law()
+        if remaining <= 0 or b == 0:
+            return 0
+        return min(n, int((remaining / a) ** (1. / b)))
+
+
+def _measure_ns_budget(func, data_generator, ns, timing, budget):
+    """ Measure the execution time of `func` for increasing `ns` on a budget.
+
+    Points that are predicted to go over the budget are shrunk to the
+    largest N that fits, if that is larger than the last measured N, and
+    the sweep stops.
+
+    Output:
+    -------
+
+    ns -- Array of the N's that have been measured
+
+    time -- Array of execution times for each N in seconds
+
+    raw_timings -- List of arrays of all the timings for each N
+    """
+    measured_ns = []
+    results = []
+    for n in ns:
+        n_within = budget.largest_n_within(n)
+        if n_within < n:
+            budget.truncated = True
+            if not measured_ns or n_within > measured_ns[-1]:
+                measured_ns.append(n_within)
+                results.append(budget.measure(timing, func, data_generator,
+                                              n_within))
+            break
+        measured_ns.append(n)
+        results.append(budget.measure(timing, func, data_generator, n))
+    times = np.array([t for t, _ in results], dtype=float)
+    return (np.array(measured_ns, dtype='int64'), times,
+            [raw for _, raw in results])
+
+
+def _sample_ns(min_n, max_n, n_measures, sampling='linear'):
+    """ Return the N's at which the execution time is measured.
+
+    If `min_n` and `max_n` are numbers, return a 1-D array of N's. If they
+    are sequences with one value per size parameter, return a 2-D array
+    with one row per measurement and one column per size parameter.
+
+    With 'linear' sampling, the N's are on a linear grid with `n_measures`
+    values per size parameter (i.e., n_measures ** number of parameters
+    points). With 'lhs' sampling, `n_measures` points are drawn with
+    Latin hypercube sampling: the range of each parameter is divided in
+    `n_measures` intervals, and each interval is sampled exactly once. The
+    random numbers are taken from the global `numpy.random` state.
+    """
+    min_n = np.atleast_1d(min_n).astype(float)
+    max_n = np.atleast_1d(max_n).astype(float)
+    if min_n.shape != max_n.shape or min_n.ndim != 1:
+        raise ValueError('min_n and max_n must have the same number of '
+                         'size parameters')
+
+    if sampling == 'linear':
+        axes = [np.linspace(lo, hi, n_measures) for lo, hi in zip(min_n, max_n)]
+        grid = np.meshgrid(*axes, indexing='ij')
+        ns = np.column_stack([g.ravel() for g in grid])
+    elif sampling == 'lhs':
+        n_params = len(min_n)
+        strata = np.column_stack([np.random.permutation(n_measures)
+                                  for _ in range(n_params)])
+        u = (strata + np.random.random_sample((n_measures, n_params))) / n_measures
+        ns = min_n + u * (max_n - min_n)
+        if n_params == 1:
+            ns = np.sort(ns, axis=0)
+    else:
+        raise ValueError('Unknown sampling strategy: {!r}'.format(sampling))
+
+    if np.any(max_n > np.iinfo('int64').max):
+        raise ValueError('max_n must not be larger than the largest int64; '
+                         'use ComplexityClass.predict to extrapolate to '
+                         'larger N')
+    ns = ns.round().astype('int64')
+    return ns[:, 0] if ns.shape[1] == 1 else ns
+
+
+def _is_multi(min_n):
+    """ Return True if the N's have several size parameters. """
+    return np.ndim(min_n) > 0
+
+
+def _check_single(option, min_n):
+    if _is_multi(min_n):
+        raise ValueError('{} is not supported for several size '
+                         'parameters'.format(option))
+
+
+class _StarGenerator(object):
+    """ Data generator calling `data_generator` with one argument per size
+    parameter, e.g. `data_generator(n, m)` for a row (n, m) of N's.
+    """
+
+    def __init__(self, data_generator):
+        self.data_generator = data_generator
+
+    def __call__(self, n):
+        return self.data_generator(*n)
 
 
 def measure_execution_time(func, data_generator,
                            min_n=100, max_n=100000, n_measures=10,
-                           n_repeats=1, n_timings=1):
+                           n_repeats=1, n_timings=1,
+                           n_workers=None, executor=None, time_budget=None,
+                           data_cache=None, aggregate='min',
+                           target_precision=None, max_timings=100,
+                           autorange_duration=0.2, timer_strategy=None,
+                           return_raw_timings=False, sampling='linear',
+                           isolation=None, return_truncated=False):
     """ Measure the execution time of a function for increasing N.
 
     Input:
@@ -24,13 +370,206 @@ def measure_execution_time(func, data_generator,
 
     min_n, max_n, n_measures -- The execution time of func is measured
                                 at `n_measures` points between `min_n` and
-                                `max_n` (included)
+                                `max_n` (included).
+                                For functions whose cost depends on several
+                                sizes, `min_n` and `max_n` are sequences
+                                with one value per size parameter, and
+                                `data_generator` is called with one argument
+                                per size parameter, e.g. data_generator(N, M).
+                                See `sampling` for how the N's are chosen.
 
     n_repeats -- Number of times func is called to compute execution time
-                 (return the cumulative time of execution)
+                 (return the cumulative time of execution). If 'auto', the
+                 number of calls is calibrated at each N so that a timing
+                 lasts at least `autorange_duration` seconds, and the
+                 execution time per call is returned.
 
     n_timings -- Number of times the timing measurement is repeated.
-                 The minimum time for all the measurements is kept.
+                 The timings are reduced to a single execution time with
+                 `aggregate`.
+
+    aggregate -- How the repeated timings are reduced to a single execution
+                 time: 'min' (default), 'median', 'trimmed_mean' (mean of
+                 the central 80% of the timings), 'mad' (mean after
+                 rejecting outliers more than 3 median absolute deviations
+                 away from the median), or a function taking the array of
+                 timings and returning a number.
+
+    target_precision -- If given, the timing measurement at each N is
+                        repeated beyond `n_timings` until the 95% confidence
+                        interval of the mean timing, relative to the mean,
+                        is narrower than +/- `target_precision` (e.g., 0.05
+                        for 5%), or `max_timings` timings have been taken.
+                        Default: None, exactly `n_timings` timings.
+
+    max_timings -- Maximum number of timings at each N when
+                   `target_precision` is given.
+
+    autorange_duration -- Minimum duration in seconds of a timing when
+                          `n_repeats` is 'auto'.
+
+    timer_strategy -- A `big_o.timing.TimerStrategy` selecting the clock
+                      (wall-clock, process or thread CPU time), whether the
+                      garbage collector runs during the timings, and the
+                      CPUs the measuring process is pinned to.
+                      Default: None, wall-clock time without garbage
+                      collection, as in `timeit`.
+
+    n_workers -- If given, the measurements for the different N's are
+                 distributed over a pool of `n_workers` worker processes,
+                 each pinned to its own CPU and limited to one thread for
+                 numerical libraries. The workers are started as fresh
+                 interpreters ('spawn' start method), so `func` and
+                 `data_generator` must be picklable and importable (e.g.,
+                 functions defined at module level, outside of
+                 `if __name__ == '__main__'`).
+                 Default: None, all measurements run in this process.
+
+    executor -- A `concurrent.futures.Executor` used to run the
+                measurements, as an alternative to `n_workers`. The
+                executor is not shut down at the end of the measurements.
+
+    time_budget -- Maximum wall-clock time in seconds for the whole sweep,
+                   including data generation. The cost of the next N is
+                   extrapolated from the previous measurements, starting
+                   from the second point; the first point that would go
+                   over budget is shrunk to fit or skipped, and the sweep
+                   stops there. Not supported for parallel measurements.
+                   Default: None, no time limit.
+
+    data_cache -- A `big_o.datagen.DataCache` used to cache the input data
+                  generated by `data_generator`, so that it is not generated
+                  again by later sweeps. Not supported for parallel
+                  measurements.
+                  Default: None, data is generated for each measurement.
+
+    return_raw_timings -- If True, also return all the timings for each N.
+
+    sampling -- 'linear' (default) to measure on a linear grid, with
+                `n_measures` values for each size parameter, or 'lhs' to
+                measure at `n_measures` points drawn by Latin hypercube
+                sampling, which covers several size parameters with far
+                fewer points than a grid.
+
+    isolation -- If True, or a `big_o.isolation.WorkerPool`, each N is
+                 measured in a fresh worker process, so that memory leaks,
+                 warm caches and crashes of `func` do not affect the other
+                 N's; with True, `n_workers` (default 1) workers run in
+                 parallel. The N's that fail, because of an exception, a
+                 crash, or the timeout or memory limit of the pool, are
+                 left out of the results and listed in the `failures`
+                 attribute of the pool. A pool given here is not closed at
+                 the end of the measurements. Not supported together with
+                 `executor`, `time_budget` or `data_cache`.
+                 Default: None, no isolation.
+
+    return_truncated -- If True, also return whether the sweep was cut
+                        short to fit in `time_budget`.
+
+    Output:
+    -------
+
+    n -- List of N's used as input to `data_generator`. For several size
+         parameters, an array with one row per measurement and one column
+         per size parameter.
+
+    time -- List of total execution time for each N in seconds
+
+    raw_timings -- Only if `return_raw_timings` is True. List with the
+                   array of all the timings for each N, in seconds.
+
+    truncated -- Only if `return_truncated` is True. True if a point was
+                 shrunk or skipped to fit in `time_budget`, i.e. if `n`
+                 does not reach `max_n`. Always False without time budget.
+    """
+
+    ns = _sample_ns(min_n, max_n, n_measures, sampling)
+    if ns.ndim == 2:
+        data_generator = _StarGenerator(data_generator)
+        if data_cache is not None:
+            _check_single('data_cache', min_n)
+        if time_budget is not None:
+            _check_single('time_budget', min_n)
+    if data_cache is not None:
+        _check_serial('data_cache', n_workers, executor, isolation)
+        data_generator = _use_data_cache(data_cache, data_generator, max_n,
+                                         prefetch=time_budget is None)
+    timing = Timing(n_repeats, n_timings, aggregate, target_precision,
+                    max_timings, autorange_duration, timer_strategy)
+    budget = None
+    if time_budget is not None:
+        _check_serial('time_budget', n_workers, executor, isolation)
+        budget = _TimeBudget(time_budget)
+        ns, execution_time, raw_timings = _measure_ns_budget(
+            func, data_generator, ns, timing, budget)
+    elif isolation:
+        with _isolation_context(isolation, n_workers, executor) as pool:
+            ns, execution_time, raw_timings = _measure_ns_isolated(
+                func, data_generator, ns, timing, pool)
+    else:
+        with _executor_context(n_workers, executor) as pool:
+            execution_time, raw_timings = _measure_ns(
+                func, data_generator, ns, timing, executor=pool)
+    result = (ns, execution_time)
+    if return_raw_timings:
+        result += (raw_timings,)
+    if return_truncated:
+        result += (budget is not None and budget.truncated,)
+    return result
+
+
+def measure_execution_time_async(func, data_generator,
+                                 min_n=100, max_n=100000, n_measures=10,
+                                 n_repeats=1, n_timings=1, concurrency=1,
+                                 loop=None, aggregate='min',
+                                 target_precision=None, max_timings=100,
+                                 autorange_duration=0.2, timer_strategy=None,
+                                 return_raw_timings=False):
+    """ Measure the execution time of a coroutine function for increasing N.
+
+    All the timings run on the same event loop. The timing loop itself runs
+    inside the event loop, so that the overhead per call is that of an
+    `await`. This function must not be called from a running event loop.
+
+    Input:
+    ------
+
+    func -- Coroutine function of which the execution time is measured.
+            The function is called as `await func(data)`, where data is
+            returned by the argument `data_generator`
+
+    data_generator -- Function returning input data of 'length' N.
+                      Input data for the argument `func` is created as
+                      `data_generator(N)`. Common data generators are defined
+                      in the submodule `big_o.datagen`
+
+    min_n, max_n, n_measures -- The execution time of func is measured
+                                at `n_measures` points between `min_n` and
+                                `max_n` (included)
+
+    n_repeats -- Number of times func is awaited to compute execution time
+                 (return the cumulative time of execution), or 'auto'.
+                 See `measure_execution_time`.
+
+    n_timings -- Number of times the timing measurement is repeated.
+                 The timings are reduced to a single execution time with
+                 `aggregate`.
+
+    concurrency -- Number of concurrent calls to func gathered with
+                   `asyncio.gather` in each repeat. The execution time is
+                   that of the whole batch, so that comparing different
+                   values measures how the throughput scales.
+                   Default: 1, calls are awaited one after the other.
+
+    loop -- The event loop used to run the coroutines. It is not closed
+            at the end of the measurements.
+            Default: None, a new event loop is created and closed at the end.
+
+    aggregate, target_precision, max_timings, autorange_duration,
+    timer_strategy -- How the timings at each N are taken and aggregated.
+                      See `measure_execution_time` for details.
+
+    return_raw_timings -- If True, also return all the timings for each N.
 
     Output:
     -------
@@ -38,41 +577,335 @@ def measure_execution_time(func, data_generator,
     n -- List of N's used as input to `data_generator`
 
     time -- List of total execution time for each N in seconds
+
+    raw_timings -- Only if `return_raw_timings` is True. List with the
+                   array of all the timings for each N, in seconds.
     """
+    timing = Timing(n_repeats, n_timings, aggregate, target_precision,
+                    max_timings, autorange_duration, timer_strategy)
+    ns = np.linspace(min_n, max_n, n_measures).astype('int64')
+
+    own_loop = loop is None
+    if own_loop:
+        loop = asyncio.new_event_loop()
+    try:
+        results = [timing.measure_async(func, data_generator, n, loop,
+                                        concurrency)
+                   for n in ns]
+    finally:
+        if own_loop:
+            loop.close()
+
+    execution_time = np.array([t for t, _ in results], dtype=float)
+    if return_raw_timings:
+        return ns, execution_time, [raw for _, raw in results]
+    return ns, execution_time
+
+
+def _current_rss():
+    """ Return the resident set size of this process in bytes.
+
+    On platforms without /proc, return the peak resident set size instead,
+    or NaN if it is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return np.nan
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def _measure_memory_n(func, data_generator, n):
+    """ Measure the peak memory allocated by `func` for a single value of N.
+
+    Output: (peak allocation in bytes, RSS delta in bytes)
+    """
+    data = data_generator(n)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        rss_before = _current_rss()
+        if hasattr(tracemalloc, 'reset_peak'):
+            # Python >= 3.9; before, tracing is restarted for each N unless
+            # it was already active
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func(data)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        rss_after = _current_rss()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return max(peak, 0), rss_after - rss_before
+
 
-    # we need a wrapper that holds a reference to func and the generated data
-    # for the timeit.Timer object
-    class func_wrapper(object):
+def measure_memory_usage(func, data_generator,
+                         min_n=100, max_n=100000, n_measures=10,
+                         rss=False, data_cache=None):
+    """ Measure the peak memory allocated by a function for increasing N.
 
-        def __init__(self, n):
-            self.data = data_generator(n)
+    The memory allocations are traced with `tracemalloc`. Memory allocated
+    by extension modules that bypass the Python allocators and do not
+    report to tracemalloc is only visible in the resident set size (RSS)
+    deltas.
 
-        def __call__(self):
-            return func(self.data)
+    Input:
+    ------
 
-    # TODO: check that max_n is not larger than max int64
+    func -- Function of which the memory usage is measured.
+            The function is called as func(data), where data is returned
+            by the argument `data_generator`
+
+    data_generator -- Function returning input data of 'length' N.
+                      Input data for the argument `func` is created as
+                      `data_generator(N)`. The memory used by the input data
+                      is not counted.
+
+    min_n, max_n, n_measures -- The memory usage of func is measured
+                                at `n_measures` points between `min_n` and
+                                `max_n` (included)
+
+    rss -- If True, also return the change of the resident set size of the
+           process during the call. Where the current RSS is not available
+           (e.g., on macOS), this is the change of the peak RSS.
+
+    data_cache -- A `big_o.datagen.DataCache` used to cache the input data.
+                  See `measure_execution_time`.
+
+    Output:
+    -------
+
+    n -- List of N's used as input to `data_generator`
+
+    memory -- List of the peak memory allocated for each N in bytes
+
+    rss_delta -- Only if `rss` is True. List of the changes of the resident
+                 set size for each N in bytes.
+    """
     ns = np.linspace(min_n, max_n, n_measures).astype('int64')
-    execution_time = np.empty(n_measures)
-    for i, n in enumerate(ns):
-        timer = Timer(func_wrapper(n))
-        measurements = timer.repeat(n_timings, n_repeats)
-        execution_time[i] = np.min(measurements)
+    if data_cache is not None:
+        data_generator = _use_data_cache(data_cache, data_generator, max_n)
+    results = [_measure_memory_n(func, data_generator, n) for n in ns]
+    memory = np.array([peak for peak, _ in results], dtype=float)
+    if rss:
+        return ns, memory, np.array([delta for _, delta in results],
+                                    dtype=float)
+    return ns, memory
+
+
+def measure_execution_time_adaptive(func, data_generator,
+                                    min_n=100, max_n=100000, n_measures=10,
+                                    n_repeats=1, n_timings=1,
+                                    classes=ALL_CLASSES, n_initial=4,
+                                    n_stable=3, n_workers=None,
+                                    executor=None, time_budget=None,
+                                    data_cache=None, aggregate='min',
+                                    target_precision=None, max_timings=100,
+                                    autorange_duration=0.2,
+                                    timer_strategy=None,
+                                    return_truncated=False):
+    """ Measure the execution time of a function at adaptively chosen N's.
+
+    The measurements start at `n_initial` geometrically spaced points
+    between `min_n` and `max_n`. New points are then added one at a time
+    where the two best fitting complexity classes disagree the most, until
+    the best class is the same for `n_stable` consecutive fits, or
+    `n_measures` points have been measured.
+
+    Input:
+    ------
+
+    func -- Function of which the execution time is measured.
+            The function is called as func(data), where data is returned
+            by the argument `data_generator`
+
+    data_generator -- Function returning input data of 'length' N.
+                      Input data for the argument `func` is created as
+                      `data_generator(N)`. Common data generators are defined
+                      in the submodule `big_o.datagen`
+
+    min_n, max_n -- The execution time of func is measured between `min_n`
+                    and `max_n` (included). Since the points are spaced
+                    geometrically, a `min_n` of 0 is measured from 1.
+
+    n_measures -- Maximum number of N's at which the execution time is
+                  measured
+
+    n_repeats -- Number of times func is called to compute execution time
+                 (return the cumulative time of execution). If 'auto', the
+                 number of calls is calibrated at each N so that a timing
+                 lasts at least `autorange_duration` seconds, and the
+                 execution time per call is returned.
+
+    n_timings -- Number of times the timing measurement is repeated.
+                 The timings are reduced to a single execution time with
+                 `aggregate`.
+
+    classes -- The complexity classes to consider. This is a list of subclasses
+               of `big_o.complexities.ComplexityClass`.
+               Default: all the classes in `big_o.complexities.ALL_CLASSES`
+
+    n_initial -- Number of geometrically spaced N's measured before the
+                 first fit
+
+    n_stable -- Number of consecutive fits with the same best class
+                after which the sampling stops
+
+    aggregate, target_precision, max_timings, autorange_duration,
+    timer_strategy -- How the timings at each N are taken and aggregated.
+                      See `measure_execution_time` for details.
+
+    n_workers, executor -- Run the initial measurements in parallel.
+                           See `measure_execution_time` for details.
+
+    time_budget -- Maximum wall-clock time in seconds for the whole sweep.
+                   No new point is added once its extrapolated cost would
+                   go over budget; the first two points are always
+                   measured. Not supported for parallel measurements.
+                   Default: None, no time limit.
+
+    data_cache -- A `big_o.datagen.DataCache` used to cache the input data
+                  generated by `data_generator`, so that it is not generated
+                  again by later sweeps. Not supported for parallel
+                  measurements.
+                  Default: None, data is generated for each measurement.
+
+    return_truncated -- If True, also return whether the sweep was cut
+                        short to fit in `time_budget`.
+
+    Output:
+    -------
+
+    n -- Sorted array of N's used as input to `data_generator`
+
+    time -- Array of total execution time for each N in seconds
+
+    truncated -- Only if `return_truncated` is True. True if a point was
+                 shrunk or skipped to fit in `time_budget`. Always False
+                 without time budget.
+    """
+    if data_cache is not None:
+        _check_serial('data_cache', n_workers, executor)
+        data_generator = _use_data_cache(data_cache, data_generator, max_n,
+                                         prefetch=time_budget is None)
+    budget = None
+    if time_budget is not None:
+        _check_serial('time_budget', n_workers, executor)
+        budget = _TimeBudget(time_budget)
+    timing = Timing(n_repeats, n_timings, aggregate, target_precision,
+                    max_timings, autorange_duration, timer_strategy)
+    ns, execution_time, _ = _measure_adaptive(
+        func, data_generator, min_n, max_n, n_measures, timing, classes,
+        n_initial, n_stable, n_workers, executor, budget)
+    if return_truncated:
+        return ns, execution_time, budget is not None and budget.truncated
     return ns, execution_time
 
 
-def infer_big_o_class(ns, time, classes=ALL_CLASSES, verbose=False, simplicity_bias=1e-6):
+def _measure_adaptive(func, data_generator, min_n, max_n, n_measures,
+                      timing, classes, n_initial, n_stable, n_workers,
+                      executor, budget):
+    """ Implementation of `measure_execution_time_adaptive`.
+
+    `timing` is a `big_o.timing.Timing` instance, and `budget` is a
+    `_TimeBudget` instance, or None for no time limit.
+
+    Output: (ns, time, raw_timings), see `_measure_ns_budget`.
+    """
+    n_initial = max(2, min(n_initial, n_measures))
+    # a geometric sequence cannot start at 0
+    ns = np.unique(np.geomspace(max(min_n, 1), max_n,
+                                n_initial).astype('int64'))
+    if budget is not None:
+        ns, execution_time, raw_timings = _measure_ns_budget(
+            func, data_generator, ns, timing, budget)
+        if budget.truncated or len(ns) < 2:
+            return ns, execution_time, raw_timings
+    else:
+        with _executor_context(n_workers, executor) as pool:
+            execution_time, raw_timings = _measure_ns(
+                func, data_generator, ns, timing, executor=pool)
+
+    classifier = IncrementalClassifier(classes).update_many(ns, execution_time)
+    previous_class = None
+    n_same = 0
+    while len(ns) < n_measures:
+        best = classifier.best
+        if type(best) is previous_class:
+            n_same += 1
+        else:
+            previous_class = type(best)
+            n_same = 1
+        if n_same >= n_stable:
+            break
+
+        n = _most_ambiguous_n(ns, best, classifier.runner_up)
+        if n is None:
+            break
+        if budget is None:
+            t, raw = _measure_n(timing, func, data_generator, n)
+        elif budget.largest_n_within(n) < n:
+            budget.truncated = True
+            break
+        else:
+            t, raw = budget.measure(timing, func, data_generator, n)
+        idx = np.searchsorted(ns, n)
+        ns = np.insert(ns, idx, n)
+        execution_time = np.insert(execution_time, idx, t)
+        raw_timings.insert(idx, raw)
+        classifier.update(n, t)
+
+    return ns, execution_time, raw_timings
+
+
+def _most_ambiguous_n(ns, best, runner_up):
+    """ Return the N at which the best and runner-up classes disagree most.
+
+    Candidates are the geometric midpoints between measured N's. Return None
+    if there are no unmeasured candidates or fitted classes to compare.
+    """
+    candidates = np.sqrt(ns[:-1].astype(float) * ns[1:]).round()
+    candidates = np.setdiff1d(candidates.astype('int64'), ns)
+    if best is None or runner_up is None or len(candidates) == 0:
+        return None
+
+    with np.errstate(all='ignore'):
+        t_best = best.compute(candidates)
+        t_other = runner_up.compute(candidates)
+        disagreement = np.abs(t_best - t_other) / np.maximum(
+            np.abs(t_best), np.finfo(float).tiny)
+    disagreement = np.nan_to_num(disagreement, nan=np.inf)
+    return candidates[np.argmax(disagreement)]
+
+
+def infer_big_o_class(ns, time, classes=ALL_CLASSES, verbose=False, simplicity_bias=None,
+                      criterion='bic', resampling=None, n_resamples=1000,
+                      confidence_level=0.95):
     """Infer the complexity class from execution times.
 
     Input:
     ------
 
     ns -- Array of values of N for which execution time has been measured.
+          For several size parameters, an array with one row per
+          measurement and one column per size parameter.
 
     time -- Array of execution times for each N in seconds.
 
     classes -- The complexity classes to consider. This is a list of subclasses
                of `big_o.complexities.ComplexityClass`.
-               Default: all the classes in `big_o.complexities.ALL_CLASSES`
+               Default: all the classes in `big_o.complexities.ALL_CLASSES`,
+               or in `big_o.complexities.ALL_CLASSES_NM` if `ns` has two
+               size parameters.
 
     verbose -- If True, print parameters and residuals of the fit for each
                complexity class
@@ -81,7 +914,27 @@ def infer_big_o_class(ns, time, classes=ALL_CLASSES, verbose=False, simplicity_b
                        the difference between residuals is less than the
                        simplicity_bias. If simplicity_bias is 0, the
                        complexity class with the lowest residuals is
-                       always chosen.
+                       always chosen. Only used with
+                       `criterion='residuals'`; a warning is issued if it
+                       is given with another criterion, whose scores
+                       already favor simpler classes.
+                       Default: None, 1e-6 with `criterion='residuals'`.
+
+    criterion -- How the best class is selected, see `big_o.selection`:
+                 'bic' (default) or 'aic' for the Bayesian or Akaike
+                 information criterion, 'cv' for leave-one-out
+                 cross-validation, or 'residuals' for the lowest residuals
+                 up to `simplicity_bias`.
+
+    resampling -- If 'bootstrap' or 'jackknife', all classes are refitted
+                  to resamples of the measurements, see
+                  `big_o.complexities.ComplexityClass.confidence_interval`.
+                  Default: None, no resampling.
+
+    n_resamples -- Number of bootstrap resamples
+
+    confidence_level -- Probability covered by the confidence intervals
+                        of the coefficients
 
     Output:
     -------
@@ -89,33 +942,478 @@ def infer_big_o_class(ns, time, classes=ALL_CLASSES, verbose=False, simplicity_b
     best_class -- Object representing the complexity class that best fits
                   the measured execution times.
                   Instance of `big_o.complexities.ComplexityClass`.
+                  Its `confidence` attribute is the probability that it is
+                  the best class among `classes` (NaN for
+                  `criterion='residuals'`).
 
-    fitted -- A dictionary of fittest complexity classes to the fit residuals
+    fitted -- A dictionary of fittest complexity classes to the fit residuals.
+              With resampling, each class has a `coeff_interval` attribute
+              with the (lower, upper) bounds of its coefficients, and a
+              `selection_frequency` attribute with the fraction of the
+              resamples in which it is the best class.
     """
 
+    if classes is ALL_CLASSES and np.ndim(ns) == 2:
+        classes = ALL_CLASSES_NM
+    classes = list(classes)
+    simplicity_bias = _simplicity_bias(simplicity_bias, criterion)
+    coeffs, residuals, covariances = fit_classes(classes, ns, time,
+                                                 covariance=True)
+    best_idx, probabilities = _select(classes, ns, time, residuals,
+                                      criterion, simplicity_bias)
+
     best_class = None
-    best_residuals = np.inf
     fitted = {}
-    for class_ in classes:
+    for i, class_ in enumerate(classes):
         inst = class_()
-        residuals = inst.fit(ns, time)
-        fitted[inst] = residuals
-
-        # NOTE: subtract bias for tiny preference for simpler methods
-        # TODO: improve simplicity bias (AIC/BIC)?
-        if residuals < best_residuals - simplicity_bias:
-            best_residuals = residuals
+        inst.coeff = coeffs[i]
+        inst.coeff_cov = covariances[i]
+        inst.confidence = probabilities[i]
+        fitted[inst] = residuals[i]
+        if i == best_idx:
             best_class = inst
         if verbose:
-            print(inst, '(r={:f})'.format(residuals))
+            print(inst, '(r={:f})'.format(residuals[i]))
+
+    if resampling is not None:
+        _resample(list(fitted), ns, time, resampling, n_resamples,
+                  confidence_level, criterion, simplicity_bias)
     return best_class, fitted
 
 
+def _resample(instances, ns, time, method, n_resamples, confidence_level,
+              criterion, simplicity_bias):
+    """ Set the resampling attributes of fitted complexity classes.
+
+    See `infer_big_o_class` for the arguments.
+    """
+    classes = [type(inst) for inst in instances]
+    time = np.asanyarray(time, dtype=float)
+    indices = resample_indices(len(time), n_resamples, method)
+    coeffs, residuals, loo = fit_classes_resampled(
+        classes, ns, time, indices, loo=(criterion == 'cv'))
+    best_idx, _ = _select(classes, ns, time[indices].T, residuals,
+                          criterion, simplicity_bias, loo=loo)
+    for i, inst in enumerate(instances):
+        inst.coeff_interval = coefficient_interval(
+            inst, coeffs[i], confidence_level, method)
+        inst.selection_frequency = float(np.mean(best_idx == i))
+
+
+class IncrementalClassifier(object):
+    """ Infer the complexity class from measurements arriving one at a time.
+
+    For each complexity class, the classifier keeps the sufficient
+    statistics of the least squares fit (X^T X, X^T y and y^T y), and the
+    number of measurements and the sum of their squared times are kept for
+    the selection criterion, so that adding a measurement and refitting
+    cost a constant time per class, independently of the number of
+    measurements.
+
+    Two cases depend on every measurement, and take a time linear in their
+    number: the residuals of classes that fit a transformed time (e.g.,
+    Polynomial and Exponential, which fit log(t)) are measured on the
+    original time scale, as in `infer_big_o_class`, and are recomputed from
+    all the measurements; and the 'cv' criterion recomputes the
+    leave-one-out errors.
+
+    Example:
+    --------
+
+    >>> classifier = IncrementalClassifier()
+    >>> for n in ns:
+    ...     classifier.update(n, measure(n))
+    ...     print(classifier.best)
+    """
+
+    def __init__(self, classes=ALL_CLASSES, simplicity_bias=None,
+                 criterion='bic'):
+        """
+        Input:
+        ------
+
+        classes -- The complexity classes to consider. This is a list of
+                   subclasses of `big_o.complexities.ComplexityClass`.
+                   Default: all the classes in
+                   `big_o.complexities.ALL_CLASSES`
+
+        simplicity_bias -- Preference toward choosing simpler methods.
+                           See `infer_big_o_class`.
+
+        criterion -- How the best class is selected. See
+                     `infer_big_o_class`.
+        """
+        self.classes = list(classes)
+        self.simplicity_bias = _simplicity_bias(simplicity_bias, criterion)
+        self.criterion = criterion
+        self._instances = [class_() for class_ in self.classes]
+        self._xtx = []
+        self._xty = []
+        self._yty = np.zeros(len(self.classes))
+        self._n_coeffs = []
+        for inst in self._instances:
+            n_coeff = inst._transform_n(np.ones(1)).shape[1]
+            self._xtx.append(np.zeros((n_coeff, n_coeff)))
+            self._xty.append(np.zeros(n_coeff))
+            self._n_coeffs.append(n_coeff)
+        self._n_points = 0
+        self._sum_t2 = 0.
+        # measurements, in arrays that grow by doubling, for the residuals
+        # that cannot be computed from the sufficient statistics
+        self._ns = np.empty(16)
+        self._times = np.empty(16)
+        self._fitted = None
+        self._best = None
+        self._scores = None
+
+    @property
+    def n_points(self):
+        """ Number of measurements added so far. """
+        return self._n_points
+
+    @property
+    def ns(self):
+        return self._ns[:self._n_points].copy()
+
+    @property
+    def times(self):
+        return self._times[:self._n_points].copy()
+
+    def update(self, n, t):
+        """ Add the execution time `t` in seconds measured at `n`. """
+        n_array = np.array([n], dtype=float)
+        for i, inst in enumerate(self._instances):
+            x = inst._transform_n(n_array)[0]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                y = inst._transform_time(t)
+            self._xtx[i] += np.outer(x, x)
+            self._xty[i] += x * y
+            self._yty[i] += y * y
+        if self._n_points == len(self._ns):
+            self._ns = np.resize(self._ns, 2 * len(self._ns))
+            self._times = np.resize(self._times, 2 * len(self._times))
+        self._ns[self._n_points] = n
+        self._times[self._n_points] = t
+        self._n_points += 1
+        self._sum_t2 += t * t
+        self._fitted = None
+        return self
+
+    def update_many(self, ns, times):
+        """ Add several measurements at once. """
+        for n, t in zip(ns, times):
+            self.update(n, t)
+        return self
+
+    @property
+    def best(self):
+        """ Complexity class that best fits the measurements so far.
+
+        Instance of `big_o.complexities.ComplexityClass`, or None if no
+        class could be fitted.
+        """
+        self._fit()
+        return self._best
+
+    @property
+    def runner_up(self):
+        """ Complexity class that would be selected without the best one,
+        ranked with the same criterion.
+
+        Instance of `big_o.complexities.ComplexityClass`, or None if no
+        other class could be fitted.
+        """
+        self._fit()
+        if self._best is None:
+            return None
+        scores = self._scores.copy()
+        scores[self._instances.index(self._best)] = np.nan
+        idx = int(_select_best(scores, self.simplicity_bias))
+        return self._instances[idx] if idx >= 0 else None
+
+    @property
+    def fitted(self):
+        """ Dictionary of the fitted complexity classes to the residuals. """
+        self._fit()
+        return self._fitted
+
+    def _fit(self):
+        if self._fitted is not None:
+            return
+
+        # views of the measurements, only read by the cases that depend on
+        # every measurement
+        ns = self._ns[:self._n_points]
+        times = self._times[:self._n_points]
+        residuals = np.empty(len(self.classes))
+        for i, inst in enumerate(self._instances):
+            xtx, xty = self._xtx[i], self._xty[i]
+            # scale the normal equations to improve their conditioning
+            with np.errstate(invalid='ignore', divide='ignore'):
+                scale = np.sqrt(np.diag(xtx))
+                scale[~(scale > 0)] = 1.
+                z = np.linalg.lstsq(xtx / np.outer(scale, scale),
+                                    xty / scale, rcond=None)[0]
+            # the instances are renewed, so that previously returned
+            # objects keep their coefficients
+            inst = self._instances[i] = type(inst)()
+            inst.coeff = z / scale
+            n_coeffs = len(inst.coeff)
+            # residuals of the transformed times, from the statistics
+            rss = max(self._yty[i] - 2 * inst.coeff @ xty
+                      + inst.coeff @ xtx @ inst.coeff, 0.)
+            if self.n_points > n_coeffs:
+                sigma2 = rss / (self.n_points - n_coeffs)
+                inst.coeff_cov = (sigma2 * np.linalg.pinv(xtx), sigma2)
+            if inst._recalculate_fit_residuals:
+                with np.errstate(invalid='ignore', over='ignore'):
+                    residuals[i] = np.sum((inst.compute(ns) - times) ** 2)
+            else:
+                residuals[i] = rss
+
+        if self.criterion == 'cv':
+            self._scores = selection.scores(self.classes, ns, times,
+                                            residuals, self.criterion)
+        else:
+            self._scores = selection.scores_from_sums(
+                residuals, self._n_points, self._sum_t2, self._n_coeffs,
+                self.criterion)
+        best_idx, probabilities = _select_scores(
+            self._scores, self.criterion, self.simplicity_bias)
+        for inst, probability in zip(self._instances, probabilities):
+            inst.confidence = probability
+        best_idx = int(best_idx)
+        self._best = self._instances[best_idx] if best_idx >= 0 else None
+        self._fitted = {inst: residuals[i]
+                        for i, inst in enumerate(self._instances)}
+
+
+def infer_big_o_class_many(ns, times, classes=ALL_CLASSES,
+                           simplicity_bias=None, criterion='bic',
+                           return_confidence=False):
+    """Infer the complexity class of many timing series at once.
+
+    No `ComplexityClass` object is created for the individual series: all
+    series measured at the same N's are fitted together.
+
+    Input:
+    ------
+
+    ns -- Array of values of N shared by all series, or a list with one
+          array of N's per series (the series can have different lengths).
+
+    times -- 2-D array of execution times in seconds, with one series per
+             row, or a list of arrays of execution times, one per series.
+             Series are matched with the N's in `ns` by position. Each
+             series must have at least as many points as the class with
+             the most coefficients, or a ValueError is raised.
+
+    classes -- The complexity classes to consider. This is a list of subclasses
+               of `big_o.complexities.ComplexityClass`.
+               Default: all the classes in `big_o.complexities.ALL_CLASSES`
+
+    simplicity_bias -- Preference toward choosing simpler methods when
+                       the difference between residuals is less than the
+                       simplicity_bias. See `infer_big_o_class`.
+
+    criterion -- How the best class is selected. See `infer_big_o_class`.
+
+    return_confidence -- If True, also return the probability of the best
+                         class of each series
+
+    Output:
+    -------
+
+    best_idx -- Array with the index in `classes` of the complexity class
+                that best fits each series. The index is -1 if no class
+                could be fitted. All the outputs are empty if there are
+                no series.
+
+    residuals -- Array of shape (number of series, number of classes) with
+                 the fit residuals of each class for each series
+
+    confidence -- Only if `return_confidence` is True: array with the
+                  probability that the selected class is the best one,
+                  for each series (NaN if no class could be fitted)
+    """
+    classes = list(classes)
+    simplicity_bias = _simplicity_bias(simplicity_bias, criterion)
+
+    ns_array = np.asanyarray(ns) if _is_shared_grid(ns) else None
+    if len(times) == 0 and (ns_array is not None or len(ns) == 0):
+        best_idx = np.empty(0, dtype=int)
+        residuals = np.empty((0, len(classes)))
+        if return_confidence:
+            return best_idx, residuals, np.empty(0)
+        return best_idx, residuals
+
+    if ns_array is not None:
+        _check_n_points(classes, ns_array)
+        times = np.asanyarray(times, dtype=float)
+        if times.ndim == 1:
+            times = times[np.newaxis, :]
+        _, residuals = fit_classes(classes, ns_array, times.T)
+        best_idx, probabilities = _select(classes, ns_array, times.T,
+                                          residuals, criterion,
+                                          simplicity_bias)
+        residuals = residuals.T
+    else:
+        if len(ns) != len(times):
+            raise ValueError('ns and times must contain the same number '
+                             'of series')
+        # group series with identical N's, so that they are fitted together
+        groups = {}
+        for i, series_ns in enumerate(ns):
+            series_ns = np.asanyarray(series_ns)
+            key = (series_ns.dtype.str, series_ns.tobytes())
+            groups.setdefault(key, (series_ns, []))[1].append(i)
+
+        residuals = np.empty((len(times), len(classes)))
+        probabilities = np.empty((len(classes), len(times)))
+        best_idx = np.empty(len(times), dtype=int)
+        for series_ns, indices in groups.values():
+            _check_n_points(classes, series_ns)
+            group_times = np.array([times[i] for i in indices], dtype=float)
+            _, group_residuals = fit_classes(classes, series_ns,
+                                             group_times.T)
+            best_idx[indices], probabilities[:, indices] = _select(
+                classes, series_ns, group_times.T, group_residuals,
+                criterion, simplicity_bias)
+            residuals[indices] = group_residuals.T
+
+    if return_confidence:
+        confidence = np.full(best_idx.shape, np.nan)
+        found = best_idx >= 0
+        confidence[found] = probabilities[best_idx[found],
+                                          np.flatnonzero(found)]
+        return best_idx, residuals, confidence
+    return best_idx, residuals
+
+
+def _check_n_points(classes, ns):
+    """ Raise a ValueError if there are fewer N's in `ns` than coefficients
+    in one of the `classes`. """
+    n_dims = ns.shape[1] if ns.ndim == 2 else 1
+    n_coeffs = max((selection.n_coefficients(class_, n_dims)
+                    for class_ in classes), default=1)
+    if len(ns) < n_coeffs:
+        raise ValueError('Each series must have at least {} points to fit '
+                         'the complexity classes, got {}'.format(
+                             n_coeffs, len(ns)))
+
+
+def _is_shared_grid(ns):
+    """ Return True if `ns` is a single 1-D sequence of N's. """
+    if isinstance(ns, np.ndarray):
+        return ns.ndim == 1
+    return len(ns) == 0 or np.ndim(ns[0]) == 0
+
+
+def _simplicity_bias(simplicity_bias, criterion):
+    """ Return the simplicity bias used with `criterion`, warning if one
+    was given for a criterion that does not use it. """
+    if criterion != 'residuals':
+        if simplicity_bias is not None:
+            warnings.warn("simplicity_bias is only used with "
+                          "criterion='residuals', not {!r}".format(criterion),
+                          stacklevel=3)
+        return 0.
+    return 1e-6 if simplicity_bias is None else simplicity_bias
+
+
+def _select(classes, ns, time, residuals, criterion, simplicity_bias,
+            loo=None):
+    """ Select the best class with a `big_o.selection` criterion.
+
+    Output: (best_idx, probabilities), where `best_idx` is as returned by
+    `_select_best` and `probabilities` has the shape of `residuals`.
+    """
+    scores = selection.scores(classes, ns, time, residuals, criterion,
+                              loo=loo)
+    return _select_scores(scores, criterion, simplicity_bias)
+
+
+def _select_scores(scores, criterion, simplicity_bias):
+    """ Select the best class from the `big_o.selection` scores of each
+    class. See `_select` for the output. """
+    if criterion != 'residuals':
+        # ties in the scores already favor the simpler class
+        simplicity_bias = 0.
+    best_idx = _select_best(scores, simplicity_bias)
+    return best_idx, selection.confidence(scores, criterion)
+
+
+def _select_best(residuals, simplicity_bias):
+    """ Return the index of the best class for each series of residuals.
+
+    `residuals` has shape (number of classes, ...), with classes in order of
+    preference. The index is -1 if no class has finite residuals.
+    """
+    best_idx = np.full(residuals.shape[1:], -1)
+    best_residuals = np.full(residuals.shape[1:], np.inf)
+    for i, class_residuals in enumerate(residuals):
+        # NOTE: subtract bias for tiny preference for simpler methods
+        better = class_residuals < best_residuals - simplicity_bias
+        best_idx = np.where(better, i, best_idx)
+        best_residuals = np.where(better, class_residuals, best_residuals)
+    return best_idx
+
+
+def _measure_sweep(func, data_generator, min_n, max_n, n_measures, timing,
+                   classes, sampling, n_workers, executor, budget, data_cache,
+                   metric, isolation=None):
+    """ Measure the execution time (or the memory usage, if `metric` is
+    'memory') of `func` with the options of `big_o`.
+
+    Output: (ns, time, failures), with `failures` the list of (N, message)
+    of the N's that failed in isolated workers, or None without isolation.
+    """
+    if data_cache is not None:
+        _check_serial('data_cache', n_workers, executor, isolation)
+        data_generator = _use_data_cache(data_cache, data_generator, max_n,
+                                         prefetch=budget is None)
+
+    if metric == 'memory':
+        ns, memory = measure_memory_usage(func, data_generator, min_n, max_n,
+                                          n_measures)
+        return ns, memory, None
+
+    if sampling == 'adaptive':
+        ns, time, _ = _measure_adaptive(
+            func, data_generator, min_n, max_n, n_measures, timing, classes,
+            n_initial=4, n_stable=3, n_workers=n_workers, executor=executor,
+            budget=budget)
+        return ns, time, None
+    ns = _sample_ns(min_n, max_n, n_measures, sampling)
+    if ns.ndim == 2:
+        data_generator = _StarGenerator(data_generator)
+    if budget is not None:
+        ns, time, _ = _measure_ns_budget(func, data_generator, ns, timing,
+                                         budget)
+        return ns, time, None
+    if isolation:
+        with _isolation_context(isolation, n_workers, executor) as pool:
+            ns, time, _ = _measure_ns_isolated(func, data_generator, ns,
+                                               timing, pool)
+        return ns, time, pool.failures
+    with _executor_context(n_workers, executor) as pool:
+        time, _ = _measure_ns(func, data_generator, ns, timing, executor=pool)
+    return ns, time, None
+
+
 def big_o(func, data_generator,
           min_n=100, max_n=100000, n_measures=10,
-          n_repeats=1, n_timings=1, classes=ALL_CLASSES, verbose=False, return_raw_data=False):
+          n_repeats=1, n_timings=1, classes=ALL_CLASSES, verbose=False, return_raw_data=False,
+          n_workers=None, executor=None, sampling='linear', time_budget=None,
+          data_cache=None, result_cache=None, aggregate='min',
+          target_precision=None, max_timings=100, autorange_duration=0.2,
+          metric='time', timer_strategy=None, criterion='bic',
+          isolation=None):
     """ Estimate time complexity class of a function from execution time.
 
+    With `metric='memory'`, estimate the space complexity class from the
+    peak memory allocated by the function instead.
+
     Input:
     ------
 
@@ -130,17 +1428,25 @@ def big_o(func, data_generator,
 
     min_n, max_n, n_measures -- The execution time of func is measured
                                 at `n_measures` points between `min_n` and
-                                `max_n` (included)
+                                `max_n` (included). `min_n` and `max_n`
+                                can be sequences with one value per size
+                                parameter; see `measure_execution_time`.
 
     n_repeats -- Number of times func is called to compute execution time
-                 (return the cumulative time of execution)
+                 (return the cumulative time of execution). If 'auto', the
+                 number of calls is calibrated at each N so that a timing
+                 lasts at least `autorange_duration` seconds, and the
+                 execution time per call is returned.
 
     n_timings -- Number of times the timing measurement is repeated.
-                 The minimum time for all the measurements is kept.
+                 The timings are reduced to a single execution time with
+                 `aggregate`.
 
     classes -- The complexity classes to consider. This is a list of subclasses
                of `big_o.complexities.ComplexityClass`.
-               Default: all the classes in `big_o.complexities.ALL_CLASSES`
+               Default: all the classes in `big_o.complexities.ALL_CLASSES`,
+               or in `big_o.complexities.ALL_CLASSES_NM` for two size
+               parameters.
 
     verbose -- If True, print parameters and residuals of the fit for each
                complexity class
@@ -151,6 +1457,63 @@ def big_o(func, data_generator,
                        contain the entries:
                        {... 'measures': [<int>+], 'times': [<float>+] ...}
 
+    n_workers -- If given, distribute the measurements over a pool of
+                 `n_workers` worker processes.
+                 See `measure_execution_time` for details.
+
+    executor -- A `concurrent.futures.Executor` used to run the
+                measurements, as an alternative to `n_workers`.
+
+    sampling -- Strategy used to choose the N's at which the execution time
+                is measured. If 'linear', `n_measures` points are measured
+                on a linear grid. If 'adaptive', at most `n_measures` points
+                are chosen adaptively; see `measure_execution_time_adaptive`.
+                If 'lhs', `n_measures` points are drawn by Latin hypercube
+                sampling, which is useful for several size parameters.
+
+    time_budget -- Maximum wall-clock time in seconds for the measurements.
+                   Points that would go over budget are shrunk or skipped,
+                   and the best class is inferred from the points measured
+                   so far. When a time budget is given, fitted contains the
+                   entry {... 'truncated': <bool> ...}, which is True if the
+                   sweep was cut short.
+                   Default: None, no time limit.
+
+    data_cache -- A `big_o.datagen.DataCache` used to cache the input data
+                  generated by `data_generator`, so that it is not generated
+                  again by later sweeps. Not supported for parallel
+                  measurements.
+                  Default: None, data is generated for each measurement.
+
+    result_cache -- A `big_o.cache.ResultCache` storing the measurements on
+                    disk. If the cache contains measurements for the same
+                    code of `func` and `data_generator`, with the same
+                    parameters and on the same platform, they are reused
+                    and no timing is done. Sweeps cut short by
+                    `time_budget` are not stored.
+                    Default: None, always measure the execution time.
+
+    aggregate, target_precision, max_timings, autorange_duration,
+    timer_strategy -- How the timings at each N are taken and aggregated.
+                      See `measure_execution_time` for details.
+
+    metric -- Quantity measured for increasing N: 'time' for the execution
+              time (default), or 'memory' for the peak memory allocated
+              by the function, as measured by `measure_memory_usage`.
+              The fitted complexity classes then describe memory in bytes.
+              The memory metric supports only linear sampling, without time
+              budget or parallel measurements.
+
+    criterion -- How the best class is selected: 'bic' (default), 'aic',
+                 'cv' or 'residuals'. See `infer_big_o_class`.
+
+    isolation -- If True, or a `big_o.isolation.WorkerPool`, measure each N
+                 in a fresh worker process. When isolation is used, fitted
+                 contains the entry {... 'failures': [(<N>, <str>)*] ...},
+                 listing the N's that failed and why. Not supported for
+                 adaptive sampling. See `measure_execution_time`.
+                 Default: None, no isolation.
+
     Output:
     -------
 
@@ -161,10 +1524,120 @@ def big_o(func, data_generator,
     fitted -- A dictionary of fittest complexity classes to the fit residuals
     """
 
-    ns, time = measure_execution_time(func, data_generator,
-                                      min_n, max_n, n_measures, n_repeats,
-                                      n_timings)
-    best, fitted = infer_big_o_class(ns, time, classes, verbose=verbose)
+    if sampling not in ('linear', 'adaptive', 'lhs'):
+        raise ValueError('Unknown sampling strategy: {!r}'.format(sampling))
+    if _is_multi(min_n):
+        if sampling == 'adaptive':
+            _check_single("sampling='adaptive'", min_n)
+        for option, value in (('time_budget', time_budget),
+                              ('data_cache', data_cache)):
+            if value is not None:
+                _check_single(option, min_n)
+        if metric != 'time':
+            _check_single("metric='memory'", min_n)
+        if classes is ALL_CLASSES:
+            classes = ALL_CLASSES_NM
+    if metric not in ('time', 'memory'):
+        raise ValueError('Unknown metric: {!r}'.format(metric))
+    if metric == 'memory':
+        _check_serial("metric='memory'", n_workers, executor, isolation)
+        if sampling != 'linear' or time_budget is not None:
+            raise ValueError("metric='memory' supports only linear sampling "
+                             "without time budget")
+    timing = Timing(n_repeats, n_timings, aggregate, target_precision,
+                    max_timings, autorange_duration, timer_strategy)
+    if isolation and sampling == 'adaptive':
+        raise ValueError("isolation is not supported for "
+                         "sampling='adaptive'")
+    budget = None
+    if time_budget is not None:
+        _check_serial('time_budget', n_workers, executor, isolation)
+        budget = _TimeBudget(time_budget)
+
+    cached = None
+    failures = None
+    if result_cache is not None:
+        cache_params = {
+            'sampling': sampling, 'min_n': min_n, 'max_n': max_n,
+            'n_measures': n_measures, 'n_repeats': n_repeats,
+            'n_timings': n_timings, 'aggregate': aggregate,
+            'target_precision': target_precision, 'max_timings': max_timings,
+            'autorange_duration': autorange_duration, 'metric': metric,
+            'timer_strategy': repr(timing.timer_strategy),
+            'classes': [class_.__name__ for class_ in classes],
+        }
+        cached = result_cache.get(func, data_generator, cache_params)
+
+    if cached is not None:
+        ns, time = cached
+    else:
+        ns, time, failures = _measure_sweep(
+            func, data_generator, min_n, max_n, n_measures, timing, classes,
+            sampling, n_workers, executor, budget, data_cache, metric,
+            isolation)
+        if (result_cache is not None and not (budget and budget.truncated)
+                and not failures):
+            result_cache.put(func, data_generator, cache_params, ns, time)
+
+    best, fitted = infer_big_o_class(ns, time, classes, verbose=verbose,
+                                     criterion=criterion)
+    if metric == 'memory':
+        for inst in fitted:
+            inst.quantity, inst.units = 'memory', 'bytes'
+
+    if return_raw_data:
+        fitted['measures'] = ns
+        fitted['times'] = time
+    if budget is not None:
+        fitted['truncated'] = budget.truncated
+    if isolation:
+        fitted['failures'] = failures or []
+
+    return best, fitted
+
+
+def async_big_o(func, data_generator,
+                min_n=100, max_n=100000, n_measures=10,
+                n_repeats=1, n_timings=1, classes=ALL_CLASSES, verbose=False,
+                return_raw_data=False, concurrency=1, loop=None,
+                aggregate='min', target_precision=None, max_timings=100,
+                autorange_duration=0.2, timer_strategy=None, criterion='bic'):
+    """ Estimate time complexity class of a coroutine function from execution
+    time.
+
+    This is the equivalent of `big_o` for `async def` functions; the
+    execution times are measured with `measure_execution_time_async`.
+
+    Input:
+    ------
+
+    func -- Coroutine function of which the execution time is measured.
+            The function is called as `await func(data)`, where data is
+            returned by the argument `data_generator`
+
+    data_generator, min_n, max_n, n_measures, n_repeats, n_timings,
+    classes, verbose, return_raw_data, criterion -- See `big_o`.
+
+    concurrency, loop, aggregate, target_precision, max_timings,
+    autorange_duration, timer_strategy --
+                      See `measure_execution_time_async`.
+
+    Output:
+    -------
+
+    best_class -- Object representing the complexity class that best fits
+                  the measured execution times.
+                  Instance of `big_o.complexities.ComplexityClass`.
+
+    fitted -- A dictionary of fittest complexity classes to the fit residuals
+    """
+    ns, time = measure_execution_time_async(
+        func, data_generator, min_n, max_n, n_measures, n_repeats, n_timings,
+        concurrency=concurrency, loop=loop, aggregate=aggregate,
+        target_precision=target_precision, max_timings=max_timings,
+        autorange_duration=autorange_duration, timer_strategy=timer_strategy)
+    best, fitted = infer_big_o_class(ns, time, classes, verbose=verbose,
+                                     criterion=criterion)
 
     if return_raw_data:
         fitted['measures'] = ns
@@ -0,0 +1,250 @@
+"""Persistent on-disk cache of execution time measurements."""
+
+import functools
+import hashlib
+import json
+import platform
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+import numpy as np
+
+
+def _code_hash(obj):
+    """ Return a hash of the code of a function or callable object.
+
+    The hash depends on the bytecode, constants, names and default
+    arguments, but not on line numbers. Objects without Python code
+    (e.g., builtins) are identified by their qualified name only. The hash
+    of a partial function is the hash of the function it wraps.
+    """
+    if isinstance(obj, functools.partial):
+        return _code_hash(obj.func)
+    h = hashlib.sha256()
+    code = getattr(obj, '__code__', None)
+    if code is None and not isinstance(obj, type):
+        # callable object: hash the code of its __call__ method
+        code = getattr(getattr(type(obj), '__call__', None), '__code__', None)
+    if code is not None:
+        _update_code_hash(h, code)
+        defaults = getattr(obj, '__defaults__', None)
+        h.update(repr(defaults).encode())
+    else:
+        h.update(_qualified_name(obj).encode())
+    return h.hexdigest()
+
+
+def _update_code_hash(h, code):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _update_code_hash(h, const)
+        else:
+            h.update(repr(const).encode())
+
+
+def _qualified_name(obj):
+    if not hasattr(obj, '__qualname__'):
+        obj = type(obj)
+    return '{}.{}'.format(getattr(obj, '__module__', None), obj.__qualname__)
+
+
+def _stable_repr(value):
+    """ Return repr(value) if it identifies the value across runs, or None.
+
+    Representations including a memory address, or abbreviated ones (e.g.,
+    of large arrays), do not identify the value.
+    """
+    text = repr(value)
+    if ' at 0x' in text or '...' in text:
+        return None
+    return text
+
+
+def _function_id(func):
+    """ Return the identity of a function across runs, or None if it cannot
+    be identified reliably.
+
+    Lambdas have no distinctive name, and are identified by their code.
+    Partial functions are identified by the function they wrap and by their
+    arguments. Callable objects are identified by the output of their
+    `cache_key()` method, if they define one; other callable objects with
+    attributes are not identified, since their state is not part of the key.
+    """
+    if isinstance(func, functools.partial):
+        inner = _function_id(func.func)
+        args = _stable_repr((func.args, sorted(func.keywords.items())))
+        if inner is None or args is None:
+            return None
+        return 'functools.partial({}, {})'.format(inner, args)
+    func_id = _qualified_name(func)
+    if callable(getattr(func, 'cache_key', None)) and not isinstance(func, type):
+        key = _stable_repr(func.cache_key())
+        return None if key is None else func_id + ':' + key
+    if not hasattr(func, '__qualname__') and getattr(func, '__dict__', None):
+        return None
+    if getattr(func, '__name__', None) == '<lambda>':
+        func_id += ':' + _code_hash(func)
+    return func_id
+
+
+def platform_fingerprint():
+    """ Return a string identifying the interpreter and the platform. """
+    return '|'.join([
+        platform.python_implementation(),
+        sys.version,
+        platform.platform(),
+        platform.machine(),
+        platform.processor(),
+        np.__version__,
+    ])
+
+
+class ResultCache(object):
+    """ Persistent cache of the execution times measured by `big_o`.
+
+    Measurements are stored in a sqlite database, keyed by the function's
+    code hash, the data generator identity and code hash, the measurement
+    parameters (N grid, repeats, ...) and the interpreter and platform
+    fingerprint. When the code of a function changes, all the entries for
+    that function are discarded.
+
+    Functions are identified by their module and qualified name; lambdas
+    are identified by their code, so their entries are never expired.
+    Partial functions are identified by the function they wrap and by their
+    arguments. The values captured by closures are not part of the key.
+    Measurements of callable objects with attributes, e.g. instances of a
+    class defining `__call__`, are only cached if the object defines a
+    `cache_key()` method returning a value whose `repr` identifies its
+    state; otherwise they are measured every time.
+
+    Entries are only discarded when the code of their function changes.
+    Entries for old versions of data generators, of parameters or of the
+    platform remain in the database until they are removed with `prune`
+    or `clear`.
+    """
+
+    def __init__(self, path):
+        """
+        Input:
+        ------
+
+        path -- Path of the sqlite database file. It is created if it does
+                not exist.
+        """
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                ' key TEXT PRIMARY KEY,'
+                ' func_id TEXT NOT NULL,'
+                ' code_hash TEXT NOT NULL,'
+                ' ns BLOB NOT NULL,'
+                ' times BLOB NOT NULL,'
+                ' created REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS results_func_id '
+                         'ON results (func_id)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _key(self, func, data_generator, params):
+        """ Return (function identity, code hash, cache key), or None if
+        `func` or `data_generator` cannot be identified reliably. """
+        func_id = _function_id(func)
+        generator_id = _function_id(data_generator)
+        if func_id is None or generator_id is None:
+            return None
+        code_hash = _code_hash(func)
+        key_data = {
+            'func': func_id,
+            'code_hash': code_hash,
+            'generator': generator_id,
+            'generator_hash': _code_hash(data_generator),
+            'params': params,
+            'platform': platform_fingerprint(),
+        }
+        key = hashlib.sha256(
+            json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+        return func_id, code_hash, key
+
+    def get(self, func, data_generator, params):
+        """ Return the cached measurements, or None if there are none.
+
+        Input:
+        ------
+
+        func, data_generator -- Measured function and its data generator
+
+        params -- JSON-serializable dictionary of the measurement parameters
+
+        Output:
+        -------
+
+        ns, time -- Arrays of N's and of execution times in seconds,
+                    or None if no matching measurements are cached, or if
+                    `func` or `data_generator` cannot be identified. For
+                    several size parameters, `ns` has one row per
+                    measurement.
+        """
+        key_data = self._key(func, data_generator, params)
+        if key_data is None:
+            return None
+        func_id, code_hash, key = key_data
+        with closing(self._connect()) as conn, conn:
+            self._expire(conn, func_id, code_hash)
+            row = conn.execute('SELECT ns, times FROM results WHERE key = ?',
+                               (key,)).fetchone()
+        if row is None:
+            return None
+        ns = np.frombuffer(row[0], dtype='int64').copy()
+        times = np.frombuffer(row[1], dtype='float64').copy()
+        if ns.size != times.size:
+            # several size parameters: one row of N's per measurement
+            ns = ns.reshape(len(times), -1)
+        return ns, times
+
+    def put(self, func, data_generator, params, ns, times):
+        """ Store the measurements `ns`, `times` in the cache.
+
+        Nothing is stored if `func` or `data_generator` cannot be identified
+        reliably (see `ResultCache`).
+        """
+        key_data = self._key(func, data_generator, params)
+        if key_data is None:
+            return
+        func_id, code_hash, key = key_data
+        ns = np.ascontiguousarray(ns, dtype='int64')
+        times = np.ascontiguousarray(times, dtype='float64')
+        with closing(self._connect()) as conn, conn:
+            self._expire(conn, func_id, code_hash)
+            conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                (key, func_id, code_hash, ns.tobytes(), times.tobytes(),
+                 time.time())
+            )
+
+    def clear(self):
+        """ Remove all entries from the cache. """
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM results')
+
+    def prune(self, max_age):
+        """ Remove the entries stored more than `max_age` seconds ago. """
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM results WHERE created < ?',
+                         (time.time() - max_age,))
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    @staticmethod
+    def _expire(conn, func_id, code_hash):
+        # discard the entries measured with a previous version of the code
+        conn.execute('DELETE FROM results WHERE func_id = ? '
+                     'AND code_hash != ?', (func_id, code_hash))
@@ -0,0 +1,250 @@
+"""Command-line interface of big_O.
+
+Example:
+--------
+
+    $ big-o mymodule:find_max --generator integers_array 0 1000 --max-n 100000
+    $ big-o builtins:sorted --generator strings --format json --output sorted.json
+
+NumPy and the measurement code are only imported once the arguments have
+been parsed, so that `big-o --help` and invalid invocations return quickly.
+"""
+
+import argparse
+import ast
+import importlib
+import os
+import sys
+
+
+class _Generator(object):
+    """ Picklable data generator calling a `big_o.datagen` function with
+    extra arguments, so that it can be sent to worker processes. """
+
+    def __init__(self, name, args, kwargs):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def cache_key(self):
+        """ Identity of the generator for `big_o.cache.ResultCache`. """
+        return self.name, self.args, sorted(self.kwargs.items())
+
+    def __call__(self, n):
+        from big_o import datagen
+        return getattr(datagen, self.name)(n, *self.args, **self.kwargs)
+
+
+def _literal(value):
+    """ Parse a command-line value as a Python literal, or keep the string. """
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def _parse_generator_args(values):
+    """ Split generator arguments into positional and `key=value` ones. """
+    args = []
+    kwargs = {}
+    for value in values:
+        key, sep, rest = value.partition('=')
+        if sep and key.isidentifier():
+            kwargs[key] = _literal(rest)
+        else:
+            args.append(_literal(value))
+    return args, kwargs
+
+
+def _n_repeats(value):
+    """ Parse the --n-repeats option: a positive integer or 'auto'. """
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "must be an integer or 'auto', got {!r}".format(value))
+
+
+def load_target(target):
+    """ Return the function named by a 'module:function' string.
+
+    The function name can be dotted, e.g. 'module:Class.method'. The current
+    directory is added to the module search path, as with `python -m`.
+    """
+    module_name, sep, attribute = target.partition(':')
+    if not sep or not module_name or not attribute:
+        raise ValueError('Target must have the form module:function, got '
+                         '{!r}'.format(target))
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    obj = importlib.import_module(module_name)
+    for name in attribute.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='big-o',
+        description='Estimate the time complexity class of a function from '
+                    'its execution time.')
+    parser.add_argument(
+        'target', help="function to measure, as 'module:function'")
+    parser.add_argument(
+        'generator_args', nargs='*', metavar='ARG',
+        help='extra arguments of the data generator, after N; values are '
+             'parsed as Python literals, and `key=value` arguments are '
+             'passed by keyword')
+    parser.add_argument(
+        '-g', '--generator', default='n_',
+        help='name of the data generator in big_o.datagen (default: n_)')
+    parser.add_argument('--min-n', type=int, default=100,
+                        help='smallest N (default: 100)')
+    parser.add_argument('--max-n', type=int, default=100000,
+                        help='largest N (default: 100000)')
+    parser.add_argument('--n-measures', type=int, default=10,
+                        help='number of N values (default: 10)')
+    parser.add_argument('--n-repeats', type=_n_repeats, default=1,
+                        help="calls of the function per timing, or 'auto' to "
+                             "calibrate them at each N (default: 1)")
+    parser.add_argument('--n-timings', type=int, default=1,
+                        help='timings per N (default: 1)')
+    parser.add_argument('--sampling', default='linear',
+                        choices=['linear', 'adaptive', 'lhs'],
+                        help='how the N values are chosen (default: linear)')
+    parser.add_argument('--aggregate', default='min',
+                        help='aggregation of the timings at each N '
+                             '(default: min)')
+    parser.add_argument('--criterion', default='bic',
+                        choices=['bic', 'aic', 'cv', 'residuals'],
+                        help='model selection criterion (default: bic)')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='maximum duration of the measurements, in '
+                             'seconds')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='measure the N values in parallel in this '
+                             'number of worker processes')
+    parser.add_argument('--isolate', action='store_true',
+                        help='measure each N in a fresh worker process')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='with --isolate, maximum time in seconds to '
+                             'measure a single N')
+    parser.add_argument('--memory-limit', type=float, default=None,
+                        help='with --isolate, maximum memory of a worker '
+                             'process, in MB')
+    parser.add_argument('-f', '--format', default='text',
+                        choices=['text', 'json', 'csv'],
+                        help='output format (default: text)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='output file (default: standard output)')
+    parser.add_argument('--max-class', default=None,
+                        help='exit with status 1 if the best complexity '
+                             'class is worse than this one, e.g. Linear')
+    return parser
+
+
+def _format_json(best, fitted):
+    import json
+    from big_o.serialization import run_to_dict
+    return json.dumps(run_to_dict(best, fitted), indent=2) + '\n'
+
+
+def _format_csv(best, fitted):
+    import csv
+    import io
+    from big_o.complexities import ComplexityClass
+
+    classes = [inst for inst in fitted if isinstance(inst, ComplexityClass)]
+    n_coeffs = max(len(inst.coefficients()) for inst in classes)
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(['class', 'best', 'residuals', 'confidence']
+                    + ['coeff_{}'.format(i) for i in range(n_coeffs)])
+    for inst in classes:
+        writer.writerow(
+            [type(inst).__name__, int(inst is best), repr(float(fitted[inst])),
+             repr(float(inst.confidence))]
+            + [repr(float(c)) for c in inst.coefficients()])
+    return output.getvalue()
+
+
+def _format_text(best, fitted):
+    from big_o.reports import big_o_report
+    return big_o_report(best, fitted)
+
+
+_FORMATTERS = {
+    'text': _format_text,
+    'json': _format_json,
+    'csv': _format_csv,
+}
+
+
+def main(argv=None):
+    """ Run the command-line interface, and return the exit status. """
+    parser = build_parser()
+    args = parser.parse_intermixed_args(argv)
+
+    try:
+        func = load_target(args.target)
+    except (ImportError, AttributeError, ValueError) as error:
+        parser.error('cannot load {}: {}'.format(args.target, error))
+
+    from big_o import complexities, datagen
+    from big_o.big_o import big_o
+
+    if not callable(getattr(datagen, args.generator, None)):
+        parser.error('unknown data generator: {}'.format(args.generator))
+    max_class = None
+    if args.max_class is not None:
+        try:
+            max_class = complexities.class_by_name(args.max_class)
+        except ValueError as error:
+            parser.error(str(error))
+
+    n_workers, isolation = args.workers, None
+    if args.isolate:
+        from big_o.isolation import WorkerPool
+        memory_limit = None
+        if args.memory_limit is not None:
+            memory_limit = int(args.memory_limit * 2 ** 20)
+        isolation = WorkerPool(n_workers or 1, timeout=args.timeout,
+                               memory_limit=memory_limit)
+        n_workers = None
+    elif args.timeout is not None or args.memory_limit is not None:
+        parser.error('--timeout and --memory-limit require --isolate')
+
+    gen_args, gen_kwargs = _parse_generator_args(args.generator_args)
+    try:
+        best, fitted = big_o(
+            func, _Generator(args.generator, gen_args, gen_kwargs),
+            min_n=args.min_n, max_n=args.max_n, n_measures=args.n_measures,
+            n_repeats=args.n_repeats, n_timings=args.n_timings,
+            sampling=args.sampling, aggregate=args.aggregate,
+            criterion=args.criterion, time_budget=args.time_budget,
+            n_workers=n_workers, isolation=isolation, return_raw_data=True)
+    except (TypeError, ValueError) as error:
+        # invalid combinations of options, or generator arguments
+        parser.error('{}: {}'.format(type(error).__name__, error))
+    finally:
+        if isolation is not None:
+            isolation.close()
+    for n, message in fitted.get('failures', []):
+        sys.stderr.write('N={}: {}\n'.format(n, message))
+
+    text = _FORMATTERS[args.format](best, fitted)
+    if args.output is None:
+        sys.stdout.write(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+    if max_class is not None and best is not None and best > max_class():
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
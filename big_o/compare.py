@@ -0,0 +1,237 @@
+"""Detection of performance regressions between two runs of big_o.
+
+A run is the output of `big_o.big_o` with `return_raw_data=True`, i.e. a
+(best, fitted) tuple whose `fitted` dictionary has the measured N's under
+'measures' and the execution times under 'times', as are the runs loaded
+by `big_o.serialization.load_runs`. The `fitted` dictionary alone, or
+simply a tuple (ns, times), are also accepted.
+
+Example:
+--------
+
+>>> results = big_o.compare.compare_many(baseline_runs, current_runs,
+...                                      target_n=10**7)
+>>> print(big_o.compare.report(results))
+>>> sys.exit(big_o.compare.exit_status(results))
+"""
+
+import numpy as np
+
+from big_o.big_o import infer_big_o_class
+from big_o.complexities import ALL_CLASSES, ComplexityClass
+
+
+class Comparison(object):
+    """ Result of the comparison of two runs.
+
+    Attributes:
+    -----------
+
+    baseline, current -- Complexity classes that best fit the baseline and
+                         the current run, instances of
+                         `big_o.complexities.ComplexityClass`
+
+    target_n -- N at which the slowdown is predicted
+
+    class_changed -- True if the best complexity class changed
+
+    coefficient_changed -- True if at least one coefficient of the baseline
+                           complexity class, refitted to the current run,
+                           is outside of the confidence interval of the
+                           baseline, and vice versa
+
+    baseline_interval, current_interval -- (lower, upper) confidence
+                                           intervals of the coefficients of
+                                           the baseline complexity class
+
+    slowdown -- Ratio of the current and baseline execution times predicted
+                at `target_n` by the best complexity classes
+
+    regression -- True if the slowdown exceeds the maximum allowed
+                  slowdown, and either the complexity class became worse
+                  or the coefficients changed significantly. A change of
+                  class with no slowdown is not a regression, since the
+                  selection can flip between neighbouring classes on noise.
+    """
+
+    def __init__(self, baseline, current, target_n, class_changed,
+                 coefficient_changed, baseline_interval, current_interval,
+                 slowdown, regression):
+        self.baseline = baseline
+        self.current = current
+        self.target_n = target_n
+        self.class_changed = class_changed
+        self.coefficient_changed = coefficient_changed
+        self.baseline_interval = baseline_interval
+        self.current_interval = current_interval
+        self.slowdown = slowdown
+        self.regression = regression
+
+    def __str__(self):
+        changes = []
+        if self.class_changed:
+            changes.append('{} -> {}'.format(type(self.baseline).__name__,
+                                             type(self.current).__name__))
+        else:
+            changes.append(type(self.current).__name__)
+        if self.coefficient_changed:
+            changes.append('coefficients changed')
+        changes.append('{:.3G}x time at n={}'.format(self.slowdown,
+                                                     self.target_n))
+        status = 'REGRESSION' if self.regression else 'ok'
+        return '{}: {}'.format(status, ', '.join(changes))
+
+
+def _run_data(run):
+    """ Return the (ns, times) arrays of a saved run. """
+    if (isinstance(run, tuple) and len(run) == 2
+            and (run[0] is None or isinstance(run[0], ComplexityClass))):
+        # (best, fitted) tuple
+        run = run[1]
+    if isinstance(run, dict):
+        if 'measures' not in run:
+            raise ValueError("The run has no raw data; measure it with "
+                             "return_raw_data=True")
+        ns, times = run['measures'], run['times']
+    else:
+        ns, times = run
+    return np.asanyarray(ns), np.asanyarray(times, dtype=float)
+
+
+def compare(baseline, current, target_n, classes=ALL_CLASSES,
+            criterion='bic', max_slowdown=1.1, confidence_level=0.95,
+            n_resamples=1000):
+    """ Compare two runs of the same function.
+
+    Input:
+    ------
+
+    baseline, current -- The baseline and the current runs, as
+                         (best, fitted) tuples returned by `big_o.big_o`
+                         with `return_raw_data=True`, `fitted` dictionaries,
+                         or (ns, times) tuples
+
+    target_n -- N at which the slowdown is predicted, e.g. the typical size
+                in production
+
+    classes, criterion -- How the best complexity class is selected. See
+                          `big_o.infer_big_o_class`.
+
+    max_slowdown -- Largest ratio of the current and baseline predicted
+                    execution times at `target_n` that is not a regression
+
+    confidence_level, n_resamples -- Confidence level and number of
+                                     bootstrap resamples of the confidence
+                                     intervals of the coefficients
+
+    Output:
+    -------
+
+    comparison -- `Comparison` object
+    """
+    baseline_ns, baseline_times = _run_data(baseline)
+    current_ns, current_times = _run_data(current)
+    baseline_best, _ = infer_big_o_class(baseline_ns, baseline_times,
+                                         classes, criterion=criterion)
+    current_best, _ = infer_big_o_class(current_ns, current_times,
+                                        classes, criterion=criterion)
+    class_changed = type(baseline_best) is not type(current_best)
+
+    # compare the coefficients of the same complexity class, so that a
+    # change of class from noise alone does not hide a slowdown
+    baseline_interval = baseline_best.confidence_interval(
+        baseline_ns, baseline_times, confidence_level, n_resamples)
+    refitted = type(baseline_best)()
+    current_interval = refitted.confidence_interval(
+        current_ns, current_times, confidence_level, n_resamples)
+    coefficient_changed = bool(np.any(
+        (current_interval[0] > baseline_interval[1])
+        | (current_interval[1] < baseline_interval[0])))
+
+    target = np.array([target_n])
+    with np.errstate(all='ignore'):
+        slowdown = float(current_best.compute(target)[0]
+                         / baseline_best.compute(target)[0])
+
+    # a change of class from noise alone predicts little slowdown
+    regression = bool(slowdown > max_slowdown
+                      and (current_best > baseline_best
+                           or coefficient_changed))
+    return Comparison(baseline_best, current_best, target_n, class_changed,
+                      coefficient_changed, baseline_interval,
+                      current_interval, slowdown, regression)
+
+
+def compare_many(baselines, currents, target_n, **kwargs):
+    """ Compare the runs of many functions.
+
+    Input:
+    ------
+
+    baselines, currents -- Dictionaries of function names to the baseline
+                           and current runs. Functions missing from either
+                           dictionary are not compared.
+
+    target_n -- N at which the slowdown is predicted, either the same for
+                all functions or a dictionary of function names to N
+
+    kwargs -- Other arguments of `compare`
+
+    Output:
+    -------
+
+    comparisons -- Dictionary of function names to `Comparison` objects,
+                   in the order of `baselines`
+    """
+    comparisons = {}
+    for name, baseline in baselines.items():
+        if name not in currents:
+            continue
+        n = target_n[name] if isinstance(target_n, dict) else target_n
+        comparisons[name] = compare(baseline, currents[name], n, **kwargs)
+    return comparisons
+
+
+def report(comparisons, regressions_only=False):
+    """ Human-readable report of the output of `compare_many`.
+
+    Input:
+    ------
+
+    comparisons -- Dictionary of function names to `Comparison` objects
+
+    regressions_only -- If True, only the regressions are reported
+
+    Output:
+    -------
+
+    report -- A string with one line per function
+    """
+    lines = []
+    for name, comparison in comparisons.items():
+        if regressions_only and not comparison.regression:
+            continue
+        lines.append('{}: {!s}'.format(name, comparison))
+    n_regressions = sum(c.regression for c in comparisons.values())
+    lines.append('{} regression(s) in {} function(s)'.format(
+        n_regressions, len(comparisons)))
+    return '\n'.join(lines) + '\n'
+
+
+def exit_status(comparisons):
+    """ Exit status of a job checking for regressions.
+
+    Input:
+    ------
+
+    comparisons -- A `Comparison` object, or a dictionary of function names
+                   to `Comparison` objects
+
+    Output:
+    -------
+
+    status -- 1 if there is at least one regression, 0 otherwise
+    """
+    if isinstance(comparisons, Comparison):
+        comparisons = {None: comparisons}
+    return int(any(c.regression for c in comparisons.values()))
@@ -1,8 +1,15 @@
 """Definition of complexity classes."""
 
+from statistics import NormalDist
+
 import numpy as np
 
 
+#: int: Version of the format of `ComplexityClass.to_dict`, incremented
+# when the format changes in a way that older versions cannot read.
+SERIALIZATION_VERSION = 1
+
+
 class NotFittedError(Exception):
     pass
 
@@ -19,10 +26,29 @@ class ComplexityClass(object):
     # _transform_time() or _inverse_transform_time()
     _recalculate_fit_residuals = False
 
+    #: str: Name and units of the fitted quantity, used by __str__ .
+    # They are changed when fitting, e.g., memory usage instead of time.
+    quantity = 'time'
+    units = 'sec'
+
+    #: int: Number of size parameters, i.e. columns of `n`
+    n_size_parameters = 1
+
     def __init__(self):
         # list of parameters of the fitted function class as returned by the
         # last square method np.linalg.lstsq
         self.coeff = None
+        # covariance of `coeff` estimated from the scatter of the fit, and
+        # its degrees of freedom, used by `predict` for the intervals
+        self.coeff_cov = None
+        # probability that this is the best class among those considered,
+        # set by the model selection in `big_o.infer_big_o_class`
+        self.confidence = None
+        # (lower, upper) confidence interval of the coefficients, and
+        # fraction of the resamples of the measurements in which this class
+        # is selected, set by `big_o.infer_big_o_class` with resampling
+        self.coeff_interval = None
+        self.selection_frequency = None
 
     def fit(self, n, t):
         """ Fit complexity class parameters to timing data.
@@ -39,17 +65,21 @@ class ComplexityClass(object):
 
         residuals -- Sum of square errors of fit
         """
-        n = np.asanyarray(n)
+        n = np.asanyarray(n, dtype=float)
         t = np.asanyarray(t)
 
         x = self._transform_n(n)
         y = self._transform_time(t)
         coeff, residuals, rank, s = np.linalg.lstsq(x, y, rcond=-1)
         self.coeff = coeff
+        with np.errstate(all='ignore'):
+            pinv = np.linalg.pinv(x)
+            self.coeff_cov = coefficient_covariance(pinv, y - x @ coeff)
 
         # Check if residuals from least square can be used, or if it
-        # must be explicitly calculated.
-        if self._recalculate_fit_residuals:
+        # must be explicitly calculated. np.linalg.lstsq does not return
+        # residuals when there are not more points than coefficients.
+        if self._recalculate_fit_residuals or len(residuals) == 0:
             ref_t = self.compute(n)
             residuals = np.sum((ref_t - t) ** 2)
         else:
@@ -62,12 +92,111 @@ class ComplexityClass(object):
             raise NotFittedError()
 
         # Result is linear combination of the terms with the fitted
-        # coefficients
-        x = self._transform_n(n)
-        tot = 0
-        for i in range(len(self.coeff)):
-            tot += self.coeff[i] * x[:, i]
-        return self._inverse_transform_time(tot)
+        # coefficients, computed in floating point to avoid int64 overflows
+        x = self._transform_n(np.asanyarray(n, dtype=float))
+        return self._inverse_transform_time(x @ self.coeff)
+
+    def predict(self, n, with_interval=False, confidence_level=0.95):
+        """ Predict the fitted quantity, e.g. the execution time, at `n`.
+
+        The N's are converted to floating point numbers, so that N's too
+        large for int64 can be extrapolated to.
+
+        Input:
+        ------
+
+        n -- Value of N, or array of values of N. For classes of several
+             size parameters, the last axis has one value per parameter.
+
+        with_interval -- If True, also return the prediction interval, i.e.
+                         the range expected to contain a new measurement.
+                         It is computed from the scatter of the measurements
+                         around the fit, and requires a class fitted with
+                         `fit` or `big_o.infer_big_o_class`.
+
+        confidence_level -- Probability covered by the prediction interval
+
+        Output:
+        -------
+
+        prediction -- Predicted values with the shape of `n` (without the
+                      last axis for several size parameters), or a float
+                      if `n` is a single value
+
+        lower, upper -- Only if `with_interval` is True: bounds of the
+                        prediction interval, with the shape of `prediction`
+        """
+        if self.coeff is None:
+            raise NotFittedError()
+
+        n = np.asarray(n, dtype=float)
+        if self.n_size_parameters > 1:
+            shape = n.shape[:-1]
+            n = n.reshape(-1, n.shape[-1])
+        else:
+            shape = n.shape
+            n = n.reshape(-1)
+
+        with np.errstate(all='ignore'):
+            x = self._transform_n(n)
+            y = x @ self.coeff
+            result = [self._inverse_transform_time(y)]
+            if with_interval:
+                if self.coeff_cov is None:
+                    raise ValueError('Prediction intervals require a class '
+                                     'fitted with fit() or infer_big_o_class')
+                cov, sigma2 = self.coeff_cov
+                std = np.sqrt(sigma2 + np.einsum('ij,jk,ik->i', x, cov, x))
+                z = NormalDist().inv_cdf(0.5 + confidence_level / 2.)
+                result.append(self._inverse_transform_time(y - z * std))
+                result.append(self._inverse_transform_time(y + z * std))
+
+        result = [r.reshape(shape)[()] if shape else float(r[0])
+                  for r in result]
+        return tuple(result) if with_interval else result[0]
+
+    def max_n_within(self, budget, max_n=1e300):
+        """ Largest N at which the predicted quantity is within a budget.
+
+        This answers questions like "what input size fits in 200 ms?",
+        assuming that the fitted function increases with N.
+
+        Input:
+        ------
+
+        budget -- Maximum value of the quantity, e.g. execution time in
+                  seconds. A number or an array of numbers.
+
+        max_n -- Largest N considered
+
+        Output:
+        -------
+
+        n -- Largest integer N, as a float, such that `predict(N)` is not
+             larger than the budget. 0 if the budget is exceeded for N=1,
+             and inf if it is not exceeded up to `max_n`.
+        """
+        if self.coeff is None:
+            raise NotFittedError()
+        if self.n_size_parameters > 1:
+            raise ValueError('max_n_within requires a complexity class of '
+                             'a single size parameter')
+
+        budget = np.asarray(budget, dtype=float)
+        # bisection on log(N) for all the budgets at once
+        low = np.zeros(budget.shape)
+        high = np.full(budget.shape, np.log(max_n))
+        for _ in range(100):
+            middle = (low + high) / 2.
+            within = self.predict(np.exp(middle)) <= budget
+            low = np.where(within, middle, low)
+            high = np.where(within, high, middle)
+
+        n = np.floor(np.exp(low))
+        n = np.where(self.predict(n) <= budget, n, n - 1.)
+        n = np.where(self.predict(1.) <= budget, n, 0.)
+        n = np.where(self.predict(max_n) <= budget, np.inf, n)
+        return n[()] if n.ndim else float(n)
 
     def coefficients(self):
         """ Return coefficients in standard form. """
@@ -75,13 +204,89 @@ class ComplexityClass(object):
             raise NotFittedError()
         return self.coeff
 
+    def confidence_interval(self, n, t, confidence_level=0.95,
+                            n_resamples=1000, method='bootstrap'):
+        """ Confidence interval of the coefficients by resampling.
+
+        The class is refitted to `n_resamples` bootstrap resamples of the
+        measurements, or to the jackknife (leave-one-out) subsets, all in
+        one batched least squares solve. If the class is not fitted yet, it
+        is fitted to all the measurements first.
+
+        Input:
+        ------
+
+        n -- Array of values of N for which execution time has been measured.
+
+        t -- Array of execution times for each N in seconds.
+
+        confidence_level -- Probability covered by the interval
+
+        n_resamples -- Number of bootstrap resamples. Ignored by the
+                       jackknife, which uses one subset per measurement.
+
+        method -- 'bootstrap' for the percentile bootstrap, or 'jackknife'
+                  for a normal interval with the jackknife standard error
+
+        Output:
+        -------
+
+        lower, upper -- Arrays with the bounds of the interval of each
+                        coefficient, in the standard form of `coefficients`
+        """
+        if self.coeff is None:
+            self.fit(n, t)
+        indices = resample_indices(len(t), n_resamples, method)
+        coeffs, _, _ = fit_classes_resampled([type(self)], n, t, indices)
+        return coefficient_interval(self, coeffs[0], confidence_level, method)
+
+    def to_dict(self):
+        """ Return a dictionary of plain Python types describing the fit.
+
+        The dictionary can be stored as JSON, and the object recreated
+        with `ComplexityClass.from_dict`.
+        """
+        coeff = None if self.coeff is None else np.asarray(self.coeff).tolist()
+        return {
+            'version': SERIALIZATION_VERSION,
+            'class': type(self).__name__,
+            'coeff': coeff,
+            'coeff_cov': (None if self.coeff_cov is None
+                          else [np.asarray(self.coeff_cov[0]).tolist(),
+                                float(self.coeff_cov[1])]),
+            'confidence': (None if self.confidence is None
+                           else float(self.confidence)),
+            'quantity': self.quantity,
+            'units': self.units,
+        }
+
+    @staticmethod
+    def from_dict(data):
+        """ Recreate a complexity class from the output of `to_dict`. """
+        if data.get('version', SERIALIZATION_VERSION) > SERIALIZATION_VERSION:
+            raise ValueError('Unsupported serialization version: {}'.format(
+                data['version']))
+        inst = class_by_name(data['class'])()
+        if data.get('coeff') is not None:
+            inst.coeff = np.array(data['coeff'], dtype=float)
+        if data.get('coeff_cov') is not None:
+            cov, sigma2 = data['coeff_cov']
+            inst.coeff_cov = (np.array(cov, dtype=float), sigma2)
+        inst.confidence = data.get('confidence')
+        inst.quantity = data.get('quantity', inst.quantity)
+        inst.units = data.get('units', inst.units)
+        return inst
+
     def __str__(self):
         prefix = '{}: '.format(self.__class__.__name__)
 
         if self.coeff is None:
             return prefix + 'not yet fitted'
-        return prefix + self.format_str().format(
-            *self.coefficients()) + ' (sec)'
+        format_str = self.format_str()
+        if self.quantity != 'time' and format_str.startswith('time'):
+            format_str = self.quantity + format_str[len('time'):]
+        return prefix + format_str.format(
+            *self.coefficients()) + ' ({})'.format(self.units)
 
     # --- abstract methods
 
@@ -264,6 +469,304 @@ class Exponential(ComplexityClass):
         return np.exp(a), np.exp(b)
 
 
+# --- Complexity classes of two size parameters, N and M
+#
+# For these classes, `n` is an array of shape (number of measurements, 2),
+# with the values of N in the first column and the values of M in the second.
+
+
+class NPlusM(ComplexityClass):
+    order = 30
+    n_size_parameters = 2
+
+    def _transform_n(self, n):
+        return np.vstack([np.ones(len(n)), n[:, 0], n[:, 1]]).T
+
+    @classmethod
+    def format_str(cls):
+        return 'time = {:.2G} + {:.2G}*n + {:.2G}*m'
+
+
+class NPlusMLogM(ComplexityClass):
+    order = 40
+    n_size_parameters = 2
+
+    def _transform_n(self, n):
+        return np.vstack([np.ones(len(n)), n[:, 0],
+                          n[:, 1] * np.log(n[:, 1])]).T
+
+    @classmethod
+    def format_str(cls):
+        return 'time = {:.2G} + {:.2G}*n + {:.2G}*m*log(m)'
+
+
+class NLogM(ComplexityClass):
+    order = 45
+    n_size_parameters = 2
+
+    def _transform_n(self, n):
+        return np.vstack([np.ones(len(n)), n[:, 0] * np.log(n[:, 1])]).T
+
+    @classmethod
+    def format_str(cls):
+        return 'time = {:.2G} + {:.2G}*n*log(m)'
+
+
+class NTimesM(ComplexityClass):
+    order = 50
+    n_size_parameters = 2
+
+    def _transform_n(self, n):
+        return np.vstack([np.ones(len(n)), n[:, 0] * n[:, 1]]).T
+
+    @classmethod
+    def format_str(cls):
+        return 'time = {:.2G} + {:.2G}*n*m'
+
+
+def fit_classes(classes, n, t, covariance=False):
+    """ Fit several complexity classes to one or more timing series at once.
+
+    The design matrix of each class is computed once for all series, and
+    classes sharing the same design matrix (e.g., Linear and Exponential)
+    share the same pseudo-inverse, so that the fit of all the series reduces
+    to one matrix product per class.
+
+    Input:
+    ------
+
+    classes -- List of subclasses of `ComplexityClass`
+
+    n -- Array of values of N for which execution time has been measured.
+
+    t -- Array of execution times for each N in seconds. Either a 1-D array
+         with one time per N, or a 2-D array of shape (number of Ns,
+         number of series) with one timing series per column.
+
+    covariance -- If True, also return the covariance of the coefficients.
+                  Only for 1-D `t`.
+
+    Output:
+    -------
+
+    coeffs -- List with the fitted coefficients for each class, as an
+              array of shape (number of coefficients, number of series),
+              or (number of coefficients,) if `t` is 1-D
+
+    residuals -- Sum of square errors of the fit, as an array of shape
+                 (number of classes, number of series), or
+                 (number of classes,) if `t` is 1-D
+
+    covariances -- Only if `covariance` is True: list with the output of
+                   `coefficient_covariance` for each class
+    """
+    n = np.asanyarray(n, dtype=float)
+    t = np.asanyarray(t)
+    is_1d = (t.ndim == 1)
+    if is_1d:
+        t = t[:, np.newaxis]
+    elif covariance:
+        raise ValueError('Covariances are only computed for a single '
+                         'timing series')
+
+    pinv_cache = {}
+    coeffs = []
+    covariances = []
+    residuals = np.empty((len(classes), t.shape[1]))
+    for i, class_ in enumerate(classes):
+        inst = class_()
+        x = inst._transform_n(n)
+        key = (x.shape, x.tobytes())
+        if key not in pinv_cache:
+            pinv_cache[key] = np.linalg.pinv(x)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            y = inst._transform_time(t)
+            coeff = pinv_cache[key] @ y
+            y_fit = x @ coeff
+            if inst._recalculate_fit_residuals:
+                residuals[i] = np.sum(
+                    (inst._inverse_transform_time(y_fit) - t) ** 2, axis=0)
+            else:
+                residuals[i] = np.sum((y_fit - y) ** 2, axis=0)
+            if covariance:
+                covariances.append(coefficient_covariance(
+                    pinv_cache[key], (y - y_fit)[:, 0]))
+        coeffs.append(coeff[:, 0] if is_1d else coeff)
+
+    if is_1d:
+        residuals = residuals[:, 0]
+    if covariance:
+        return coeffs, residuals, covariances
+    return coeffs, residuals
+
+
+def coefficient_covariance(pinv, errors):
+    """ Covariance of least squares coefficients and variance of the errors.
+
+    Input:
+    ------
+
+    pinv -- Pseudo-inverse of the design matrix
+
+    errors -- 1-D array of differences between the transformed times and
+              their fit
+
+    Output: (cov, sigma2), with `cov` the covariance matrix of the
+    coefficients and `sigma2` the variance of a measurement around the fit.
+    Both are NaN if there are not more measurements than coefficients.
+    """
+    n_coeffs, n_points = pinv.shape
+    if n_points <= n_coeffs:
+        return np.full((n_coeffs, n_coeffs), np.nan), np.nan
+    sigma2 = np.sum(errors ** 2) / (n_points - n_coeffs)
+    return sigma2 * (pinv @ pinv.T), sigma2
+
+
+def class_by_name(name):
+    """ Return the subclass of `ComplexityClass` with the given name.
+
+    User-defined subclasses are found as long as they are imported.
+    """
+    to_visit = [ComplexityClass]
+    while to_visit:
+        class_ = to_visit.pop()
+        if class_.__name__ == name:
+            return class_
+        to_visit.extend(class_.__subclasses__())
+    raise ValueError('Unknown complexity class: {!r}'.format(name))
+
+
+def resample_indices(n_points, n_resamples=1000, method='bootstrap'):
+    """ Indices of the measurements in each resample.
+
+    Output: an array of shape (number of resamples, points per resample).
+    The bootstrap draws `n_resamples` samples of `n_points` indices with
+    replacement, using the global NumPy random state; the jackknife
+    leaves out each measurement in turn.
+    """
+    if method == 'bootstrap':
+        return np.random.randint(0, n_points, size=(n_resamples, n_points))
+    elif method == 'jackknife':
+        indices = np.arange(n_points)
+        return np.array([np.delete(indices, i) for i in range(n_points)])
+    raise ValueError('Unknown resampling method: {!r}'.format(method))
+
+
+def fit_classes_resampled(classes, n, t, indices, loo=False):
+    """ Fit several complexity classes to many resamples of one timing series.
+
+    All resamples are fitted in one batched least squares solve per class.
+
+    Input:
+    ------
+
+    classes -- List of subclasses of `ComplexityClass`
+
+    n -- Array of values of N for which execution time has been measured.
+
+    t -- 1-D array of execution times for each N in seconds.
+
+    indices -- Array of shape (number of resamples, points per resample)
+               with the indices of the measurements in each resample, as
+               returned by `resample_indices`.
+
+    loo -- If True, also compute the leave-one-out cross-validation error
+           of each resample, see `big_o.selection.loo_residuals`.
+
+    Output:
+    -------
+
+    coeffs -- List with the fitted coefficients for each class, as an
+              array of shape (number of coefficients, number of resamples)
+
+    residuals -- Sum of square errors of the fit, as an array of shape
+                 (number of classes, number of resamples)
+
+    loo_residuals -- Leave-one-out error with the same shape as
+                     `residuals`, or None if `loo` is False
+    """
+    n = np.asanyarray(n, dtype=float)
+    t = np.asanyarray(t, dtype=float)
+    t_resampled = t[indices]
+
+    pinv_cache = {}
+    coeffs = []
+    residuals = np.empty((len(classes), len(indices)))
+    loo_residuals = np.empty_like(residuals) if loo else None
+    for i, class_ in enumerate(classes):
+        inst = class_()
+        x = inst._transform_n(n)
+        key = (x.shape, x.tobytes())
+        if key not in pinv_cache:
+            x_resampled = x[indices]
+            pinv_cache[key] = (x_resampled, np.linalg.pinv(x_resampled))
+        x_resampled, pinv = pinv_cache[key]
+
+        with np.errstate(all='ignore'):
+            y = inst._transform_time(t_resampled)
+            coeff = np.einsum('rkm,rm->rk', pinv, y)
+            y_fit = np.einsum('rmk,rk->rm', x_resampled, coeff)
+            if inst._recalculate_fit_residuals:
+                residuals[i] = np.sum(
+                    (inst._inverse_transform_time(y_fit) - t_resampled) ** 2,
+                    axis=1)
+            else:
+                residuals[i] = np.sum((y_fit - y) ** 2, axis=1)
+            if loo:
+                leverage = np.einsum('rmk,rkm->rm', x_resampled, pinv)
+                y_loo = y - (y - y_fit) / (1. - leverage)
+                loo_residuals[i] = np.sum(
+                    (inst._inverse_transform_time(y_loo) - t_resampled) ** 2,
+                    axis=1)
+        coeffs.append(coeff.T)
+
+    if loo:
+        loo_residuals[~np.isfinite(loo_residuals)] = np.nan
+    return coeffs, residuals, loo_residuals
+
+
+def coefficient_interval(inst, coeffs, confidence_level=0.95,
+                         method='bootstrap'):
+    """ Confidence interval of the coefficients of a fitted class.
+
+    Input:
+    ------
+
+    inst -- Fitted instance of a subclass of `ComplexityClass`
+
+    coeffs -- Array of shape (number of coefficients, number of resamples)
+              with the coefficients fitted to each resample, as returned by
+              `fit_classes_resampled`
+
+    confidence_level, method -- See `ComplexityClass.confidence_interval`
+
+    Output:
+    -------
+
+    lower, upper -- Arrays with the bounds of the interval of each
+                    coefficient, in the standard form of `coefficients`
+    """
+    resampled = type(inst)()
+    resampled.coeff = coeffs
+    with np.errstate(all='ignore'):
+        values = np.asarray(resampled.coefficients(), dtype=float)
+    if method == 'jackknife':
+        n_points = values.shape[1]
+        mean = np.nanmean(values, axis=1)
+        std_error = np.sqrt((n_points - 1.) / n_points * np.nansum(
+            (values - mean[:, np.newaxis]) ** 2, axis=1))
+        z = NormalDist().inv_cdf(0.5 + confidence_level / 2.)
+        estimate = np.asarray(inst.coefficients(), dtype=float)
+        return estimate - z * std_error, estimate + z * std_error
+    tail = 50. * (1. - confidence_level)
+    lower, upper = np.nanpercentile(values, [tail, 100. - tail], axis=1)
+    return lower, upper
+
+
 ALL_CLASSES = [Constant, Logarithmic, Linear, Linearithmic,
                Quadratic, Cubic, Polynomial,
                Exponential]
+
+#: Complexity classes of two size parameters, N and M
+ALL_CLASSES_NM = [Constant, NPlusM, NPlusMLogM, NLogM, NTimesM]
@@ -2,6 +2,11 @@
 
 import random
 import string
+import sys
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
 
 
 def n_(n):
@@ -9,24 +14,213 @@ def n_(n):
     return n
 
 
+def prefix_sliceable(data_generator):
+    """ Mark `data_generator` as prefix-sliceable.
+
+    A generator is prefix-sliceable if the first N elements of the data
+    generated for a larger N are valid input data of length N, i.e.
+    `data_generator(m)[:n]` can replace `data_generator(n)` for m > n.
+    `DataCache` then slices the data for smaller N's out of the data
+    generated for the largest N.
+    """
+    data_generator.prefix_sliceable = True
+    return data_generator
+
+
+@prefix_sliceable
 def range_n(n, start=0):
     """ Return the sequence [start, start+1, ..., start+N-1]. """
     return list(range(start, start + n))
 
 
+@prefix_sliceable
 def integers(n, min_, max_):
     """ Return sequence of N random integers between min_ and max_ (included).
     """
     return [random.randint(min_, max_) for _ in range(n)]
 
 
+@prefix_sliceable
 def large_integers(n):
     """ Return sequence of N large random integers. """
     return [random.randint(-50, 50) * 1000000 + random.randint(0, 10000)
             for _ in range(n)]
 
 
+@prefix_sliceable
 def strings(n, chars=string.ascii_letters):
     """ Return random string of N characters, sampled at random from `chars`.
     """
     return ''.join([random.choice(chars) for i in range(n)])
+
+
+# --- Array-backed generators, based on numpy.random.Generator
+
+
+def _rng(seed):
+    """ Return a `numpy.random.Generator` for `seed`.
+
+    `seed` can be an integer, a `numpy.random.Generator`, or None. If None,
+    the generator is seeded from the global `numpy.random` state, so that
+    `numpy.random.seed` makes the generated data reproducible.
+    """
+    if seed is None:
+        seed = np.random.randint(0, 2**31)
+    return np.random.default_rng(seed)
+
+
+@prefix_sliceable
+def integers_array(n, min_, max_, seed=None, as_list=False):
+    """ Return array of N random integers between min_ and max_ (included).
+
+    If `as_list` is True, return a list of Python integers instead.
+    """
+    data = _rng(seed).integers(min_, max_, size=n, endpoint=True)
+    return data.tolist() if as_list else data
+
+
+@prefix_sliceable
+def large_integers_array(n, seed=None, as_list=False):
+    """ Return array of N large random integers.
+
+    If `as_list` is True, return a list of Python integers instead.
+    """
+    rng = _rng(seed)
+    data = (rng.integers(-50, 50, size=n, endpoint=True) * 1000000
+            + rng.integers(0, 10000, size=n, endpoint=True))
+    return data.tolist() if as_list else data
+
+
+@prefix_sliceable
+def strings_array(n, chars=string.ascii_letters, seed=None):
+    """ Return random string of N characters, sampled at random from `chars`.
+
+    The string is created from a buffer of characters sampled all at once.
+    """
+    rng = _rng(seed)
+    chars = ''.join(chars)
+    try:
+        buffer = np.frombuffer(chars.encode('ascii'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        buffer = None
+    if buffer is not None:
+        return rng.choice(buffer, size=n).tobytes().decode('ascii')
+
+    # non-ASCII characters: view an array of characters as a single string
+    if n == 0:
+        return ''
+    buffer = np.array(list(chars), dtype='U1')
+    return rng.choice(buffer, size=n).view('U{}'.format(n))[0]
+
+
+def _sizeof(data):
+    """ Estimate the memory used by `data` in bytes. """
+    if isinstance(data, np.ndarray):
+        return data.nbytes
+    size = sys.getsizeof(data)
+    if isinstance(data, (list, tuple)) and len(data) > 0:
+        # estimate the size of the elements from a sample
+        sample = data[:100]
+        size += len(data) * sum(sys.getsizeof(x) for x in sample) // len(sample)
+    return size
+
+
+class DataCache(object):
+    """ Least-recently-used cache of the input data of data generators.
+
+    Data is cached by (data generator, N, seed), so that sweeps repeated
+    with different parameters do not generate the same input again. For
+    prefix-sliceable generators (see `prefix_sliceable`), data for smaller
+    N's is sliced out of the data cached for a larger N.
+
+    The function being measured must not modify its input, since the same
+    data is returned for each call with the same key.
+    """
+
+    def __init__(self, max_bytes=2**30, seed=None):
+        """
+        Input:
+        ------
+
+        max_bytes -- Approximate maximum memory used by the cached data.
+                     The least recently used data is discarded when the
+                     cache grows larger.
+
+        seed -- Default seed for the random number generators. If not None,
+                the `random` and `numpy.random` global generators are seeded
+                before generating data, and restored afterwards, so that
+                generated data is reproducible.
+        """
+        self.max_bytes = max_bytes
+        self.seed = seed
+        self.nbytes = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        """ Remove all cached data. """
+        self._cache.clear()
+        self.nbytes = 0
+
+    def get(self, data_generator, n, seed=None):
+        """ Return `data_generator(n)`, generating it only if not cached. """
+        if seed is None:
+            seed = self.seed
+        key = (data_generator, n, seed)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key][0]
+
+        if getattr(data_generator, 'prefix_sliceable', False):
+            data = self._slice_larger(data_generator, n, seed)
+            if data is not None:
+                # slices are not stored, to avoid duplicating the data
+                return data
+        data = self._generate(data_generator, n, seed)
+        self._store(key, data)
+        return data
+
+    def wrap(self, data_generator, seed=None):
+        """ Return a data generator that goes through this cache. """
+        wrapped = partial(self.get, data_generator, seed=seed)
+        if getattr(data_generator, 'prefix_sliceable', False):
+            wrapped.prefix_sliceable = True
+        return wrapped
+
+    def _generate(self, data_generator, n, seed):
+        if seed is None:
+            return data_generator(n)
+        random_state = random.getstate()
+        np_random_state = np.random.get_state()
+        try:
+            random.seed(seed)
+            np.random.seed(seed)
+            return data_generator(n)
+        finally:
+            random.setstate(random_state)
+            np.random.set_state(np_random_state)
+
+    def _slice_larger(self, data_generator, n, seed):
+        """ Return a slice of cached data for a larger N, or None. """
+        best_m = None
+        for (generator, m, key_seed) in self._cache:
+            if (generator is data_generator and key_seed == seed and m > n
+                    and (best_m is None or m < best_m)):
+                best_m = m
+        if best_m is None:
+            return None
+        key = (data_generator, best_m, seed)
+        self._cache.move_to_end(key)
+        return self._cache[key][0][:n]
+
+    def _store(self, key, data):
+        size = _sizeof(data)
+        if size > self.max_bytes:
+            return
+        self._cache[key] = (data, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, old_size) = self._cache.popitem(last=False)
+            self.nbytes -= old_size
@@ -0,0 +1,300 @@
+"""Measurements in isolated worker processes.
+
+A function that leaks memory or warms caches makes the measurements at later
+N's depend on the earlier ones, and a function that crashes kills the whole
+sweep. A `WorkerPool` measures each N, or each batch of N's, in a fresh
+worker process, with a timeout and a memory limit per N. The timings are
+written to an array in shared memory, and each worker reports over a pipe
+when an N is done, so that a crash or a timeout only loses the N being
+measured.
+
+Example:
+--------
+
+    >>> from big_o import datagen, isolation
+    >>> with isolation.WorkerPool(n_workers=2, timeout=10.) as pool:
+    ...     ns, time = big_o.measure_execution_time(
+    ...         leaky_function, datagen.range_n, isolation=pool)
+    >>> pool.failures
+    [(100000, 'timed out after 10 seconds')]
+"""
+
+import multiprocessing
+import time
+from multiprocessing import connection, shared_memory
+
+import numpy as np
+
+from big_o.big_o import _thread_limit_environ
+
+# Columns of a row of the shared results array: the aggregated time, the
+# number of timings, then the timings
+_TIME, _COUNT, _TIMINGS = 0, 1, 2
+
+
+def _max_timings(timing):
+    """ Return the largest number of timings `timing` takes at one N. """
+    if timing.target_precision is None:
+        return timing.n_timings
+    return max(timing.n_timings, timing.max_timings, 3)
+
+
+def _limit_memory(memory_limit):
+    """ Limit the address space of this process to `memory_limit` bytes,
+    on platforms that support it. """
+    try:
+        import resource
+    except ImportError:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        memory_limit = min(memory_limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _worker_main(conn, memory_limit):
+    """ Main function of a worker process.
+
+    The worker sends ('ready',) over `conn` once it has started, waits for
+    a single job, measures its N's in order, and exits. For each N, it
+    writes the timings to the shared results array and sends ('done', index)
+    over `conn`, or ('error', index, message) if the data generator or the
+    function raised an exception.
+    """
+    if memory_limit is not None:
+        _limit_memory(memory_limit)
+    conn.send(('ready',))
+    job = conn.recv()
+    if job is None:
+        return
+    shm_name, shape, func, data_generator, timing, batch = job
+    shm = shared_memory.SharedMemory(name=shm_name)
+    results = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    try:
+        for index, n in batch:
+            try:
+                t, raw = timing.measure(func, data_generator, n)
+            except Exception as error:
+                conn.send(('error', index, repr(error)))
+                continue
+            results[index, _TIMINGS:_TIMINGS + len(raw)] = raw
+            results[index, _COUNT] = len(raw)
+            results[index, _TIME] = t
+            conn.send(('done', index))
+    finally:
+        del results
+        shm.close()
+        conn.close()
+
+
+class _Worker(object):
+    """ A worker process and the parent end of its pipe. """
+
+    def __init__(self, context, memory_limit):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main,
+                                       args=(child_conn, memory_limit),
+                                       daemon=True)
+        # numerical libraries read the thread limits when they are loaded,
+        # so they must be set when the process starts
+        with _thread_limit_environ():
+            self.process.start()
+        child_conn.close()
+        # indices of the N's of the job not measured yet, and deadline of
+        # the first one
+        self.remaining = []
+        self.deadline = None
+
+    def wait_ready(self):
+        """ Wait until the worker has started. """
+        try:
+            self.conn.recv()
+        except EOFError:
+            self.stop()
+            raise RuntimeError('worker process exited with code {} while '
+                               'starting'.format(self.process.exitcode))
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool(object):
+    """ Pool of worker processes measuring N's in isolation.
+
+    Each worker process measures a single batch of `batch_size` N's, and
+    exits. Fresh workers are started in advance, so that they are ready
+    when a batch is sent to them; the pool can be reused for several sweeps,
+    and is closed with `close`, or at the end of a `with` block.
+
+    The measurement of an N fails if the data generator or the function
+    raises an exception, if it takes longer than `timeout`, or if the worker
+    exits, e.g. because it ran out of memory. Failed N's are left out of the
+    results, and listed in `failures`; the remaining N's of the batch are
+    measured by a new worker.
+
+    `func`, `data_generator` and the `big_o.timing.Timing` settings are sent
+    to the workers, and must be picklable (e.g., functions defined at module
+    level).
+
+    Input:
+    ------
+
+    n_workers -- Number of batches measured in parallel.
+
+    batch_size -- Number of N's measured by each worker process. With 1
+                  (default), each N is measured in a fresh process.
+
+    timeout -- Maximum time in seconds to generate the data and measure
+               the function at a single N. The worker is killed when the
+               timeout expires. Default: None, no timeout.
+
+    memory_limit -- Maximum size in bytes of the address space of each
+                    worker, on platforms that support it (see
+                    `resource.RLIMIT_AS`). The limit includes the memory
+                    used by the Python interpreter and the imported modules.
+                    Default: None, no limit.
+
+    context -- Name of the `multiprocessing` start method of the workers.
+               With the default, 'spawn', each worker is a fresh
+               interpreter, and numerical libraries are limited to one
+               thread per worker; `func` and `data_generator` must then be
+               importable, as well as picklable. With 'fork', workers start
+               faster, but inherit the modules and the state of this
+               process, including the thread pools of numerical libraries.
+
+    Attributes:
+    -----------
+
+    failures -- List of (N, message) for the N's that failed in the last
+                call to `measure`.
+    """
+
+    def __init__(self, n_workers=1, batch_size=1, timeout=None,
+                 memory_limit=None, context='spawn'):
+        if n_workers < 1 or batch_size < 1:
+            raise ValueError('n_workers and batch_size must be at least 1')
+        self.n_workers = n_workers
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self._context = multiprocessing.get_context(context)
+        self._idle = []
+        self.failures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Stop the idle worker processes. """
+        while self._idle:
+            worker = self._idle.pop()
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.stop()
+
+    def _take_worker(self):
+        """ Return an idle worker, and start a fresh one to replace it. """
+        while len(self._idle) <= self.n_workers:
+            self._idle.append(_Worker(self._context, self.memory_limit))
+        worker = self._idle.pop(0)
+        worker.wait_ready()
+        return worker
+
+    def measure(self, func, data_generator, ns, timing):
+        """ Measure the execution time of `func` for all `ns`, with the
+        settings of the `big_o.timing.Timing` object `timing`.
+
+        Output:
+        -------
+
+        time -- Array of execution times for each N in seconds, NaN for the
+                N's that failed
+
+        raw_timings -- List of arrays of all the timings for each N, None
+                       for the N's that failed
+        """
+        n_points = len(ns)
+        shape = (n_points, _TIMINGS + _max_timings(timing))
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(1, n_points * shape[1] * 8))
+        results = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        try:
+            results[:] = np.nan
+            errors = self._run(shm.name, shape, func, data_generator, ns,
+                               timing)
+            measured = ~np.isnan(results[:, _TIME])
+            time_ = results[:, _TIME].copy()
+            raw_timings = [
+                results[i, _TIMINGS:_TIMINGS + int(results[i, _COUNT])].copy()
+                if measured[i] else None
+                for i in range(n_points)]
+        finally:
+            del results
+            shm.close()
+            shm.unlink()
+        self.failures = [(ns[i], errors[i]) for i in sorted(errors)]
+        return time_, raw_timings
+
+    def _run(self, shm_name, shape, func, data_generator, ns, timing):
+        """ Run the batches of N's in the workers until all N's are done or
+        failed, and return a dict of error messages by index. """
+        pending = [list(range(start, min(start + self.batch_size, len(ns))))
+                   for start in range(0, len(ns), self.batch_size)]
+        running = {}
+        errors = {}
+
+        def fail(worker, message, kill=False):
+            index = worker.remaining.pop(0)
+            errors[index] = message
+            del running[worker.conn]
+            worker.stop(kill=kill)
+            if worker.remaining:
+                pending.insert(0, worker.remaining)
+
+        while pending or running:
+            while pending and len(running) < self.n_workers:
+                worker = self._take_worker()
+                worker.remaining = pending.pop(0)
+                worker.conn.send((shm_name, shape, func, data_generator,
+                                  timing, [(i, ns[i]) for i in worker.remaining]))
+                if self.timeout is not None:
+                    worker.deadline = time.monotonic() + self.timeout
+                running[worker.conn] = worker
+
+            wait_timeout = None
+            if self.timeout is not None:
+                wait_timeout = max(0., min(w.deadline for w in running.values())
+                                   - time.monotonic())
+            for conn in connection.wait(list(running), wait_timeout):
+                worker = running[conn]
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    worker.process.join()
+                    fail(worker, 'worker exited with code {}'.format(
+                        worker.process.exitcode))
+                    continue
+                if message[0] == 'error':
+                    errors[message[1]] = message[2]
+                worker.remaining.pop(0)
+                if self.timeout is not None:
+                    worker.deadline = time.monotonic() + self.timeout
+                if not worker.remaining:
+                    del running[conn]
+                    worker.stop()
+
+            if self.timeout is not None:
+                now = time.monotonic()
+                for worker in list(running.values()):
+                    if worker.deadline <= now:
+                        fail(worker, 'timed out after {:g} seconds'.format(
+                            self.timeout), kill=True)
+        return errors
@@ -0,0 +1,264 @@
+"""Model selection among fitted complexity classes.
+
+A criterion turns the fit of each complexity class into a score, lower
+is better, that balances the goodness of fit with the number of
+coefficients of the class:
+
+- 'aic': Akaike information criterion
+- 'bic': Bayesian information criterion, which penalizes coefficients
+  more than AIC as the number of measurements grows
+- 'cv': leave-one-out cross-validation error, scaled as an information
+  criterion without penalty
+- 'residuals': the sum of square errors, the selection used before the
+  information criteria, where a simpler class is preferred only when its
+  residuals are within a fixed `simplicity_bias`
+
+All the scores but 'residuals' are on the scale of a log-likelihood, so
+that they can be compared across classes that fit a transformed time
+(e.g., Polynomial and Exponential fit log(t)), and converted into
+probabilities with `confidence`.
+"""
+
+import numpy as np
+
+#: Residuals smaller than this fraction of the sum of squared times are
+# indistinguishable from round-off errors, and are treated as equal.
+_RELATIVE_RESOLUTION = 1e-12
+
+
+def n_coefficients(class_, n_dims=1):
+    """ Number of coefficients fitted by a complexity class. """
+    n = np.ones((1, n_dims)) if n_dims > 1 else np.ones(1)
+    return class_()._transform_n(n).shape[1]
+
+
+def _log_likelihood_term(residuals, t):
+    """ Return n*log(RSS/n) for each class and series.
+
+    `residuals` has shape (number of classes, ...) and `t` has shape
+    (number of N's, ...).
+    """
+    return _log_likelihood_from_sums(residuals, t.shape[0],
+                                     np.sum(t ** 2, axis=0))
+
+
+def _log_likelihood_from_sums(residuals, n_points, sum_t2):
+    """ Return n*log(RSS/n) from the number of N's and the sum of squared
+    times of each series. """
+    floor = np.maximum(_RELATIVE_RESOLUTION * sum_t2, np.finfo(float).tiny)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return n_points * np.log(np.maximum(residuals, floor) / n_points)
+
+
+def aic(residuals, t, n_coeffs):
+    """ Akaike information criterion of each class.
+
+    Input:
+    ------
+
+    residuals -- Sum of square errors of the fit, as an array of shape
+                 (number of classes, ...) as returned by
+                 `big_o.complexities.fit_classes`
+
+    t -- Array of execution times with shape (number of N's, ...)
+
+    n_coeffs -- Number of coefficients of each class
+
+    Output:
+    -------
+
+    scores -- Array with the same shape as `residuals`, lower is better
+    """
+    return scores_from_sums(residuals, t.shape[0], np.sum(t ** 2, axis=0),
+                            n_coeffs, 'aic')
+
+
+def bic(residuals, t, n_coeffs):
+    """ Bayesian information criterion of each class.
+
+    See `aic` for the arguments.
+    """
+    return scores_from_sums(residuals, t.shape[0], np.sum(t ** 2, axis=0),
+                            n_coeffs, 'bic')
+
+
+def scores_from_sums(residuals, n_points, sum_t2, n_coeffs, criterion='bic'):
+    """ Score the fit of each class from running sums of the measurements.
+
+    The information criteria only depend on the execution times through
+    their number and the sum of their squares, so that the scores can be
+    updated in constant time as measurements arrive (see
+    `big_o.IncrementalClassifier`). The 'cv' criterion depends on every
+    measurement, and is not supported.
+
+    Input:
+    ------
+
+    residuals -- Sum of square errors of the fit of each class, as an array
+                 of shape (number of classes, ...)
+
+    n_points -- Number of measurements
+
+    sum_t2 -- Sum of the squared execution times, for each series
+
+    n_coeffs -- Number of coefficients of each class
+
+    criterion -- 'aic', 'bic' or 'residuals'
+
+    Output:
+    -------
+
+    scores -- Array with the same shape as `residuals`, lower is better
+    """
+    if criterion == 'residuals':
+        return np.asarray(residuals, dtype=float)
+    if criterion == 'aic':
+        penalty = 2.
+    elif criterion == 'bic':
+        penalty = np.log(n_points)
+    else:
+        raise ValueError('Unsupported model selection criterion for running '
+                         'sums: {!r}'.format(criterion))
+    penalty = penalty * np.asarray(n_coeffs, dtype=float)
+    penalty = penalty.reshape((-1,) + (1,) * (np.ndim(residuals) - 1))
+    return _log_likelihood_from_sums(residuals, n_points, sum_t2) + penalty
+
+
+def loo_residuals(classes, n, t):
+    """ Leave-one-out cross-validation error of each class.
+
+    The prediction at each N of a least squares fit to the other N's is
+    computed in closed form from the diagonal of the hat matrix, so that
+    no refit is needed.
+
+    Input:
+    ------
+
+    classes -- List of subclasses of `ComplexityClass`
+
+    n -- Array of values of N for which execution time has been measured.
+
+    t -- Array of execution times, with shape (number of N's,) or
+         (number of N's, number of series)
+
+    Output:
+    -------
+
+    residuals -- Sum of square prediction errors on the original time
+                 scale, as an array of shape (number of classes, ...)
+    """
+    n = np.asanyarray(n, dtype=float)
+    t = np.asanyarray(t, dtype=float)
+    is_1d = (t.ndim == 1)
+    if is_1d:
+        t = t[:, np.newaxis]
+
+    hat_cache = {}
+    residuals = np.empty((len(classes), t.shape[1]))
+    for i, class_ in enumerate(classes):
+        inst = class_()
+        x = inst._transform_n(n)
+        key = (x.shape, x.tobytes())
+        if key not in hat_cache:
+            pinv = np.linalg.pinv(x)
+            hat_cache[key] = (pinv, np.einsum('ij,ji->i', x, pinv))
+        pinv, leverage = hat_cache[key]
+
+        with np.errstate(all='ignore'):
+            y = inst._transform_time(t)
+            errors = y - x @ (pinv @ y)
+            y_loo = y - errors / (1. - leverage)[:, np.newaxis]
+            t_loo = inst._inverse_transform_time(y_loo)
+            residuals[i] = np.sum((t_loo - t) ** 2, axis=0)
+    residuals[~np.isfinite(residuals)] = np.nan
+
+    if is_1d:
+        residuals = residuals[:, 0]
+    return residuals
+
+
+def cv(classes, n, t):
+    """ Cross-validation score of each class, lower is better.
+
+    See `loo_residuals` for the arguments.
+    """
+    t = np.asanyarray(t, dtype=float)
+    return _log_likelihood_term(loo_residuals(classes, n, t), t)
+
+
+#: Information criteria by name, called as criterion(residuals, t, n_coeffs)
+CRITERIA = {
+    'aic': aic,
+    'bic': bic,
+}
+
+
+def scores(classes, n, t, residuals, criterion='bic', loo=None):
+    """ Score the fit of each class with a model selection criterion.
+
+    Input:
+    ------
+
+    classes -- List of subclasses of `ComplexityClass`
+
+    n -- Array of values of N for which execution time has been measured.
+
+    t -- Array of execution times, with shape (number of N's,) or
+         (number of N's, number of series)
+
+    residuals -- Sum of square errors of the fit of each class, as returned
+                 by `big_o.complexities.fit_classes`
+
+    criterion -- 'aic', 'bic', 'cv' or 'residuals'
+
+    loo -- Leave-one-out residuals for the 'cv' criterion, if already
+           computed; by default, they are computed with `loo_residuals`
+
+    Output:
+    -------
+
+    scores -- Array with the same shape as `residuals`, lower is better.
+              NaN for the classes that could not be fitted.
+    """
+    if criterion == 'residuals':
+        return np.asarray(residuals, dtype=float)
+    t = np.asanyarray(t, dtype=float)
+    if criterion == 'cv':
+        if loo is None:
+            return cv(classes, n, t)
+        return _log_likelihood_term(loo, t)
+    if criterion not in CRITERIA:
+        raise ValueError('Unknown model selection criterion: {!r}'.format(
+            criterion))
+    n_dims = np.shape(n)[1] if np.ndim(n) == 2 else 1
+    n_coeffs = [n_coefficients(class_, n_dims) for class_ in classes]
+    return CRITERIA[criterion](residuals, t, n_coeffs)
+
+
+def confidence(scores, criterion='bic'):
+    """ Probability of each class to be the best one.
+
+    For the information criteria, these are the Akaike weights
+    exp(-score/2), normalized over the classes. The 'residuals' criterion
+    has no probabilistic interpretation, and all probabilities are NaN.
+
+    Input:
+    ------
+
+    scores -- Array of shape (number of classes, ...), as returned by
+              `scores`
+
+    Output:
+    -------
+
+    probabilities -- Array with the same shape as `scores`, that sums to 1
+                     over the classes that could be fitted
+    """
+    scores = np.asarray(scores, dtype=float)
+    if criterion == 'residuals':
+        return np.full(scores.shape, np.nan)
+    finite = np.isfinite(scores)
+    with np.errstate(invalid='ignore'):
+        best = np.min(np.where(finite, scores, np.inf), axis=0)
+        weights = np.where(finite, np.exp(-0.5 * (scores - best)), 0.)
+        return weights / np.sum(weights, axis=0)
@@ -0,0 +1,344 @@
+"""Versioned serialization of fitted complexity classes and runs.
+
+A run is the output of `big_o.big_o`, i.e. the best complexity class and
+the dictionary of fitted complexity classes, with the measured N's and
+execution times under 'measures' and 'times' if `return_raw_data=True`.
+
+- `run_to_dict` and `run_from_dict` convert a run to and from plain Python
+  types, e.g. to store it as JSON.
+- `save_runs` stores many runs in a single columnar .npz file, with one
+  array per field for all the runs, and `load_runs` reads it back lazily:
+  the arrays are memory-mapped, and Python objects are only created for
+  the runs that are accessed.
+"""
+
+import struct
+import zipfile
+
+import numpy as np
+
+from big_o.complexities import (
+    SERIALIZATION_VERSION,
+    ComplexityClass,
+    class_by_name,
+)
+from big_o.selection import n_coefficients
+
+_RAW_DATA_KEYS = ('measures', 'times')
+
+
+def _check_version(version):
+    if version > SERIALIZATION_VERSION:
+        raise ValueError('Unsupported serialization version: {}'.format(
+            version))
+
+
+def _to_plain(value):
+    """ Convert arrays and NumPy scalars, also inside lists and tuples, to
+    plain Python types. """
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(item) for item in value]
+    return np.asarray(value).tolist()
+
+
+def run_to_dict(best, fitted):
+    """ Return a dictionary of plain Python types describing a run.
+
+    Input:
+    ------
+
+    best, fitted -- The output of `big_o.big_o` or `big_o.infer_big_o_class`
+
+    Output:
+    -------
+
+    data -- Dictionary with the serialization 'version', the 'best' class,
+            the 'fitted' classes with their 'residuals', and the other
+            entries of `fitted` (e.g., 'measures' and 'times'), with arrays
+            converted to lists
+    """
+    classes = []
+    extra = {}
+    for key, value in fitted.items():
+        if isinstance(key, ComplexityClass):
+            class_data = key.to_dict()
+            class_data['residuals'] = float(value)
+            classes.append(class_data)
+        else:
+            extra[key] = _to_plain(value)
+    data = {
+        'version': SERIALIZATION_VERSION,
+        'best': None if best is None else best.to_dict(),
+        'fitted': classes,
+    }
+    data.update(extra)
+    return data
+
+
+def run_from_dict(data):
+    """ Recreate a run from the output of `run_to_dict`.
+
+    Output: (best, fitted), as returned by `big_o.big_o`. The best class is
+    the same object as the corresponding key of `fitted`.
+    """
+    _check_version(data.get('version', SERIALIZATION_VERSION))
+    best_name = None if data['best'] is None else data['best']['class']
+    best = None
+    fitted = {}
+    for class_data in data['fitted']:
+        inst = ComplexityClass.from_dict(class_data)
+        fitted[inst] = class_data['residuals']
+        if class_data['class'] == best_name:
+            best = inst
+    for key, value in data.items():
+        if key not in ('version', 'best', 'fitted'):
+            fitted[key] = np.array(value) if key in _RAW_DATA_KEYS else value
+    return best, fitted
+
+
+def save_runs(path, runs):
+    """ Store many runs in a columnar .npz file.
+
+    The file contains one array per field, for all the runs: the fitted
+    coefficients and residuals of each class, the index of the best class,
+    and the measured N's and times of all runs concatenated, with the
+    offsets of each run. The file is not compressed, so that it can be
+    memory-mapped by `load_runs`.
+
+    Input:
+    ------
+
+    path -- Path of the .npz file
+
+    runs -- Dictionary of run names (strings) to (best, fitted) tuples, as
+            returned by `big_o.big_o`. Only the fitted classes, with their
+            coefficient covariance and confidence, and the 'measures' and
+            'times' entries of `fitted` are stored.
+    """
+    names = sorted(runs)
+    class_names = []
+    class_index = {}
+    n_coeffs = 1
+    for name in names:
+        for key in runs[name][1]:
+            if isinstance(key, ComplexityClass):
+                class_name = type(key).__name__
+                if class_name not in class_index:
+                    class_index[class_name] = len(class_names)
+                    class_names.append(class_name)
+                if key.coeff is not None:
+                    n_coeffs = max(n_coeffs, len(key.coeff))
+
+    n_runs = len(names)
+    best = np.full(n_runs, -1, dtype='int32')
+    coeff = np.full((n_runs, len(class_names), n_coeffs), np.nan)
+    coeff_cov = np.full((n_runs, len(class_names), n_coeffs, n_coeffs),
+                        np.nan)
+    sigma2 = np.full((n_runs, len(class_names)), np.nan)
+    confidence = np.full((n_runs, len(class_names)), np.nan)
+    residuals = np.full((n_runs, len(class_names)), np.nan)
+    quantity = np.empty(n_runs, dtype='U16')
+    units = np.empty(n_runs, dtype='U16')
+    offsets = np.zeros(n_runs + 1, dtype='int64')
+    measures = []
+    times = []
+    for i, name in enumerate(names):
+        run_best, fitted = runs[name]
+        quantity[i] = ComplexityClass.quantity
+        units[i] = ComplexityClass.units
+        for key, value in fitted.items():
+            if not isinstance(key, ComplexityClass):
+                continue
+            j = class_index[type(key).__name__]
+            residuals[i, j] = value
+            if key.coeff is not None:
+                coeff[i, j, :len(key.coeff)] = key.coeff
+            if key.coeff_cov is not None:
+                cov, sigma2[i, j] = key.coeff_cov
+                coeff_cov[i, j, :len(cov), :len(cov)] = cov
+            if key.confidence is not None:
+                confidence[i, j] = key.confidence
+            if key is run_best:
+                best[i] = j
+            quantity[i], units[i] = key.quantity, key.units
+        run_measures = np.asarray(fitted.get('measures', []))
+        run_times = np.asarray(fitted.get('times', []), dtype=float)
+        if len(run_measures) != len(run_times):
+            raise ValueError('Run {!r} has {} measures but {} times'.format(
+                name, len(run_measures), len(run_times)))
+        measures.append(run_measures)
+        times.append(run_times)
+        offsets[i + 1] = offsets[i] + len(run_times)
+
+    measures = [m for m in measures if len(m) > 0]
+    if len(set(m.ndim for m in measures)) > 1:
+        raise ValueError('All runs must have the same number of size '
+                         'parameters')
+    np.savez(
+        path,
+        version=np.array([SERIALIZATION_VERSION]),
+        names=np.array(names, dtype='U'),
+        class_names=np.array(class_names, dtype='U'),
+        best=best,
+        coeff=coeff,
+        coeff_cov=coeff_cov,
+        sigma2=sigma2,
+        confidence=confidence,
+        residuals=residuals,
+        quantity=quantity,
+        units=units,
+        offsets=offsets,
+        measures=(np.concatenate(measures) if measures
+                  else np.empty(0, dtype='int64')),
+        times=(np.concatenate(times) if times else np.empty(0)),
+    )
+
+
+def _memmap_npz(path):
+    """ Memory-map the arrays of an uncompressed .npz file.
+
+    Output: dictionary of array names to read-only `numpy.memmap` arrays.
+    Compressed arrays, or arrays in a format that cannot be mapped, are
+    read in memory.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            key = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[key] = np.lib.format.read_array(member)
+                continue
+            # the data follows the local file header, whose name and extra
+            # field lengths can differ from those of the central directory
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                header = np.lib.format.read_array_header_2_0(f)
+            else:
+                with archive.open(info) as member:
+                    arrays[key] = np.lib.format.read_array(member)
+                continue
+            shape, fortran_order, dtype = header
+            if int(np.prod(shape)) == 0:
+                arrays[key] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[key] = np.memmap(
+                    path, dtype=dtype, mode='r', offset=f.tell(),
+                    shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+
+class RunStore(object):
+    """ Runs loaded from a file written by `save_runs`.
+
+    Runs are accessed by name or position, e.g. `store['sorted']` or
+    `store[0]`, and are returned as (best, fitted) tuples like those of
+    `big_o.big_o`. Only the accessed runs are converted to Python objects;
+    the columnar arrays (`names`, `class_names`, `best`, `coeff`,
+    `coeff_cov`, `sigma2`, `confidence`, `residuals`, `offsets`, `measures`
+    and `times`) can be used directly to process all the runs at once.
+    """
+
+    def __init__(self, arrays):
+        _check_version(int(arrays['version'][0]))
+        self._arrays = arrays
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_arrays'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """ Iterate over the names of the runs, in sorted order. """
+        for i in range(len(self)):
+            yield str(self.names[i])
+
+    def __contains__(self, name):
+        return self._index(name) is not None
+
+    def _index(self, name):
+        # the names are sorted, so that no dictionary of names is needed
+        i = int(np.searchsorted(self.names, name))
+        if i < len(self) and self.names[i] == name:
+            return i
+        return None
+
+    def raw_data(self, key):
+        """ Return the (ns, times) measured in a run, as array views. """
+        i = self._position(key)
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return self.measures[start:stop], self.times[start:stop]
+
+    def _position(self, key):
+        if isinstance(key, str):
+            i = self._index(key)
+            if i is None:
+                raise KeyError(key)
+            return i
+        if not -len(self) <= key < len(self):
+            raise IndexError(key)
+        return key % len(self)
+
+    def __getitem__(self, key):
+        i = self._position(key)
+        # files written before the covariance was stored do not have it
+        coeff_cov = self._arrays.get('coeff_cov')
+        confidence = self._arrays.get('confidence')
+        best = None
+        fitted = {}
+        for j, class_name in enumerate(self.class_names):
+            residuals = self.residuals[i, j]
+            if np.isnan(residuals):
+                continue
+            class_ = class_by_name(str(class_name))
+            inst = class_()
+            n_coeffs = n_coefficients(class_, class_.n_size_parameters)
+            inst.coeff = np.array(self.coeff[i, j, :n_coeffs])
+            if coeff_cov is not None and not np.isnan(self.sigma2[i, j]):
+                inst.coeff_cov = (
+                    np.array(coeff_cov[i, j, :n_coeffs, :n_coeffs]),
+                    float(self.sigma2[i, j]))
+            if confidence is not None and not np.isnan(confidence[i, j]):
+                inst.confidence = float(confidence[i, j])
+            inst.quantity, inst.units = str(self.quantity[i]), str(self.units[i])
+            fitted[inst] = float(residuals)
+            if j == self.best[i]:
+                best = inst
+        ns, times = self.raw_data(i)
+        if len(times) > 0:
+            fitted['measures'] = np.array(ns)
+            fitted['times'] = np.array(times)
+        return best, fitted
+
+
+def load_runs(path, mmap=True):
+    """ Load the runs stored by `save_runs`.
+
+    Input:
+    ------
+
+    path -- Path of the .npz file
+
+    mmap -- If True, the arrays are memory-mapped and only read from disk
+            when accessed. Otherwise, they are read in memory.
+
+    Output:
+    -------
+
+    store -- `RunStore` object
+    """
+    if mmap:
+        arrays = _memmap_npz(path)
+    else:
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+    return RunStore(arrays)
@@ -1,11 +1,15 @@
+import asyncio
+import os
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-from numpy.testing import assert_array_almost_equal, assert_array_equal
+from numpy.testing import assert_allclose, assert_array_almost_equal, assert_array_equal
 
 import big_o
-from big_o import complexities as compl, datagen
+from big_o import complexities as compl, datagen, selection
+from big_o.big_o import THREAD_LIMIT_ENV_VARS, _worker_pool
 
 
 def dummy_constant_function(n):
@@ -16,6 +20,12 @@ def dummy_constant_function(n):
     return n
 
 
+def initial_environ():
+    # environment the current process was started with (Linux only)
+    with open('/proc/self/environ', 'rb') as f:
+        return f.read().split(b'\0')
+
+
 def dummy_linear_function(n):
     # Dummy operation with linear complexity.
 
@@ -72,6 +82,301 @@ class TestBigO(unittest.TestCase):
         assert_array_equal(ns, np.arange(1, 6))
         assert_array_almost_equal(t * 10., np.arange(1, 6), 1)
 
+    def test_measure_execution_time_autorange(self):
+        def f(n):
+            time.sleep(0.001 * n)
+
+        ns, t = big_o.measure_execution_time(
+            f, datagen.n_,
+            min_n=1, max_n=5, n_measures=5, n_repeats='auto',
+            autorange_duration=0.02
+        )
+        assert_array_almost_equal(t * 1000., np.arange(1, 6), 0)
+
+    def test_measure_execution_time_timer_strategy(self):
+        def f(n):
+            time.sleep(0.01 * n)
+
+        ns, t = big_o.measure_execution_time(
+            f, datagen.n_, min_n=1, max_n=3, n_measures=3,
+            timer_strategy=big_o.timing.TimerStrategy(clock='process')
+        )
+        self.assertTrue(np.all(t < 0.005))
+
+    def test_measure_execution_time_raw_timings(self):
+        ns, t, raw_timings = big_o.measure_execution_time(
+            dummy_linear_function, datagen.n_,
+            min_n=10, max_n=100, n_measures=4, n_timings=5,
+            aggregate='median', return_raw_timings=True
+        )
+        self.assertEqual(len(raw_timings), 4)
+        for i, raw in enumerate(raw_timings):
+            self.assertEqual(len(raw), 5)
+            self.assertEqual(t[i], np.median(raw))
+
+    def test_measure_execution_time_n_workers(self):
+        ns, t = big_o.measure_execution_time(
+            dummy_linear_function, datagen.n_,
+            min_n=10, max_n=1000, n_measures=6, n_workers=2
+        )
+        assert_array_equal(ns, np.linspace(10, 1000, 6).astype('int64'))
+        self.assertEqual(t.shape, (6,))
+        self.assertTrue(np.all(t > 0))
+
+    def test_worker_pool_limits_threads(self):
+        # numerical libraries read the variables when they are loaded, so
+        # they must be in the environment the worker process started with
+        if not os.path.exists('/proc/self/environ'):
+            self.skipTest('the initial environment is not available')
+        previous = os.environ.get('OMP_NUM_THREADS')
+        with _worker_pool(2) as pool:
+            environ = pool.submit(initial_environ).result()
+        for name in THREAD_LIMIT_ENV_VARS:
+            self.assertIn(name.encode() + b'=1', environ)
+        self.assertEqual(os.environ.get('OMP_NUM_THREADS'), previous)
+
+    def test_measure_execution_time_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ns, t = big_o.measure_execution_time(
+                dummy_linear_function, datagen.n_,
+                min_n=10, max_n=1000, n_measures=6, executor=executor
+            )
+        self.assertEqual(len(ns), 6)
+        self.assertEqual(t.shape, (6,))
+
+        self.assertRaises(ValueError, big_o.measure_execution_time,
+                          dummy_linear_function, datagen.n_,
+                          n_workers=2, executor=executor)
+
+    def test_measure_execution_time_adaptive(self):
+        ns, t = big_o.measure_execution_time_adaptive(
+            dummy_linear_function, datagen.n_,
+            min_n=10, max_n=10000, n_measures=12, n_initial=4
+        )
+        self.assertEqual(ns[0], 10)
+        self.assertEqual(ns[-1], 10000)
+        self.assertGreaterEqual(len(ns), 4)
+        self.assertLessEqual(len(ns), 12)
+        self.assertTrue(np.all(np.diff(ns) > 0))
+        self.assertEqual(t.shape, ns.shape)
+
+        # geometric spacing starts at 1 for min_n=0
+        ns, _ = big_o.measure_execution_time_adaptive(
+            dummy_linear_function, datagen.n_,
+            min_n=0, max_n=1000, n_measures=4, n_initial=4
+        )
+        self.assertEqual(ns[0], 1)
+
+    def test_big_o_sampling(self):
+        best, fitted = big_o.big_o(
+            dummy_linear_function, datagen.n_,
+            min_n=10, max_n=1000, n_measures=8,
+            sampling='adaptive', return_raw_data=True)
+        self.assertIsInstance(best, compl.ComplexityClass)
+        self.assertLessEqual(len(fitted['measures']), 8)
+
+        self.assertRaises(ValueError, big_o.big_o,
+                          dummy_linear_function, datagen.n_,
+                          sampling='random')
+
+    def test_measure_execution_time_budget(self):
+        def f(n):
+            time.sleep(0.01 * n)
+
+        ns, t = big_o.measure_execution_time(
+            f, datagen.n_,
+            min_n=1, max_n=20, n_measures=20, time_budget=0.5
+        )
+        self.assertLess(len(ns), 20)
+        self.assertEqual(t.shape, ns.shape)
+        self.assertLess(np.sum(t), 0.5)
+
+        self.assertRaises(ValueError, big_o.measure_execution_time,
+                          f, datagen.n_, n_workers=2, time_budget=1.)
+
+    def test_measure_execution_time_budget_constant(self):
+        def f(n):
+            time.sleep(0.05)
+
+        # extrapolating linearly from the first point would skip the
+        # second one, and the constant cost would go unnoticed
+        ns, t, truncated = big_o.measure_execution_time(
+            f, datagen.n_, min_n=10, max_n=100000, n_measures=4,
+            time_budget=1., return_truncated=True)
+        assert_array_equal(ns, [10, 33340, 66670, 100000])
+        self.assertFalse(truncated)
+
+        _, _, truncated = big_o.measure_execution_time(
+            f, datagen.n_, min_n=10, max_n=100000, n_measures=40,
+            time_budget=0.5, return_truncated=True)
+        self.assertTrue(truncated)
+
+        _, _, truncated = big_o.measure_execution_time(
+            f, datagen.n_, n_measures=2, return_truncated=True)
+        self.assertFalse(truncated)
+
+    def test_big_o_time_budget(self):
+        def f(n):
+            time.sleep(0.001 * n)
+
+        _, fitted = big_o.big_o(f, datagen.n_, min_n=1, max_n=10,
+                                n_measures=5, time_budget=10.)
+        self.assertFalse(fitted['truncated'])
+
+        start = time.perf_counter()
+        best, fitted = big_o.big_o(f, datagen.n_, min_n=1, max_n=1000,
+                                   n_measures=10, time_budget=0.5)
+        self.assertLess(time.perf_counter() - start, 1.)
+        self.assertTrue(fitted['truncated'])
+        self.assertIsInstance(best, compl.ComplexityClass)
+
+    def test_measure_execution_time_data_cache(self):
+        calls = []
+
+        def generator(n):
+            calls.append(n)
+            return n
+
+        cache = datagen.DataCache()
+        for _ in range(2):
+            ns, t = big_o.measure_execution_time(
+                dummy_linear_function, generator,
+                min_n=10, max_n=100, n_measures=5, data_cache=cache
+            )
+        self.assertEqual(calls, list(ns))
+
+        # prefix-sliceable generators are called only once, for max_n
+        cache.clear()
+        big_o.measure_execution_time(
+            len, datagen.range_n, min_n=10, max_n=100, n_measures=5,
+            data_cache=cache
+        )
+        self.assertEqual(len(cache), 1)
+
+        # max_n can be a float, as without cache
+        cache.clear()
+        ns, _ = big_o.measure_execution_time(
+            len, datagen.range_n, min_n=10, max_n=1e3, n_measures=5,
+            data_cache=cache
+        )
+        self.assertEqual(ns[-1], 1000)
+        self.assertEqual(len(cache), 1)
+
+        self.assertRaises(ValueError, big_o.measure_execution_time,
+                          len, datagen.range_n, n_workers=2, data_cache=cache)
+
+    def test_measure_memory_usage(self):
+        def allocate(n):
+            return [0] * n
+
+        ns, memory, rss_delta = big_o.measure_memory_usage(
+            allocate, datagen.n_, min_n=1000, max_n=100000, n_measures=5,
+            rss=True)
+        assert_array_equal(ns, np.linspace(1000, 100000, 5).astype('int64'))
+        self.assertEqual(rss_delta.shape, (5,))
+        # a list of N references takes at least 8*N bytes
+        self.assertTrue(np.all(memory >= 8 * ns))
+        self.assertTrue(np.all(memory < 16 * ns + 1000))
+
+        _, memory = big_o.measure_memory_usage(
+            len, datagen.range_n, min_n=1000, max_n=100000, n_measures=5)
+        self.assertTrue(np.all(memory < 1000))
+
+    def test_big_o_memory(self):
+        def allocate(n):
+            return [0] * n
+
+        best, fitted = big_o.big_o(allocate, datagen.n_, metric='memory')
+        self.assertIsInstance(best, compl.Linear)
+        self.assertIn('(bytes)', str(best))
+        self.assertIn('memory =', str(best))
+
+        self.assertRaises(ValueError, big_o.big_o, allocate, datagen.n_,
+                          metric='memory', sampling='adaptive')
+        self.assertRaises(ValueError, big_o.big_o, allocate, datagen.n_,
+                          metric='disk')
+
+    def test_measure_execution_time_async(self):
+        async def f(n):
+            await asyncio.sleep(0.01 * n)
+            return n
+
+        ns, t = big_o.measure_execution_time_async(
+            f, datagen.n_, min_n=1, max_n=5, n_measures=5, n_timings=3
+        )
+        assert_array_equal(ns, np.arange(1, 6))
+        assert_array_almost_equal(t * 100., np.arange(1, 6), 0)
+
+        # concurrent calls overlap
+        loop = asyncio.new_event_loop()
+        try:
+            ns, t = big_o.measure_execution_time_async(
+                f, datagen.n_, min_n=1, max_n=5, n_measures=5, n_timings=3,
+                concurrency=10, loop=loop
+            )
+            self.assertFalse(loop.is_closed())
+        finally:
+            loop.close()
+        assert_array_almost_equal(t * 100., np.arange(1, 6), 0)
+
+    def test_async_big_o(self):
+        async def linear(n):
+            return dummy_linear_function(n)
+
+        best, fitted = big_o.async_big_o(
+            linear, datagen.n_, min_n=100, max_n=10000, n_measures=10,
+            n_timings=3, return_raw_data=True)
+        self.assertIsInstance(best, compl.ComplexityClass)
+        self.assertEqual(len(fitted['measures']), 10)
+
+    def test_measure_execution_time_several_sizes(self):
+        def f(nm):
+            n, m = nm
+            time.sleep(0.001 * n * m)
+
+        ns, t = big_o.measure_execution_time(
+            f, lambda n, m: (n, m),
+            min_n=(1, 1), max_n=(3, 4), n_measures=3, n_timings=3
+        )
+        self.assertEqual(ns.shape, (9, 2))
+        assert_array_equal(np.unique(ns[:, 0]), [1, 2, 3])
+        assert_array_equal(np.unique(ns[:, 1]), [1, 2, 4])
+        self.assertTrue(np.all(t >= 0.001 * ns[:, 0] * ns[:, 1]))
+
+        best, _ = big_o.infer_big_o_class(ns, t)
+        self.assertIsInstance(best, compl.NTimesM)
+
+    def test_measure_execution_time_lhs(self):
+        np.random.seed(0)
+        ns, t = big_o.measure_execution_time(
+            lambda nm: None, lambda n, m: (n, m),
+            min_n=(0, 10000), max_n=(10000, 20000), n_measures=10,
+            sampling='lhs'
+        )
+        self.assertEqual(ns.shape, (10, 2))
+        # each of the 10 intervals of each size parameter is sampled once
+        assert_array_equal(np.sort(ns[:, 0] // 1000), np.arange(10))
+        assert_array_equal(np.sort((ns[:, 1] - 10000) // 1000), np.arange(10))
+
+        self.assertRaises(ValueError, big_o.measure_execution_time,
+                          lambda nm: None, lambda n, m: (n, m),
+                          min_n=(0, 100), max_n=(100, 200), time_budget=1.)
+
+    def test_big_o_several_sizes(self):
+        def join(nm):
+            n, m = nm
+            x = 0
+            for i in range(n):
+                for j in range(m):
+                    x += 1
+            return x
+
+        best, fitted = big_o.big_o(join, lambda n, m: (n, m),
+                                   min_n=(10, 10), max_n=(400, 400),
+                                   n_measures=5, n_timings=3)
+        self.assertIsInstance(best, compl.NTimesM)
+        self.assertEqual(len(fitted), len(compl.ALL_CLASSES_NM))
+
     def test_infer_big_o(self):
         desired = [
             (lambda x: x*0.+2., compl.Constant, [2.]),
@@ -91,6 +396,91 @@ class TestBigO(unittest.TestCase):
             self.assertEqual(class_, res_class.__class__)
             assert_array_almost_equal(coeff, res_class.coeff, 2)
 
+    def test_infer_big_o_class_many(self):
+        x = np.linspace(10, 100, 100)
+        desired = [
+            (lambda x: 4.*x, compl.Linear),
+            (lambda x: 3.*x**2., compl.Quadratic),
+            (lambda x: 1.5*np.log(x), compl.Logarithmic),
+            (lambda x: 0.6**x, compl.Exponential),
+        ]
+        times = np.array([f(x) for f, _ in desired])
+
+        best_idx, residuals = big_o.infer_big_o_class_many(x, times)
+        self.assertEqual(residuals.shape, (len(desired), len(compl.ALL_CLASSES)))
+        for i, (f, class_) in enumerate(desired):
+            self.assertEqual(compl.ALL_CLASSES[best_idx[i]], class_)
+            best, fitted = big_o.infer_big_o_class(x, times[i])
+            self.assertEqual(type(best), class_)
+            assert_allclose(
+                residuals[i], [fitted[inst] for inst in fitted],
+                rtol=1e-6, atol=1e-8)
+
+        # Ragged series, each with its own N's
+        ns = [x, x[:50], x[::3]]
+        ragged_times = [times[0], times[1][:50], times[2][::3]]
+        best_idx, residuals = big_o.infer_big_o_class_many(ns, ragged_times)
+        self.assertEqual(residuals.shape, (3, len(compl.ALL_CLASSES)))
+        assert_array_equal(
+            best_idx,
+            [compl.ALL_CLASSES.index(class_) for _, class_ in desired[:3]])
+
+    def test_infer_big_o_class_many_edge_cases(self):
+        for ns, times in (([], []), (np.arange(1, 4), np.empty((0, 3)))):
+            best_idx, residuals, confidence = big_o.infer_big_o_class_many(
+                ns, times, return_confidence=True)
+            self.assertEqual(best_idx.shape, (0,))
+            self.assertEqual(residuals.shape, (0, len(compl.ALL_CLASSES)))
+            self.assertEqual(confidence.shape, (0,))
+
+        x = np.arange(1., 4.)
+        for ns, times in ((x[:1], [[1.]]), ([x, []], [x, []]),
+                          ([x, x[:1]], [x, [1.]])):
+            self.assertRaises(ValueError, big_o.infer_big_o_class_many,
+                              ns, times)
+        # two points are enough to fit all the classes
+        best_idx, _ = big_o.infer_big_o_class_many([x, x[:2]], [x, x[:2]])
+        self.assertEqual(len(best_idx), 2)
+
+    def test_incremental_classifier(self):
+        x = np.linspace(10, 100, 100)
+        rng = np.random.default_rng(0)
+        desired = [
+            lambda x: x*0.+2.,
+            lambda x: 4.*x + 2.,
+            lambda x: 3.*x**2. + 2.,
+            lambda x: 1.5*np.log(x),
+            lambda x: x*np.log(x),
+            lambda x: 0.6**x,
+        ]
+        for f in desired:
+            y = f(x) * (1. + 0.001 * rng.random(len(x)))
+            classifier = big_o.IncrementalClassifier()
+            for n, t in zip(x, y):
+                classifier.update(n, t)
+            self.assertEqual(classifier.n_points, len(x))
+
+            best, fitted = big_o.infer_big_o_class(x, y)
+            self.assertIs(type(classifier.best), type(best))
+            assert_allclose(classifier.best.coeff, best.coeff, rtol=1e-6)
+            assert_allclose(list(classifier.fitted.values()),
+                            list(fitted.values()), rtol=1e-4)
+
+            # the runner-up is ranked with the criterion, not the residuals
+            scores = selection.scores(compl.ALL_CLASSES, x, y,
+                                      np.array(list(fitted.values())))
+            scores[list(fitted).index(best)] = np.nan
+            self.assertIs(type(classifier.runner_up),
+                          compl.ALL_CLASSES[np.nanargmin(scores)])
+
+    def test_incremental_classifier_few_points(self):
+        classifier = big_o.IncrementalClassifier()
+        classifier.update(10, 1.)
+        self.assertIsInstance(classifier.best, compl.Constant)
+        classifier.update(20, 2.)
+        self.assertIsNotNone(classifier.best)
+        self.assertEqual(len(classifier.fitted), len(compl.ALL_CLASSES))
+
     def test_infer_big_o_list_input(self):
         # Check a normal list / iterable can be passed to infer_big_o_class()
         ns = range(10, 100, 10)
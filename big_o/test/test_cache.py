@@ -0,0 +1,149 @@
+import functools
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+import big_o
+from big_o import datagen
+from big_o.cache import ResultCache
+from big_o.cli import _Generator
+
+
+def linear_function(n):
+    return sum(range(n))
+
+
+def other_linear_function(n):
+    return sum(range(n))
+
+
+class Scaled(object):
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def __call__(self, n):
+        return n * self.factor
+
+
+def sizes(n, m):
+    return n, m
+
+
+def product_function(sizes):
+    return sum(range(sizes[0] * sizes[1]))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.tmpdir, 'results.sqlite'))
+        self.params = {'min_n': 10, 'max_n': 100}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get(linear_function, datagen.n_, self.params))
+
+        ns = np.array([10, 50, 100])
+        times = np.array([0.1, 0.5, 1.0])
+        self.cache.put(linear_function, datagen.n_, self.params, ns, times)
+        cached_ns, cached_times = self.cache.get(
+            linear_function, datagen.n_, self.params)
+        assert_array_equal(cached_ns, ns)
+        assert_array_equal(cached_times, times)
+
+        # Any difference in the key is a cache miss
+        self.assertIsNone(self.cache.get(
+            linear_function, datagen.range_n, self.params))
+        self.assertIsNone(self.cache.get(
+            linear_function, datagen.n_, {'min_n': 10, 'max_n': 200}))
+        self.assertIsNone(self.cache.get(
+            other_linear_function, datagen.n_, self.params))
+
+        # The cache persists on disk
+        cache = ResultCache(self.cache.path)
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_partial_and_callable_objects(self):
+        ns = np.array([10, 100])
+        times = np.array([0.1, 1.0])
+        small = functools.partial(datagen.integers, min_=0, max_=10)
+        self.cache.put(linear_function, small, self.params, ns, times)
+        self.assertIsNotNone(self.cache.get(
+            linear_function, functools.partial(datagen.integers, min_=0, max_=10),
+            self.params))
+        # partials differing only in their arguments or wrapped function
+        for generator in (functools.partial(datagen.integers, min_=0, max_=10**9),
+                          functools.partial(datagen.strings)):
+            self.assertIsNone(self.cache.get(linear_function, generator,
+                                             self.params))
+        self.assertIsNone(self.cache.get(
+            functools.partial(linear_function), small, self.params))
+
+        # callable objects are cached only if they define cache_key()
+        self.cache.clear()
+        self.cache.put(linear_function, Scaled(2), self.params, ns, times)
+        self.assertEqual(len(self.cache), 0)
+        self.cache.put(linear_function, _Generator('integers', [0, 10], {}),
+                       self.params, ns, times)
+        self.assertIsNotNone(self.cache.get(
+            linear_function, _Generator('integers', [0, 10], {}), self.params))
+        self.assertIsNone(self.cache.get(
+            linear_function, _Generator('integers', [0, 100], {}), self.params))
+
+    def test_prune(self):
+        self.cache.put(linear_function, datagen.n_, self.params,
+                       np.array([10]), np.array([0.1]))
+        self.cache.prune(max_age=3600)
+        self.assertEqual(len(self.cache), 1)
+        self.cache.prune(max_age=-1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_expire_on_code_change(self):
+        def func(n):
+            return n
+
+        ns = np.array([10, 100])
+        times = np.array([0.1, 1.0])
+        self.cache.put(func, datagen.n_, self.params, ns, times)
+        self.cache.put(func, datagen.n_, {'min_n': 1}, ns, times)
+        self.assertEqual(len(self.cache), 2)
+
+        def func(n):  # noqa: F811
+            return n + 1
+
+        self.assertIsNone(self.cache.get(func, datagen.n_, self.params))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_big_o_result_cache(self):
+        _, fitted = big_o.big_o(linear_function, datagen.n_,
+                                min_n=10, max_n=1000, n_measures=5,
+                                result_cache=self.cache, return_raw_data=True)
+        self.assertEqual(len(self.cache), 1)
+
+        _, fitted_cached = big_o.big_o(linear_function, datagen.n_,
+                                       min_n=10, max_n=1000, n_measures=5,
+                                       result_cache=self.cache,
+                                       return_raw_data=True)
+        assert_array_equal(fitted['measures'], fitted_cached['measures'])
+        assert_array_equal(fitted['times'], fitted_cached['times'])
+
+    def test_big_o_result_cache_several_sizes(self):
+        options = dict(min_n=(10, 10), max_n=(1000, 1000), n_measures=3,
+                       result_cache=self.cache, return_raw_data=True)
+        _, fitted = big_o.big_o(product_function, sizes, **options)
+        best, fitted_cached = big_o.big_o(product_function, sizes,
+                                          **options)
+        self.assertEqual(fitted_cached['measures'].shape, (9, 2))
+        assert_array_equal(fitted['measures'], fitted_cached['measures'])
+        assert_array_equal(fitted['times'], fitted_cached['times'])
+        self.assertIsNotNone(best)
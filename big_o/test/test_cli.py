@@ -0,0 +1,117 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import big_o
+import big_o.big_o  # noqa: F401, the module of the patched function
+from big_o import cli
+
+
+def _run(argv):
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        status = cli.main(argv)
+    return status, stdout.getvalue()
+
+
+class TestCLI(unittest.TestCase):
+
+    def test_generator_args(self):
+        args, kwargs = cli._parse_generator_args(['0', '1000', 'as_list=True', 'abc'])
+        self.assertEqual(args, [0, 1000, 'abc'])
+        self.assertEqual(kwargs, {'as_list': True})
+
+    def test_load_target(self):
+        self.assertIs(cli.load_target('builtins:sorted'), sorted)
+        self.assertIs(cli.load_target('os.path:join'), os.path.join)
+        self.assertIs(cli.load_target('builtins:str.upper'), str.upper)
+        self.assertRaises(ValueError, cli.load_target, 'sorted')
+
+    def test_text_output(self):
+        status, output = _run(['builtins:sorted', '-g', 'integers', '0', '100',
+                               '--max-n', '1000', '--n-measures', '5'])
+        self.assertEqual(status, 0)
+        self.assertTrue(output.startswith('Best : '))
+
+    def test_json_output(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'run.json')
+            status, output = _run(['builtins:sorted', '--generator', 'range_n',
+                                   '--max-n', '1000', '--n-measures', '5',
+                                   '--format', 'json', '--output', path])
+            self.assertEqual(output, '')
+            with open(path) as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(len(data['measures']), 5)
+        self.assertIn(data['best']['class'],
+                      [class_data['class'] for class_data in data['fitted']])
+
+    def test_csv_output(self):
+        status, output = _run(['builtins:len', '-g', 'range_n', '--max-n', '1000',
+                               '--n-measures', '5', '-f', 'csv'])
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual(rows[0]['class'], 'Constant')
+        self.assertEqual(sum(int(row['best']) for row in rows), 1)
+
+    def test_max_class(self):
+        ns = np.linspace(100, 1000, 10)
+
+        def linear_big_o(func, data_generator, **kwargs):
+            return big_o.infer_big_o_class(ns, 1e-3 + 1e-6 * ns)
+
+        argv = ['builtins:sorted', '--max-class']
+        with mock.patch.object(sys.modules['big_o.big_o'], 'big_o',
+                               linear_big_o):
+            status, _ = _run(argv + ['Constant'])
+            self.assertEqual(status, 1)
+            status, _ = _run(argv + ['Linear'])
+            self.assertEqual(status, 0)
+            status, _ = _run(argv + ['Exponential'])
+            self.assertEqual(status, 0)
+
+    def test_n_repeats(self):
+        status, _ = _run(['builtins:len', '-g', 'range_n', '--max-n', '1000',
+                          '--n-measures', '3', '--n-repeats', 'auto'])
+        self.assertEqual(status, 0)
+
+    def test_isolate(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'run.json')
+            status, _ = _run(['builtins:sorted', '-g', 'range_n', '--max-n',
+                              '1000', '--n-measures', '4', '--isolate',
+                              '--timeout', '10', '-f', 'json', '-o', path])
+            with open(path) as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(status, 0)
+        self.assertEqual(len(data['measures']), 4)
+        self.assertEqual(data['failures'], [])
+
+    def test_errors(self):
+        stderr = io.StringIO()
+        for argv in (['nonexistent_module:f'],
+                     ['builtins:sorted', '-g', 'unknown_generator'],
+                     ['builtins:sorted', '--max-class', 'Unknown'],
+                     ['builtins:sorted', '--timeout', '1'],
+                     ['builtins:sorted', '--n-repeats', 'many'],
+                     ['builtins:sorted', '-g', 'range_n', '--workers', '2',
+                      '--time-budget', '1'],
+                     ['builtins:sorted', '-g', 'integers']):
+            with contextlib.redirect_stderr(stderr):
+                with self.assertRaises(SystemExit) as context:
+                    cli.main(argv)
+            self.assertEqual(context.exception.code, 2)
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import big_o
+from big_o import compare, complexities, serialization
+
+
+class TestCompare(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.ns = np.linspace(100, 10000, 20)
+
+    def _run(self, f):
+        times = f(self.ns) * (1. + 0.01 * np.random.randn(len(self.ns)))
+        return {'measures': self.ns, 'times': times}
+
+    def test_no_regression(self):
+        baseline = self._run(lambda n: 1e-4 + 1e-7 * n)
+        current = self._run(lambda n: 1e-4 + 1e-7 * n)
+        comparison = compare.compare(baseline, current, target_n=10**6)
+        self.assertIsInstance(comparison.baseline, complexities.Linear)
+        self.assertFalse(comparison.class_changed)
+        self.assertFalse(comparison.regression)
+        self.assertAlmostEqual(comparison.slowdown, 1., places=1)
+        self.assertEqual(compare.exit_status(comparison), 0)
+        self.assertTrue(str(comparison).startswith('ok'))
+
+    def test_coefficient_regression(self):
+        baseline = self._run(lambda n: 1e-4 + 1e-7 * n)
+        current = (self.ns, 1e-4 + 2e-7 * self.ns)
+        comparison = compare.compare(baseline, current, target_n=10**6)
+        self.assertFalse(comparison.class_changed)
+        self.assertTrue(comparison.coefficient_changed)
+        self.assertAlmostEqual(comparison.slowdown, 2., places=1)
+        self.assertTrue(comparison.regression)
+
+        # a slowdown below the threshold is not a regression
+        comparison = compare.compare(baseline, current, target_n=10**6,
+                                     max_slowdown=3.)
+        self.assertFalse(comparison.regression)
+
+    def test_class_regression(self):
+        baseline = self._run(lambda n: 1e-4 + 1e-7 * n)
+        current = self._run(lambda n: 1e-4 + 1e-10 * n ** 2)
+        comparison = compare.compare(baseline, current, target_n=10**6)
+        self.assertTrue(comparison.class_changed)
+        self.assertIsInstance(comparison.current, complexities.Quadratic)
+        self.assertTrue(comparison.regression)
+        self.assertGreater(comparison.slowdown, 100.)
+
+    def test_class_change_without_slowdown(self):
+        # the selection flips between Constant and Logarithmic on noise,
+        # but the predicted times are the same
+        baseline = (self.ns, 1e-4 + 0. * self.ns)
+        current = (self.ns, 1e-4 + 1e-8 * np.log(self.ns))
+        comparison = compare.compare(baseline, current, target_n=10**6,
+                                     n_resamples=100)
+        self.assertTrue(comparison.class_changed)
+        self.assertLess(comparison.slowdown, 1.01)
+        self.assertFalse(comparison.regression)
+
+    def test_compare_many(self):
+        baselines = {'f': self._run(lambda n: 1e-7 * n),
+                     'g': self._run(lambda n: 1e-7 * n),
+                     'removed': self._run(lambda n: 1e-7 * n)}
+        currents = {'f': self._run(lambda n: 1e-7 * n),
+                    'g': self._run(lambda n: 1e-10 * n ** 2),
+                    'added': self._run(lambda n: 1e-7 * n)}
+        results = compare.compare_many(baselines, currents, target_n=10**6,
+                                       n_resamples=100)
+        self.assertEqual(list(results), ['f', 'g'])
+        self.assertFalse(results['f'].regression)
+        self.assertTrue(results['g'].regression)
+        self.assertEqual(compare.exit_status(results), 1)
+
+        text = compare.report(results, regressions_only=True)
+        self.assertIn('g: REGRESSION', text)
+        self.assertNotIn('f:', text)
+        self.assertIn('1 regression(s) in 2 function(s)', text)
+
+    def test_saved_big_o_run(self):
+        run = big_o.big_o(sorted, big_o.datagen.range_n, max_n=10000,
+                          return_raw_data=True)
+        for baseline in (run, run[1]):
+            comparison = compare.compare(baseline, run, target_n=10**6,
+                                         n_resamples=100)
+            self.assertFalse(comparison.class_changed)
+            self.assertFalse(comparison.coefficient_changed)
+
+        # runs loaded from a file are (best, fitted) tuples as well
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'runs.npz')
+            serialization.save_runs(path, {'sorted': run})
+            loaded = serialization.load_runs(path)['sorted']
+            comparison = compare.compare(loaded, run, target_n=10**6,
+                                         n_resamples=100)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertFalse(comparison.class_changed)
+
+        _, fitted = big_o.infer_big_o_class(run[1]['measures'],
+                                            run[1]['times'])
+        self.assertRaises(ValueError, compare.compare, fitted, run, 10**6)
@@ -36,6 +36,174 @@ class TestComplexities(unittest.TestCase):
             assert_allclose(residuals, np.sum((y - ref_y) ** 2), rtol=1e-07, atol=1e-08,
                             err_msg="fit() residuals failed to match expected value for class %r" % class_)
 
+    def test_fit_exact(self):
+        # With as many points as coefficients, residuals are zero
+        linear = complexities.Linear()
+        residuals = linear.fit([10, 20], [3., 5.])
+        assert_allclose(residuals, 0., atol=1e-20)
+        assert_allclose(linear.coeff, [1., 0.2])
+
+    def test_fit_classes(self):
+        rng = np.random.default_rng(42)
+        x = np.linspace(10, 100, 50)
+        t = np.column_stack([
+            5. * x + 3.,
+            1.7 * x * np.log(x) + 2.74,
+            5.2 * x ** 2.5,
+            3.14 ** (x / 10.),
+        ]) * (1. + 0.01 * rng.random((50, 4)))
+
+        coeffs, residuals = complexities.fit_classes(
+            complexities.ALL_CLASSES, x, t)
+        self.assertEqual(residuals.shape, (len(complexities.ALL_CLASSES), 4))
+
+        for i, class_ in enumerate(complexities.ALL_CLASSES):
+            for j in range(t.shape[1]):
+                complexity = class_()
+                res = complexity.fit(x, t[:, j])
+                assert_allclose(coeffs[i][:, j], complexity.coeff, rtol=1e-6,
+                                err_msg="coefficients mismatch for class %r" % class_)
+                assert_allclose(residuals[i, j], res, rtol=1e-6,
+                                err_msg="residuals mismatch for class %r" % class_)
+
+        # 1-D input returns one set of coefficients and residuals per class
+        coeffs_1d, residuals_1d = complexities.fit_classes(
+            complexities.ALL_CLASSES, x, t[:, 0])
+        assert_allclose(residuals_1d, residuals[:, 0])
+        assert_allclose(coeffs_1d[1], coeffs[1][:, 0])
+
+    def test_fit_large_n(self):
+        # n^3 overflows int64 for N above about 2e6
+        x = np.linspace(100, 1e7, 10).astype('int64')
+        t = 1e-20 * x.astype(float) ** 3
+        cubic = complexities.Cubic()
+        residuals = cubic.fit(x, t)
+        assert_allclose(cubic.coeff[1], 1e-20, rtol=1e-6)
+
+        _, fit_residuals = complexities.fit_classes([complexities.Cubic], x, t)
+        assert_allclose(fit_residuals, [residuals], rtol=1e-6, atol=1e-20)
+        _, resampled_residuals, _ = complexities.fit_classes_resampled(
+            [complexities.Cubic], x, t, np.arange(10)[np.newaxis])
+        assert_allclose(resampled_residuals, [[residuals]], rtol=1e-6,
+                        atol=1e-20)
+
+    def test_fit_classes_resampled(self):
+        rng = np.random.default_rng(3)
+        x = np.linspace(10, 100, 20)
+        t = (5. * x + 3.) * (1. + 0.05 * rng.random(20))
+        indices = complexities.resample_indices(len(x), 30)
+        self.assertEqual(indices.shape, (30, 20))
+
+        coeffs, residuals, loo = complexities.fit_classes_resampled(
+            complexities.ALL_CLASSES, x, t, indices, loo=True)
+        for i, class_ in enumerate(complexities.ALL_CLASSES):
+            for r, idx in enumerate(indices[:5]):
+                _, expected = complexities.fit_classes([class_], x[idx], t[idx])
+                assert_allclose(residuals[i, r], expected[0], rtol=1e-6)
+                complexity = class_()
+                complexity.fit(x[idx], t[idx])
+                assert_allclose(coeffs[i][:, r], complexity.coeff, rtol=1e-6)
+
+        # the jackknife leaves out each measurement in turn
+        indices = complexities.resample_indices(len(x), method='jackknife')
+        self.assertEqual(indices.shape, (20, 19))
+        self.assertNotIn(0, indices[0])
+        self.assertRaises(ValueError, complexities.resample_indices, 20,
+                          method='unknown')
+
+    def test_confidence_interval(self):
+        np.random.seed(0)
+        rng = np.random.default_rng(4)
+        x = np.linspace(10, 100, 30)
+        t = 5.2 * x ** 2.5 * (1. + 0.05 * rng.standard_normal(30))
+        for method in ('bootstrap', 'jackknife'):
+            complexity = complexities.Polynomial()
+            lower, upper = complexity.confidence_interval(x, t, method=method)
+            # the interval is in the standard form a*x^b
+            coefficients = complexity.coefficients()
+            self.assertTrue(np.all(lower < coefficients))
+            self.assertTrue(np.all(coefficients < upper))
+            self.assertTrue(lower[1] < 2.5 < upper[1])
+            narrow, _ = complexity.confidence_interval(
+                x, t, confidence_level=0.5, method=method)
+            self.assertTrue(np.all(narrow > lower))
+
+    def test_predict(self):
+        rng = np.random.default_rng(5)
+        x = np.linspace(10, 1000, 50)
+        t = (1e-3 + 1e-5 * x) * (1. + 0.01 * rng.standard_normal(50))
+        linear = complexities.Linear()
+        linear.fit(x, t)
+        a, b = linear.coeff
+
+        self.assertIsInstance(linear.predict(100), float)
+        assert_allclose(linear.predict(100), a + b * 100)
+        assert_allclose(linear.predict([[10, 20]]), [[a + b * 10, a + b * 20]])
+        assert_allclose(linear.predict(x), linear.compute(x))
+        # N's beyond int64 are extrapolated without overflow
+        assert_allclose(linear.predict(10 ** 30), a + b * 1e30)
+        cubic = complexities.Cubic()
+        cubic.fit(x, x ** 3)
+        assert_allclose(cubic.predict(np.array([3 * 10 ** 6], dtype='int64')),
+                        [2.7e19])
+
+        prediction, lower, upper = linear.predict(x, with_interval=True)
+        self.assertTrue(np.all(lower < prediction) and np.all(prediction < upper))
+        # about 95% of the measurements are within the interval
+        self.assertGreater(np.mean((lower <= t) & (t <= upper)), 0.8)
+        _, narrow_lower, _ = linear.predict(x, with_interval=True,
+                                            confidence_level=0.5)
+        self.assertTrue(np.all(narrow_lower > lower))
+
+        unfitted = complexities.Linear()
+        unfitted.coeff = linear.coeff
+        self.assertRaises(ValueError, unfitted.predict, 10, with_interval=True)
+        self.assertRaises(complexities.NotFittedError,
+                          complexities.Linear().predict, 10)
+
+    def test_predict_nm(self):
+        nm = np.array([[10, 20], [30, 40], [50, 10], [20, 70]])
+        complexity = complexities.NTimesM()
+        complexity.fit(nm, 1. + 0.1 * nm[:, 0] * nm[:, 1])
+        assert_allclose(complexity.predict([100, 200]), 2001.)
+        assert_allclose(complexity.predict(nm), complexity.compute(nm))
+        self.assertRaises(ValueError, complexity.max_n_within, 1.)
+
+    def test_max_n_within(self):
+        linear = complexities.Linear()
+        linear.fit([1, 2, 3], [1.1, 1.2, 1.3])
+        self.assertEqual(linear.max_n_within(2.05), 10.)
+        assert_allclose(linear.max_n_within([2.05, 0.5, 1e10 + 1.05]),
+                        [10., 0., 1e11])
+
+        constant = complexities.Constant()
+        constant.fit([1, 2, 3], [1., 1., 1.])
+        self.assertEqual(constant.max_n_within(2.), np.inf)
+        self.assertEqual(constant.max_n_within(0.5), 0.)
+
+        exponential = complexities.Exponential()
+        exponential.fit([1, 2, 3], [2., 4., 8.])
+        self.assertEqual(exponential.max_n_within(1000.), 9.)
+
+    def test_compute_nm(self):
+        rng = np.random.default_rng(1)
+        nm = rng.uniform(10, 100, size=(100, 2))
+        n, m = nm[:, 0], nm[:, 1]
+        desired = [
+            (2. + n*0., complexities.Constant),
+            (3. + 2.*n + 5.*m, complexities.NPlusM),
+            (3. + 2.*n + 0.5*m*np.log(m), complexities.NPlusMLogM),
+            (1. + 0.1*n*np.log(m), complexities.NLogM),
+            (1. + 0.1*n*m, complexities.NTimesM),
+        ]
+        for y, class_ in desired:
+            complexity = class_()
+            residuals = complexity.fit(nm, y)
+            assert_allclose(complexity.compute(nm), y,
+                            err_msg="compute() failed to match expected values for class %r" % class_)
+            assert_allclose(residuals, 0., atol=1e-8)
+        self.assertIn('*n*m', str(complexity))
+
     def test_not_fitted(self):
         for class_ in complexities.ALL_CLASSES:
             self.assertRaises(complexities.NotFittedError, class_().compute, 100)
@@ -1,3 +1,6 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+
 from big_o import datagen
 
 
@@ -33,3 +36,103 @@ def test_strings():
     assert isinstance(result, str)
     assert len(result) == 13
     assert len(set(result).difference(set(chars))) == 0
+
+
+def test_data_cache():
+    calls = []
+
+    def generator(n):
+        calls.append(n)
+        return list(range(n))
+
+    cache = datagen.DataCache()
+    assert cache.get(generator, 10) == list(range(10))
+    assert cache.get(generator, 10) == list(range(10))
+    assert calls == [10]
+    assert len(cache) == 1
+
+    cache.get(generator, 10, seed=1)
+    assert calls == [10, 10]
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+def test_data_cache_seed():
+    def generator(n):
+        return datagen.integers(n, 0, 1000)
+
+    data = datagen.DataCache(seed=42).get(generator, 100)
+    assert datagen.DataCache(seed=42).get(generator, 100) == data
+
+
+def test_data_cache_prefix_sliceable():
+    calls = []
+
+    @datagen.prefix_sliceable
+    def generator(n):
+        calls.append(n)
+        return list(range(n))
+
+    cache = datagen.DataCache()
+    cache.get(generator, 100)
+    assert cache.get(generator, 10) == list(range(10))
+    assert calls == [100]
+    assert datagen.range_n.prefix_sliceable
+
+
+def test_data_cache_max_bytes():
+    cache = datagen.DataCache(max_bytes=10000)
+    for n in range(10):
+        cache.get(datagen.range_n, 100 + n)
+    assert 0 < len(cache) < 10
+    assert cache.nbytes <= 10000
+    # the least recently used data is discarded first
+    assert (datagen.range_n, 109, None) in cache._cache
+    assert (datagen.range_n, 100, None) not in cache._cache
+
+
+def test_integers_array():
+    n = 912
+    result = datagen.integers_array(n, min_=3, max_=12)
+    assert isinstance(result, np.ndarray)
+    assert len(result) == n
+    assert result.min() >= 3
+    assert result.max() <= 12
+
+    result = datagen.integers_array(n, min_=3, max_=12, as_list=True)
+    assert isinstance(result, list)
+    assert isinstance(result[0], int)
+
+
+def test_large_integers_array():
+    n = 912
+    result = datagen.large_integers_array(n)
+    assert len(result) == n
+    assert result.max() > 1000000
+    assert isinstance(datagen.large_integers_array(n, as_list=True), list)
+
+
+def test_strings_array():
+    chars = ['O', 'M', 'G']
+    result = datagen.strings_array(13, chars=chars)
+    assert isinstance(result, str)
+    assert len(result) == 13
+    assert len(set(result).difference(set(chars))) == 0
+
+    result = datagen.strings_array(13, chars='äöü')
+    assert len(result) == 13
+    assert len(set(result).difference(set('äöü'))) == 0
+
+
+def test_array_generators_seed():
+    assert_array_equal(datagen.integers_array(100, 0, 1000, seed=3),
+                       datagen.integers_array(100, 0, 1000, seed=3))
+    assert datagen.strings_array(100, seed=3) == datagen.strings_array(100, seed=3)
+
+    # without a seed, the global numpy.random state is used
+    np.random.seed(3)
+    data = datagen.large_integers_array(100)
+    np.random.seed(3)
+    assert_array_equal(data, datagen.large_integers_array(100))
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import big_o
+
+#: Largest cumulative import time of the big_o package, in microseconds. The
+# package itself only defines lazy attributes, and takes a few milliseconds
+# to import on a slow machine.
+MAX_IMPORT_TIME_US = 50000
+
+
+def _run_python(code, *options):
+    package_dir = os.path.dirname(os.path.dirname(big_o.__file__))
+    env = dict(os.environ, PYTHONPATH=package_dir)
+    return subprocess.run(
+        [sys.executable] + list(options) + ['-c', code],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, env=env, check=True)
+
+
+class TestImport(unittest.TestCase):
+
+    def test_import_is_lazy(self):
+        result = _run_python(
+            'import sys, big_o; '
+            'print(sorted(m for m in sys.modules '
+            '             if m == "numpy" or m.startswith("big_o.")))')
+        self.assertEqual(result.stdout.strip(), '[]')
+
+        result = _run_python(
+            'import sys, big_o; big_o.datagen; '
+            'print("big_o.datagen" in sys.modules, "big_o.big_o" in sys.modules)')
+        self.assertEqual(result.stdout.split(), ['True', 'False'])
+
+    def test_public_names(self):
+        for name in big_o.__all__:
+            self.assertIsNotNone(getattr(big_o, name))
+        self.assertTrue(callable(big_o.big_o))
+        self.assertIn('infer_big_o_class', dir(big_o))
+        self.assertRaises(AttributeError, getattr, big_o, 'unknown')
+
+    def test_import_time(self):
+        # best of several runs, to be robust against a busy machine
+        import_times = []
+        for _ in range(5):
+            result = _run_python('import big_o', '-X', 'importtime')
+            for line in result.stderr.splitlines():
+                fields = line.split('|')
+                if len(fields) == 3 and fields[2].strip() == 'big_o':
+                    import_times.append(int(fields[1]))
+        self.assertLess(min(import_times), MAX_IMPORT_TIME_US)
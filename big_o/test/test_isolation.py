@@ -0,0 +1,107 @@
+import os
+import time
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+import big_o
+from big_o import datagen, isolation
+from big_o.timing import Timing
+
+
+def failing_function(n):
+    if n == 30:
+        os._exit(3)
+    if n == 40:
+        raise ValueError('invalid n')
+    if n == 50:
+        time.sleep(10.)
+    return sum(range(n))
+
+
+def allocating_function(n):
+    return bytearray(n)
+
+
+def check_thread_limit(n):
+    # numerical libraries read the limit from the initial environment
+    with open('/proc/self/environ', 'rb') as f:
+        if b'OMP_NUM_THREADS=1' not in f.read().split(b'\0'):
+            raise ValueError('OMP_NUM_THREADS is not set')
+
+
+def _address_space():
+    """ Current size of the address space of this process in bytes, or
+    None if it is not available. """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+class TestIsolation(unittest.TestCase):
+
+    def test_measure(self):
+        ns = np.array([10, 20, 30, 40, 50, 60])
+        with isolation.WorkerPool(n_workers=2, batch_size=2,
+                                  timeout=2.) as pool:
+            t, raw_timings = pool.measure(failing_function, datagen.n_, ns,
+                                          Timing(n_timings=3))
+            self.assertEqual([n for n, _ in pool.failures], [30, 40, 50])
+            self.assertIn('exited with code 3', pool.failures[0][1])
+            self.assertIn('ValueError', pool.failures[1][1])
+            self.assertIn('timed out', pool.failures[2][1])
+            measured = [0, 1, 5]
+            self.assertTrue(np.all(np.isnan(np.delete(t, measured))))
+            for i in measured:
+                self.assertEqual(len(raw_timings[i]), 3)
+                self.assertEqual(t[i], np.min(raw_timings[i]))
+
+            # the pool can be reused
+            t, _ = pool.measure(failing_function, datagen.n_, ns[:2],
+                                Timing(n_timings=3))
+            self.assertFalse(np.any(np.isnan(t)))
+            self.assertEqual(pool.failures, [])
+
+    def test_thread_limit(self):
+        if not os.path.exists('/proc/self/environ'):
+            self.skipTest('the initial environment is not available')
+        with isolation.WorkerPool() as pool:
+            pool.measure(check_thread_limit, datagen.n_, np.array([1]),
+                         Timing())
+        self.assertEqual(pool.failures, [])
+
+    def test_memory_limit(self):
+        address_space = _address_space()
+        if address_space is None:
+            self.skipTest('the size of the address space is not available')
+        limit = address_space + 2 ** 28
+        ns = np.array([2 ** 20, 2 ** 30])
+        with isolation.WorkerPool(memory_limit=limit) as pool:
+            t, _ = pool.measure(allocating_function, datagen.n_, ns, Timing())
+        self.assertFalse(np.isnan(t[0]))
+        self.assertEqual(pool.failures, [(2 ** 30, 'MemoryError()')])
+
+    def test_measure_execution_time(self):
+        with isolation.WorkerPool(timeout=2.) as pool:
+            ns, t, raw_timings = big_o.measure_execution_time(
+                failing_function, datagen.n_, min_n=10, max_n=60,
+                n_measures=6, n_timings=2, isolation=pool,
+                return_raw_timings=True)
+        assert_array_equal(ns, [10, 20, 60])
+        self.assertEqual(len(t), 3)
+        self.assertEqual(len(raw_timings), 3)
+
+        best, fitted = big_o.big_o(sum, datagen.range_n, max_n=1000,
+                                   n_measures=5, isolation=True)
+        self.assertEqual(fitted['failures'], [])
+        self.assertIsNotNone(best)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, isolation.WorkerPool, n_workers=0)
+        for options in ({'executor': object()}, {'time_budget': 1.},
+                        {'sampling': 'adaptive'}):
+            self.assertRaises(ValueError, big_o.big_o, sum, datagen.range_n,
+                              isolation=True, **options)
@@ -0,0 +1,154 @@
+import unittest
+import warnings
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+import big_o
+from big_o import complexities as compl
+from big_o import selection
+
+
+class TestSelection(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.ns = np.linspace(10, 1000, 12)
+        self.t = 1e-3 + 1e-5 * self.ns * (1. + 0.05 * np.random.randn(12))
+
+    def test_information_criteria_prefer_simpler_classes(self):
+        classes = [compl.Constant, compl.Linear]
+        t = 1e-3 * (1. + 0.05 * np.random.randn(len(self.ns)))
+        # the linear fit always has lower residuals than the constant one
+        best, _ = big_o.infer_big_o_class(
+            self.ns, t, classes, simplicity_bias=0., criterion='residuals')
+        self.assertIsInstance(best, compl.Linear)
+        for criterion in ('aic', 'bic', 'cv'):
+            best, _ = big_o.infer_big_o_class(self.ns, t, classes,
+                                              criterion=criterion)
+            self.assertIsInstance(best, compl.Constant, msg=criterion)
+
+    def test_simplicity_bias_warning(self):
+        with self.assertWarnsRegex(UserWarning, 'simplicity_bias'):
+            big_o.infer_big_o_class(self.ns, self.t, simplicity_bias=1.)
+        with self.assertWarnsRegex(UserWarning, 'simplicity_bias'):
+            big_o.infer_big_o_class_many(self.ns, self.t, simplicity_bias=1.,
+                                         criterion='aic')
+        with self.assertWarnsRegex(UserWarning, 'simplicity_bias'):
+            big_o.IncrementalClassifier(simplicity_bias=1.)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            big_o.infer_big_o_class(self.ns, self.t)
+            big_o.infer_big_o_class(self.ns, self.t, simplicity_bias=1.,
+                                    criterion='residuals')
+
+    def test_exact_fit_ties_favor_simpler_classes(self):
+        ns = np.arange(1, 20)
+        for criterion in ('aic', 'bic', 'cv'):
+            best, _ = big_o.infer_big_o_class(ns, 2. * ns, criterion=criterion)
+            self.assertIsInstance(best, compl.Linear, msg=criterion)
+
+    def test_confidence(self):
+        best, fitted = big_o.infer_big_o_class(self.ns, self.t)
+        probabilities = [inst.confidence for inst in fitted]
+        assert_allclose(np.sum(probabilities), 1.)
+        self.assertEqual(best.confidence, max(probabilities))
+        self.assertGreater(best.confidence, 0.5)
+
+        best, _ = big_o.infer_big_o_class(self.ns, self.t,
+                                          criterion='residuals')
+        self.assertTrue(np.isnan(best.confidence))
+
+    def test_prediction_interval(self):
+        best, _ = big_o.infer_big_o_class(self.ns, self.t)
+        classifier = big_o.IncrementalClassifier().update_many(self.ns, self.t)
+        assert_allclose(classifier.best.predict(10 ** 6, with_interval=True),
+                        best.predict(10 ** 6, with_interval=True))
+
+    def test_resampling(self):
+        for resampling in ('bootstrap', 'jackknife'):
+            best, fitted = big_o.infer_big_o_class(
+                self.ns, self.t, resampling=resampling, n_resamples=200)
+            self.assertIsInstance(best, compl.Linear)
+            lower, upper = best.coeff_interval
+            self.assertTrue(lower[1] < 1e-5 < upper[1])
+            assert_allclose(sum(inst.selection_frequency for inst in fitted), 1.)
+            self.assertGreater(best.selection_frequency, 0.5)
+
+        best, fitted = big_o.infer_big_o_class(
+            self.ns, self.t, criterion='cv', resampling='bootstrap',
+            n_resamples=50)
+        self.assertIsInstance(best, compl.Linear)
+        self.assertGreater(best.selection_frequency, 0.5)
+
+    def test_loo_residuals(self):
+        classes = [compl.Linear, compl.Polynomial]
+        residuals = selection.loo_residuals(classes, self.ns, self.t)
+        for class_, class_residuals in zip(classes, residuals):
+            expected = 0.
+            for i in range(len(self.ns)):
+                keep = np.arange(len(self.ns)) != i
+                inst = class_()
+                inst.fit(self.ns[keep], self.t[keep])
+                expected += (inst.compute(self.ns[i:i + 1])[0] - self.t[i]) ** 2
+            assert_allclose(class_residuals, expected)
+
+    def test_scores_several_series(self):
+        classes = compl.ALL_CLASSES
+        t = np.column_stack([self.t, self.t * 2., self.ns ** 2])
+        _, residuals = compl.fit_classes(classes, self.ns, t)
+        for criterion in ('aic', 'bic', 'cv', 'residuals'):
+            scores = selection.scores(classes, self.ns, t, residuals, criterion)
+            self.assertEqual(scores.shape, (len(classes), 3))
+            for j in range(3):
+                _, series_residuals = compl.fit_classes(classes, self.ns, t[:, j])
+                assert_allclose(
+                    scores[:, j],
+                    selection.scores(classes, self.ns, t[:, j],
+                                     series_residuals, criterion),
+                    rtol=1e-6, atol=1e-12)
+
+    def test_scores_from_sums(self):
+        classes = compl.ALL_CLASSES
+        _, residuals = compl.fit_classes(classes, self.ns, self.t)
+        n_coeffs = [selection.n_coefficients(class_) for class_ in classes]
+        for criterion in ('aic', 'bic', 'residuals'):
+            assert_allclose(
+                selection.scores_from_sums(residuals, len(self.t),
+                                           np.sum(self.t ** 2), n_coeffs,
+                                           criterion),
+                selection.scores(classes, self.ns, self.t, residuals,
+                                 criterion))
+        self.assertRaises(ValueError, selection.scores_from_sums, residuals,
+                          len(self.t), np.sum(self.t ** 2), n_coeffs, 'cv')
+
+    def test_incremental_classifier_criteria(self):
+        for criterion in ('aic', 'bic', 'cv', 'residuals'):
+            classifier = big_o.IncrementalClassifier(criterion=criterion)
+            classifier.update_many(self.ns, self.t)
+            best, fitted = big_o.infer_big_o_class(self.ns, self.t,
+                                                   criterion=criterion)
+            self.assertIs(type(classifier.best), type(best), msg=criterion)
+            assert_allclose([inst.confidence for inst in classifier.fitted],
+                            [inst.confidence for inst in fitted],
+                            rtol=1e-6, atol=1e-12, err_msg=criterion)
+
+    def test_infer_big_o_class_many_confidence(self):
+        times = np.array([self.t, self.t * 2., self.ns ** 2 * 1e-6])
+        best_idx, _, confidence = big_o.infer_big_o_class_many(
+            self.ns, times, return_confidence=True)
+        # series with different N's
+        best_idx2, _, confidence2 = big_o.infer_big_o_class_many(
+            [self.ns, self.ns, self.ns[:-1]],
+            [times[0], times[1], times[2][:-1]], return_confidence=True)
+        assert_array_equal(best_idx2[:2], best_idx[:2])
+        assert_allclose(confidence2[:2], confidence[:2])
+        for i, series in enumerate(times):
+            best, _ = big_o.infer_big_o_class(self.ns, series)
+            self.assertIs(compl.ALL_CLASSES[best_idx[i]], type(best))
+            assert_allclose(confidence[i], best.confidence)
+
+    def test_unknown_criterion(self):
+        self.assertRaises(ValueError, big_o.infer_big_o_class,
+                          self.ns, self.t, criterion='unknown')
@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+import big_o
+from big_o import complexities, serialization
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        np.random.seed(0)
+        self.ns = np.linspace(100, 10000, 10).astype('int64')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _run(self, f, return_raw_data=True):
+        times = f(self.ns) * (1. + 0.01 * np.random.rand(len(self.ns)))
+        best, fitted = big_o.infer_big_o_class(self.ns, times)
+        if return_raw_data:
+            fitted['measures'] = self.ns
+            fitted['times'] = times
+        return best, fitted
+
+    def _assert_same_run(self, run, other):
+        best, fitted = run
+        other_best, other_fitted = other
+        self.assertIs(type(other_best), type(best))
+        assert_allclose(other_best.coeff, best.coeff)
+        self.assertIn(other_best, other_fitted)
+        self.assertEqual(len(other_fitted), len(fitted))
+        for inst, other_inst in zip(fitted, other_fitted):
+            if isinstance(inst, complexities.ComplexityClass):
+                self.assertIs(type(other_inst), type(inst))
+                self.assertEqual(str(other_inst), str(inst))
+                assert_allclose(other_fitted[other_inst], fitted[inst])
+            else:
+                self.assertEqual(other_inst, inst)
+                assert_array_equal(other_fitted[other_inst], fitted[inst])
+
+    def test_complexity_class_dict(self):
+        linear = complexities.Linear()
+        linear.fit([1, 2, 3], [2., 4., 6.])
+        data = json.loads(json.dumps(linear.to_dict()))
+        restored = complexities.ComplexityClass.from_dict(data)
+        self.assertIsInstance(restored, complexities.Linear)
+        assert_allclose(restored.coeff, linear.coeff)
+        self.assertEqual(str(restored), str(linear))
+        assert_allclose(restored.predict(10, with_interval=True),
+                        linear.predict(10, with_interval=True))
+
+        restored = complexities.ComplexityClass.from_dict(
+            complexities.Cubic().to_dict())
+        self.assertIsNone(restored.coeff)
+
+        data['version'] = complexities.SERIALIZATION_VERSION + 1
+        self.assertRaises(ValueError, complexities.ComplexityClass.from_dict,
+                          data)
+        data['version'] = 1
+        data['class'] = 'Unknown'
+        self.assertRaises(ValueError, complexities.ComplexityClass.from_dict,
+                          data)
+
+    def test_run_dict(self):
+        run = self._run(lambda n: 1e-7 * n)
+        data = json.loads(json.dumps(serialization.run_to_dict(*run)))
+        self._assert_same_run(run, serialization.run_from_dict(data))
+
+    def test_save_and_load_runs(self):
+        runs = {
+            'linear': self._run(lambda n: 1e-7 * n),
+            'quadratic': self._run(lambda n: 1e-10 * n ** 2),
+            'no_raw_data': self._run(lambda n: 1e-3 + 0. * n,
+                                     return_raw_data=False),
+        }
+        best, fitted = runs['linear']
+        for inst in fitted:
+            if isinstance(inst, complexities.ComplexityClass):
+                inst.quantity, inst.units = 'memory', 'bytes'
+        path = os.path.join(self.tmpdir, 'runs.npz')
+        serialization.save_runs(path, runs)
+
+        for mmap in (True, False):
+            store = serialization.load_runs(path, mmap=mmap)
+            self.assertEqual(len(store), 3)
+            self.assertEqual(list(store), sorted(runs))
+            self.assertIn('linear', store)
+            self.assertNotIn('cubic', store)
+            for name, run in runs.items():
+                self._assert_same_run(run, store[name])
+            self._assert_same_run(runs['linear'], store[0])
+            self.assertRaises(KeyError, store.__getitem__, 'cubic')
+            self.assertRaises(IndexError, store.__getitem__, 3)
+
+            ns, times = store.raw_data('quadratic')
+            assert_array_equal(ns, self.ns)
+            assert_array_equal(times, runs['quadratic'][1]['times'])
+            # columnar access to all the runs
+            self.assertEqual(store.residuals.shape,
+                             (3, len(complexities.ALL_CLASSES)))
+            self.assertEqual(
+                [str(store.class_names[i]) for i in store.best],
+                [type(runs[name][0]).__name__ for name in sorted(runs)])
+
+        store = serialization.load_runs(path)
+        self.assertIsInstance(store.coeff, np.memmap)
+
+    def test_save_and_load_intervals(self):
+        runs = {'linear': self._run(lambda n: 1e-7 * n)}
+        best = runs['linear'][0]
+        path = os.path.join(self.tmpdir, 'runs.npz')
+        serialization.save_runs(path, runs)
+        loaded, _ = serialization.load_runs(path)['linear']
+        self.assertAlmostEqual(loaded.confidence, best.confidence)
+        assert_allclose(loaded.predict(10 ** 5, with_interval=True),
+                        best.predict(10 ** 5, with_interval=True))
+
+    def test_save_and_load_nm_runs(self):
+        rng = np.random.default_rng(0)
+        nm = rng.integers(10, 1000, size=(20, 2))
+        times = (1e-3 + 1e-6 * nm[:, 0] * nm[:, 1]) * (
+            1. + 0.01 * rng.random(20))
+        runs = {'nm': big_o.infer_big_o_class(
+            nm, times, complexities.ALL_CLASSES_NM)}
+        path = os.path.join(self.tmpdir, 'runs.npz')
+        serialization.save_runs(path, runs)
+        store = serialization.load_runs(path)
+        self._assert_same_run(runs['nm'], store['nm'])
+        self.assertIsInstance(store['nm'][0], complexities.NTimesM)
@@ -0,0 +1,157 @@
+import gc
+import os
+import time
+import unittest
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from big_o import datagen, timing
+
+
+class TestTiming(unittest.TestCase):
+
+    def test_aggregators(self):
+        measurements = np.array([1., 1.1, 0.9, 1.05, 0.95, 1., 1., 1., 1., 50.])
+        self.assertEqual(timing.AGGREGATORS['min'](measurements), 0.9)
+        self.assertEqual(timing.AGGREGATORS['median'](measurements), 1.)
+        # the largest and smallest 10% are excluded
+        assert_allclose(timing.trimmed_mean(measurements),
+                        np.mean(np.sort(measurements)[1:-1]))
+        assert_allclose(timing.mad_mean(measurements),
+                        np.mean(measurements[:-1]))
+
+    def test_reject_outliers(self):
+        measurements = np.array([1., 1.1, 0.9, 1.05, 0.95, 50.])
+        assert_array_equal(timing.reject_outliers(measurements),
+                           measurements[:-1])
+        # no variability, nothing to reject
+        assert_array_equal(timing.reject_outliers([1., 1., 1.]), [1., 1., 1.])
+
+    def test_relative_confidence_interval(self):
+        self.assertEqual(timing.relative_confidence_interval([1.]), np.inf)
+        self.assertEqual(timing.relative_confidence_interval([1., 1., 1.]), 0.)
+        self.assertGreater(timing.relative_confidence_interval([1., 2., 3.]),
+                           timing.relative_confidence_interval([1., 2., 3.] * 10))
+
+    def test_measure(self):
+        t, measurements = timing.Timing(n_timings=5).measure(len, datagen.range_n, 100)
+        self.assertEqual(len(measurements), 5)
+        self.assertEqual(t, measurements.min())
+
+        t, measurements = timing.Timing(n_timings=5, aggregate=np.max).measure(
+            len, datagen.range_n, 100)
+        self.assertEqual(t, measurements.max())
+
+        self.assertRaises(ValueError, timing.Timing, aggregate='mode')
+
+    def test_target_precision(self):
+        t, measurements = timing.Timing(
+            n_timings=1, target_precision=1e-12, max_timings=20
+        ).measure(len, datagen.range_n, 100)
+        self.assertEqual(len(measurements), 20)
+
+        t, measurements = timing.Timing(
+            n_timings=1, target_precision=10., max_timings=20
+        ).measure(len, datagen.range_n, 100)
+        self.assertEqual(len(measurements), 3)
+
+    def test_autorange(self):
+        def f(n):
+            time.sleep(0.001 * n)
+
+        t, measurements = timing.Timing(
+            n_repeats='auto', n_timings=3, autorange_duration=0.02
+        ).measure(f, datagen.n_, 2)
+        self.assertEqual(len(measurements), 3)
+        # the time is per call, not cumulative
+        self.assertGreaterEqual(t, 0.002)
+        self.assertLess(t, 0.02)
+
+        self.assertRaises(ValueError, timing.Timing, n_repeats='many')
+
+    def test_timer_strategy_clock(self):
+        def sleep(n):
+            time.sleep(0.01)
+
+        wall = timing.Timing(timer_strategy=timing.TimerStrategy(clock='wall'))
+        t_wall, _ = wall.measure(sleep, datagen.n_, 1)
+        self.assertGreaterEqual(t_wall, 0.01)
+
+        # sleeping does not use the CPU
+        for clock in ('process', 'thread'):
+            cpu = timing.Timing(timer_strategy=timing.TimerStrategy(clock=clock))
+            t_cpu, _ = cpu.measure(sleep, datagen.n_, 1)
+            self.assertLess(t_cpu, 0.005)
+
+        self.assertRaises(ValueError, timing.TimerStrategy, clock='sundial')
+
+    def test_timer_strategy_gc(self):
+        gc_states = []
+
+        def record_gc(n):
+            gc_states.append(gc.isenabled())
+
+        timing.Timing(timer_strategy=timing.TimerStrategy(gc_enabled=True)).measure(
+            record_gc, datagen.n_, 1)
+        timing.Timing(timer_strategy=timing.TimerStrategy(gc_enabled=False)).measure(
+            record_gc, datagen.n_, 1)
+        self.assertEqual(gc_states, [True, False])
+
+        # the garbage collector is enabled even if the caller disabled it,
+        # and its state is restored afterwards
+        gc_states.clear()
+        gc.disable()
+        try:
+            timing.Timing(timer_strategy=timing.TimerStrategy(
+                gc_enabled=True)).measure(record_gc, datagen.n_, 1)
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+        self.assertEqual(gc_states, [True])
+
+    @unittest.skipUnless(hasattr(os, 'sched_setaffinity'), 'requires CPU affinity')
+    def test_timer_strategy_cpus(self):
+        affinity = os.sched_getaffinity(0)
+        cpu = min(affinity)
+        cpus_during = []
+
+        def record_cpus(n):
+            cpus_during.append(os.sched_getaffinity(0))
+
+        strategy = timing.TimerStrategy(cpus=cpu)
+        timing.Timing(timer_strategy=strategy).measure(record_cpus, datagen.n_, 1)
+        self.assertEqual(cpus_during, [{cpu}])
+        self.assertEqual(os.sched_getaffinity(0), affinity)
+        self.assertIn('cpus=[{}]'.format(cpu), repr(strategy))
+
+    def test_baseline_subtraction(self):
+        # each call of the clock takes 0.5 s, and each call of func 1 s
+        state = [0.]
+
+        def clock():
+            state[0] += 0.5
+            return state[0]
+
+        def func(data):
+            state[0] += data
+
+        strategy = timing.TimerStrategy(clock=clock)
+        t, measurements = timing.Timing(
+            n_repeats=4, n_timings=2, timer_strategy=strategy).measure(
+                func, lambda n: float(n), 1)
+        self.assertEqual(t, 4.)
+        assert_array_equal(measurements, [4., 4.])
+
+        t, _ = timing.Timing(n_repeats=4, timer_strategy=strategy,
+                             subtract_baseline=False).measure(
+                                 func, lambda n: float(n), 1)
+        self.assertEqual(t, 4.5)
+
+    def test_loop_timer(self):
+        calls = []
+        timeit = timing.TimerStrategy().loop_timer(calls.append, 'data')
+        self.assertGreaterEqual(timeit(3), 0.)
+        self.assertEqual(calls, ['data'] * 3)
+        timing.TimerStrategy().loop_timer(calls.append, 'data', empty=True)(5)
+        self.assertEqual(len(calls), 3)
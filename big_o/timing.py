@@ -0,0 +1,346 @@
+"""Measurement of the execution time of a function for a single N."""
+
+import asyncio
+import gc
+import itertools
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def trimmed_mean(measurements, proportion=0.1):
+    """ Return the mean of the measurements, excluding the `proportion`
+    smallest and the `proportion` largest ones.
+    """
+    measurements = np.sort(measurements)
+    n_trim = int(proportion * len(measurements))
+    if n_trim > 0:
+        measurements = measurements[n_trim:-n_trim]
+    return np.mean(measurements)
+
+
+def reject_outliers(measurements, threshold=3.):
+    """ Return the measurements that are not outliers.
+
+    Outliers are farther than `threshold` times the (normal-consistent)
+    median absolute deviation from the median.
+    """
+    measurements = np.asarray(measurements)
+    median = np.median(measurements)
+    mad = 1.4826 * np.median(np.abs(measurements - median))
+    if mad == 0:
+        return measurements
+    return measurements[np.abs(measurements - median) <= threshold * mad]
+
+
+def mad_mean(measurements, threshold=3.):
+    """ Return the mean of the measurements after rejecting the outliers
+    with `reject_outliers`.
+    """
+    return np.mean(reject_outliers(measurements, threshold))
+
+
+#: Aggregators of repeated timings, by name
+AGGREGATORS = {
+    'min': np.min,
+    'median': np.median,
+    'trimmed_mean': trimmed_mean,
+    'mad': mad_mean,
+}
+
+
+def relative_confidence_interval(measurements, z=1.96):
+    """ Return the half-width of the confidence interval of the mean of the
+    measurements, relative to the mean. Outliers are rejected first.
+    """
+    measurements = reject_outliers(measurements)
+    mean = np.mean(measurements)
+    if len(measurements) < 2 or mean <= 0:
+        return np.inf
+    std = np.std(measurements, ddof=1)
+    return z * std / np.sqrt(len(measurements)) / mean
+
+
+#: Clocks of the timer strategies, by name
+CLOCKS = {
+    'wall': time.perf_counter,
+    'process': time.process_time,
+    'thread': time.thread_time,
+}
+
+
+# Timing loops compiled once, in the style of the template of `timeit`: the
+# function and its data are bound as local variables, so that each call in
+# the loop costs no attribute lookup or wrapper call.
+_LOOP_TEMPLATE = """
+def {name}(_it, _timer, _func, _data):
+    _t0 = _timer()
+    for _i in _it:
+        {stmt}
+    _t1 = _timer()
+    return _t1 - _t0
+"""
+_LOOPS = {}
+exec(compile(_LOOP_TEMPLATE.format(name='call_loop', stmt='_func(_data)') +
+             _LOOP_TEMPLATE.format(name='empty_loop', stmt='pass'),
+             '<timing loop>', 'exec'), _LOOPS)
+
+
+class TimerStrategy(object):
+    """ How the execution time of a function is measured.
+
+    The clock determines what is measured: wall-clock time includes the time
+    spent waiting for I/O and in other threads and processes, CPU time counts
+    only the time the process (or the calling thread) spends on a CPU.
+    Comparing the complexity of the wall-clock and of the CPU time separates
+    I/O-bound from CPU-bound costs.
+
+    Input:
+    ------
+
+    clock -- 'wall' (`time.perf_counter`, default), 'process' (CPU time of
+             the process, `time.process_time`), 'thread' (CPU time of the
+             calling thread, `time.thread_time`), or a function returning
+             the current time in seconds.
+
+    gc_enabled -- If False (default, as in `timeit`), the garbage collector
+                  is disabled during the timings. If True, it is enabled, so
+                  that the cost of garbage collection is included.
+
+    cpus -- CPU, or collection of CPUs, to which the measuring process is
+            pinned during the timings, on platforms that support it.
+            Default: None, no pinning.
+    """
+
+    def __init__(self, clock='wall', gc_enabled=False, cpus=None):
+        if isinstance(clock, str) and clock not in CLOCKS:
+            raise ValueError('Unknown clock: {!r}'.format(clock))
+        if isinstance(cpus, int):
+            cpus = {cpus}
+        self.clock = clock
+        self.gc_enabled = gc_enabled
+        self.cpus = None if cpus is None else frozenset(cpus)
+
+    def __repr__(self):
+        clock = self.clock if isinstance(self.clock, str) else getattr(
+            self.clock, '__qualname__', repr(self.clock))
+        cpus = None if self.cpus is None else sorted(self.cpus)
+        return 'TimerStrategy(clock={!r}, gc_enabled={!r}, cpus={!r})'.format(
+            clock, self.gc_enabled, cpus)
+
+    def clock_function(self):
+        """ Return the function returning the current time in seconds. """
+        return CLOCKS[self.clock] if isinstance(self.clock, str) else self.clock
+
+    def loop_timer(self, func, data, empty=False):
+        """ Return a function timing `number` calls of `func(data)`.
+
+        The returned function is called as `timeit(number)` and returns the
+        time in seconds, like `timeit.Timer.timeit`. If `empty` is True, it
+        times an empty loop of `number` iterations instead, to measure the
+        overhead of the loop and of the clock.
+        """
+        loop = _LOOPS['empty_loop' if empty else 'call_loop']
+        clock = self.clock_function()
+
+        def timeit(number):
+            with self.gc_state():
+                return loop(itertools.repeat(None, number), clock, func, data)
+
+        return timeit
+
+    @contextmanager
+    def gc_state(self):
+        """ Context manager enabling the garbage collector if `gc_enabled`
+        is True, or disabling it as in `timeit`. The previous state is
+        restored at exit. """
+        gc_was_enabled = gc.isenabled()
+        if self.gc_enabled:
+            gc.enable()
+        else:
+            gc.disable()
+        try:
+            yield
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+            else:
+                gc.disable()
+
+    @contextmanager
+    def pinned(self):
+        """ Context manager pinning this process to `cpus`. """
+        if self.cpus is None or not hasattr(os, 'sched_setaffinity'):
+            yield
+            return
+        previous = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, self.cpus)
+        try:
+            yield
+        finally:
+            os.sched_setaffinity(0, previous)
+
+
+class Timing(object):
+    """ Settings for measuring the execution time at a single N.
+
+    Input:
+    ------
+
+    n_repeats -- Number of times func is called to compute execution time
+                 (return the cumulative time of execution). If 'auto', the
+                 number of calls is calibrated at each N so that a timing
+                 lasts at least `autorange_duration` seconds, and the
+                 execution time per call is returned.
+
+    n_timings -- Number of times the timing measurement is repeated.
+
+    aggregate -- How the repeated timings are reduced to a single execution
+                 time: one of 'min', 'median', 'trimmed_mean', 'mad'
+                 (mean after rejecting outliers more than 3 median absolute
+                 deviations away from the median), or a function taking the
+                 array of timings and returning a number.
+
+    target_precision -- If not None, the timing measurement is repeated
+                        beyond `n_timings` until the 95% confidence interval
+                        of the mean timing, relative to the mean, is
+                        narrower than +/- `target_precision` (e.g., 0.05
+                        for 5%), or `max_timings` timings have been taken.
+
+    max_timings -- Maximum number of timings if `target_precision` is set.
+
+    autorange_duration -- Minimum duration in seconds of a timing when
+                          `n_repeats` is 'auto'.
+
+    timer_strategy -- A `TimerStrategy` defining the clock, garbage
+                      collection and CPU pinning during the timings.
+                      Default: None, wall-clock time without garbage
+                      collection.
+
+    subtract_baseline -- If True (default), the time of an empty timing loop
+                         with the same number of iterations is subtracted
+                         from each timing, so that the timings of very fast
+                         functions do not include the overhead of the loop
+                         and of the clock. Not used for coroutine functions.
+    """
+
+    #: int: Number of timings of the empty loop; the fastest is subtracted
+    n_baseline_timings = 3
+
+    def __init__(self, n_repeats=1, n_timings=1, aggregate='min',
+                 target_precision=None, max_timings=100,
+                 autorange_duration=0.2, timer_strategy=None,
+                 subtract_baseline=True):
+        if isinstance(aggregate, str) and aggregate not in AGGREGATORS:
+            raise ValueError('Unknown aggregate: {!r}'.format(aggregate))
+        if isinstance(n_repeats, str) and n_repeats != 'auto':
+            raise ValueError('Unknown n_repeats: {!r}'.format(n_repeats))
+        self.n_repeats = n_repeats
+        self.n_timings = n_timings
+        self.aggregate = aggregate
+        self.target_precision = target_precision
+        self.max_timings = max_timings
+        self.autorange_duration = autorange_duration
+        if timer_strategy is None:
+            timer_strategy = TimerStrategy()
+        self.timer_strategy = timer_strategy
+        self.subtract_baseline = subtract_baseline
+
+    def _aggregate(self, measurements):
+        if isinstance(self.aggregate, str):
+            return AGGREGATORS[self.aggregate](measurements)
+        return self.aggregate(measurements)
+
+    def measure(self, func, data_generator, n):
+        """ Measure the execution time of `func` at `n`.
+
+        Output:
+        -------
+
+        time -- Aggregated execution time in seconds
+
+        measurements -- Array of all the timings in seconds
+        """
+        data = data_generator(n)
+        timeit = self.timer_strategy.loop_timer(func, data)
+        baseline = None
+        if self.subtract_baseline:
+            baseline = self.timer_strategy.loop_timer(func, data, empty=True)
+        return self._run(timeit, baseline)
+
+    def measure_async(self, func, data_generator, n, loop, concurrency=1):
+        """ Measure the execution time of the coroutine function `func` at `n`.
+
+        The timing loop runs inside the event loop `loop`, so that the
+        event loop is entered once per timing rather than once per call.
+        Each call awaits `concurrency` concurrent calls to `func`, gathered
+        with `asyncio.gather`.
+
+        Output: see `measure`.
+        """
+        data = data_generator(n)
+        clock = self.timer_strategy.clock_function()
+
+        async def timing_loop(number):
+            if concurrency == 1:
+                start = clock()
+                for _ in range(number):
+                    await func(data)
+                return clock() - start
+            start = clock()
+            for _ in range(number):
+                await asyncio.gather(*[func(data) for _ in range(concurrency)])
+            return clock() - start
+
+        def timeit(number):
+            with self.timer_strategy.gc_state():
+                return loop.run_until_complete(timing_loop(number))
+
+        return self._run(timeit)
+
+    def _run(self, timeit, baseline=None):
+        """ Take the timings with `timeit(number)`, which returns the time
+        in seconds of `number` calls, and aggregate them.
+
+        If `baseline` is not None, it is called as `baseline(number)` and
+        returns the time of the empty timing loop, which is subtracted from
+        the timings.
+        """
+        with self.timer_strategy.pinned():
+            if self.n_repeats == 'auto':
+                number = self._autorange(timeit)
+            else:
+                number = self.n_repeats
+            overhead = 0.
+            if baseline is not None:
+                overhead = min(baseline(number)
+                               for _ in range(self.n_baseline_timings))
+            measurements = [timeit(number) for _ in range(self.n_timings)]
+            if self.target_precision is not None:
+                # at least 3 timings are needed for a meaningful interval
+                while len(measurements) < 3 or (
+                        len(measurements) < self.max_timings
+                        and relative_confidence_interval(measurements)
+                        > self.target_precision):
+                    measurements.append(timeit(number))
+        measurements = np.maximum(np.array(measurements) - overhead, 0.)
+        if self.n_repeats == 'auto':
+            measurements /= number
+        return self._aggregate(measurements), measurements
+
+    def _autorange(self, timeit):
+        """ Return the number of calls for a timing to last at least
+        `autorange_duration` seconds.
+
+        As in `timeit.Timer.autorange`, the number of calls is increased in
+        the sequence 1, 2, 5, 10, 20, 50, ...
+        """
+        i = 1
+        while True:
+            for j in 1, 2, 5:
+                number = i * j
+                if timeit(number) >= self.autorange_duration:
+                    return number
+            i *= 10
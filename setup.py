@@ -16,5 +16,8 @@ setup(
     long_description=long_description,
     long_description_content_type='text/x-rst',
     packages=['big_o', 'big_o.test'],
-    install_requires=['numpy']
+    install_requires=['numpy'],
+    entry_points={
+        'console_scripts': ['big-o = big_o.cli:main'],
+    },
 )